@@ -0,0 +1,61 @@
+"""
+Compare two load-test result files endpoint by endpoint.
+    
+    python -m benchmarks.compare benchmarks/results/<baseline>.json benchmarks/results/<current>.json --threshold 10
+
+Exits with status 1 when any endpoint's p95 got slower by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+
+def change(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10, help="allowed p95 regression in percent")
+    args = parser.parse_args()
+    
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    
+    print(f"baseline {(baseline.get('commit') or 'unknown')[:8]} ({baseline['created_at']})")
+    print(f"current  {(current.get('commit') or 'unknown')[:8]} ({current['created_at']})")
+    if baseline.get("options") != current.get("options") or baseline.get("dataset", {}).get("employees") != current.get("dataset", {}).get("employees"):
+        print("⚠️ Runs used different options or datasets; deltas may not be comparable")
+    
+    regressions = []
+    for scenario, result in current["scenarios"].items():
+        before_endpoints = baseline["scenarios"].get(scenario, {}).get("endpoints", {})
+        print(f"\n{scenario}")
+        for endpoint, after in result["endpoints"].items():
+            before = before_endpoints.get(endpoint)
+            if before is None:
+                print(f"    {endpoint:<48} (new)")
+                continue
+            p95_change = change(before["p95_ms"], after["p95_ms"])
+            rps_change = change(before["rps"], after["rps"])
+            flag = ""
+            if p95_change > args.threshold:
+                flag = "  ❌ regression"
+                regressions.append(f"{scenario} / {endpoint}")
+            print(
+                f"    {endpoint:<48} p95 {before['p95_ms']:>7.1f} -> {after['p95_ms']:>7.1f} ms ({p95_change:+6.1f}%)  "
+                f"p99 {before['p99_ms']:>7.1f} -> {after['p99_ms']:>7.1f} ms  "
+                f"rps {before['rps']:>7.1f} -> {after['rps']:>7.1f} ({rps_change:+6.1f}%){flag}"
+            )
+    
+    if regressions:
+        print(f"\n❌ {len(regressions)} endpoint(s) regressed by more than {args.threshold:g}% at p95")
+        sys.exit(1)
+    print("\n✅ No p95 regressions over the threshold")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark dataset: N employees x M days of attendance, as SQL for psql.
+    
+    python -m benchmarks.generate_data --employees 2000 --days 365 | psql "$DATABASE_URL"
+
+Same shape as database/sample_data.sql, scaled up. Output is deterministic for a
+given --seed: statuses come from a hash of (seed, employee, day), not random().
+Attendance ends yesterday so the check-in scenario has today to itself.
+"""
+import argparse
+
+FIRST_NAMES = [
+    "Sarah", "Michael", "Emily", "James", "Priya", "David", "Lisa", "Robert",
+    "Maria", "Kevin", "Aisha", "Daniel", "Mei", "Carlos", "Fatima", "Noah"
+]
+LAST_NAMES = [
+    "Johnson", "Chen", "Rodriguez", "Wilson", "Sharma", "Brown", "Anderson", "Taylor",
+    "Garcia", "Lee", "Khan", "Murphy", "Wang", "Silva", "Nguyen", "Okafor"
+]
+DEPARTMENTS = ["Engineering", "HR", "Sales", "Marketing", "Finance", "Operations", "Support", "Legal"]
+
+def sql_array(values) -> str:
+    return "ARRAY[" + ", ".join(f"'{value}'" for value in values) + "]"
+
+def generate_sql(employees: int, days: int, seed: int, present_rate: float, coverage: float, weekends: bool, reset: bool) -> str:
+    weekday_filter = "" if weekends else "\n  AND EXTRACT(ISODOW FROM d) < 6"
+    reset_sql = "TRUNCATE attendance, employees CASCADE;\n\n" if reset else ""
+    return f"""-- Benchmark data for HRMS Lite: {employees} employees x {days} days (seed {seed})
+-- Generated by: python -m benchmarks.generate_data --employees {employees} --days {days} --seed {seed}
+
+BEGIN;
+
+{reset_sql}INSERT INTO employees (employee_id, full_name, email, department)
+SELECT
+    'EMP' || lpad(n::text, 6, '0'),
+    ({sql_array(FIRST_NAMES)})[1 + n % {len(FIRST_NAMES)}] || ' ' || ({sql_array(LAST_NAMES)})[1 + (n / {len(FIRST_NAMES)}) % {len(LAST_NAMES)}],
+    'emp' || lpad(n::text, 6, '0') || '@bench.company.com',
+    ({sql_array(DEPARTMENTS)})[1 + n % {len(DEPARTMENTS)}]
+FROM generate_series(1, {employees}) AS n
+ON CONFLICT (employee_id) DO NOTHING;
+
+-- The rollup is rebuilt once at the end instead of row by row
+ALTER TABLE attendance DISABLE TRIGGER attendance_rollup_trigger;
+
+INSERT INTO attendance (employee_id, attendance_date, status)
+SELECT
+    e.id,
+    d::date,
+    CASE WHEN h.value % 1000 < {round(present_rate * 1000)} THEN 'present' ELSE 'absent' END::attendance_status
+FROM employees e
+CROSS JOIN generate_series(CURRENT_DATE - {days}, CURRENT_DATE - 1, interval '1 day') AS d
+CROSS JOIN LATERAL (
+    SELECT ('x' || substr(md5('{seed}:' || e.employee_id || ':' || d::date), 1, 8))::bit(32)::int & 2147483647 AS value
+) AS h
+WHERE e.email LIKE '%@bench.company.com'
+  AND (h.value / 1000) % 1000 < {round(coverage * 1000)}{weekday_filter}
+ON CONFLICT (employee_id, attendance_date) DO NOTHING;
+
+ALTER TABLE attendance ENABLE TRIGGER attendance_rollup_trigger;
+SELECT rebuild_attendance_daily_rollup();
+
+COMMIT;
+
+ANALYZE employees;
+ANALYZE attendance;
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--present-rate", type=float, default=0.9, help="share of marked days that are present")
+    parser.add_argument("--coverage", type=float, default=0.97, help="share of days that are marked at all")
+    parser.add_argument("--weekends", action="store_true", help="also mark Saturdays and Sundays")
+    parser.add_argument("--reset", action="store_true", help="truncate employees and attendance first")
+    args = parser.parse_args()
+    print(generate_sql(
+        args.employees, args.days, args.seed, args.present_rate, args.coverage, args.weekends, args.reset
+    ))
+
+if __name__ == "__main__":
+    main()
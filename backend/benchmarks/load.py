@@ -0,0 +1,229 @@
+"""
+Run load-test scenarios against the API and record latency percentiles per endpoint.
+    
+    python -m benchmarks.load --url http://localhost:8000 --concurrency 20 --duration 30
+    python -m benchmarks.load --scenario dashboard_polling --scenario exports
+
+Without --url the app is served in-process (lifespan included) through httpx's ASGI
+transport, using whatever SUPABASE_URL/DATABASE_URL point at - see docker-compose.yml
+for the local stack. In-process numbers include the client's own overhead on the same
+event loop; use --url with uvicorn when comparing against production.
+
+Results go to benchmarks/results/<timestamp>-<commit>.json; compare two runs with
+python -m benchmarks.compare.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+import httpx
+from benchmarks.scenarios import SCENARIOS, Call, Dataset, Scenario, VirtualUser
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# ==================== Statistics ====================
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+        self.bytes = 0
+    
+    def record(self, seconds: float, status: int, nbytes: int):
+        self.latencies.append(seconds)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        self.bytes += nbytes
+        # 0 is a transport error (timeout, connection reset)
+        if status == 0 or status >= 400:
+            self.errors += 1
+    
+    def summary(self, elapsed: float) -> dict:
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(values) / count * 1000, 2) if count else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if count else 0.0,
+            "mean_bytes": round(self.bytes / count) if count else 0,
+            "statuses": dict(sorted(self.statuses.items()))
+        }
+
+# ==================== Runner ====================
+
+async def send(client: httpx.AsyncClient, user: VirtualUser, call: Call) -> tuple:
+    """Send one call and read the whole body; returns (seconds, status, bytes on the wire)"""
+    started = time.perf_counter()
+    try:
+        async with client.stream(call.method, call.path, params=call.params, json=call.json, headers=call.headers) as response:
+            if call.on_response is not None:
+                await response.aread()
+            else:
+                # Exports can be large; drain without holding the body
+                async for _ in response.aiter_raw():
+                    pass
+            elapsed = time.perf_counter() - started
+    except httpx.HTTPError:
+        return time.perf_counter() - started, 0, 0
+    if call.on_response is not None:
+        call.on_response(user, response)
+    return elapsed, response.status_code, response.num_bytes_downloaded
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    duration: float,
+    seed: int
+) -> dict:
+    """Drive `concurrency` virtual users until the duration ends or every user is done"""
+    stats: Dict[str, EndpointStats] = {}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    
+    async def virtual_user(number: int):
+        user = VirtualUser(number, random.Random(seed * 1000 + number))
+        while loop.time() < deadline:
+            call = scenario.next_call(user)
+            if call is None:
+                return
+            user.calls += 1
+            seconds, status, nbytes = await send(client, user, call)
+            stats.setdefault(call.name, EndpointStats()).record(seconds, status, nbytes)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await scenario.teardown(client)
+    
+    endpoints = {name: endpoint.summary(elapsed) for name, endpoint in sorted(stats.items())}
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {
+        "description": scenario.description,
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "endpoints": endpoints
+    }
+
+async def load_dataset(client: httpx.AsyncClient, days: int) -> Dataset:
+    """Employees (every page) and the date range the generated attendance covers"""
+    employees = []
+    cursor = None
+    while True:
+        response = await client.get("/api/employees", params={"limit": 1000, **({"cursor": cursor} if cursor else {})})
+        response.raise_for_status()
+        page = response.json()
+        employees.extend(
+            {"id": row["id"], "employee_id": row["employee_id"], "department": row["department"]}
+            for row in page["items"]
+        )
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    if not employees:
+        raise SystemExit("No employees found - load data with python -m benchmarks.generate_data first")
+    last_day = date.today() - timedelta(days=1)
+    return Dataset(
+        employees=employees,
+        departments=sorted({employee["department"] for employee in employees}),
+        first_day=last_day - timedelta(days=days - 1),
+        last_day=last_day
+    )
+
+@asynccontextmanager
+async def open_client(url: Optional[str], concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+            yield client
+        return
+    
+    # Slow-request logging would flood the output; tracing itself stays on as in production
+    os.environ.setdefault("TRACE_MAX_QUERIES", "0")
+    os.environ.setdefault("TRACE_SLOW_DB_MS", "0")
+    from main import app, lifespan
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", limits=limits, timeout=60) as client:
+            yield client
+
+def git_revision() -> dict:
+    def git(*args) -> str:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    try:
+        return {
+            "commit": git("rev-parse", "HEAD"),
+            "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))
+        }
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "branch": None, "dirty": None}
+
+async def main(args):
+    names = args.scenario or list(SCENARIOS)
+    revision = git_revision()
+    async with open_client(args.url, args.concurrency) as client:
+        dataset = await load_dataset(client, args.days)
+        print(f"{len(dataset.employees)} employees, attendance {dataset.first_day} .. {dataset.last_day}")
+        
+        results = {}
+        for name in names:
+            print(f"▶ {name}: {args.concurrency} users, up to {args.duration:g}s")
+            result = await run_scenario(client, SCENARIOS[name](dataset), args.concurrency, args.duration, args.seed)
+            results[name] = result
+            for endpoint, summary in result["endpoints"].items():
+                print(
+                    f"    {endpoint:<48} {summary['requests']:>6} req {summary['rps']:>8.1f}/s  "
+                    f"p50 {summary['p50_ms']:>7.1f}  p95 {summary['p95_ms']:>7.1f}  p99 {summary['p99_ms']:>7.1f} ms"
+                    + (f"  {summary['errors']} errors" if summary["errors"] else "")
+                )
+    
+    report = {
+        **revision,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.url or "in-process",
+        "python": platform.python_version(),
+        "options": {"concurrency": args.concurrency, "duration_s": args.duration, "seed": args.seed, "days": args.days},
+        "dataset": {"employees": len(dataset.employees), "first_day": str(dataset.first_day), "last_day": str(dataset.last_day)},
+        "scenarios": results
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{(revision['commit'] or 'unknown')[:8]}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"✅ Results written to {output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: serve the app in-process)")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable; default: all")
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users per scenario")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per scenario")
+    parser.add_argument("--days", type=int, default=90, help="days of attendance in the dataset (as generated)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,146 @@
+"""
+Load-test scenarios: each one hands its virtual users the next request to send.
+"""
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import httpx
+
+@dataclass
+class Dataset:
+    """What the scenarios need to know about the data behind the API"""
+    employees: List[dict]     # {"id", "employee_id", "department"}
+    departments: List[str]
+    first_day: date
+    last_day: date
+
+@dataclass
+class Call:
+    """One request; `name` is the endpoint label results are grouped by"""
+    name: str
+    method: str
+    path: str
+    params: Optional[Dict[str, Any]] = None
+    json: Any = None
+    headers: Optional[Dict[str, str]] = None
+    # Called with the user and the response; only then is the body kept in memory
+    on_response: Optional[Callable[["VirtualUser", httpx.Response], None]] = None
+
+@dataclass
+class VirtualUser:
+    number: int
+    rng: random.Random
+    calls: int = 0
+    etags: Dict[str, str] = field(default_factory=dict)
+
+class Scenario(ABC):
+    name = ""
+    description = ""
+    
+    def __init__(self, dataset: Dataset):
+        self.dataset = dataset
+    
+    @abstractmethod
+    def next_call(self, user: VirtualUser) -> Optional[Call]:
+        """The user's next request, or None when the user is done"""
+    
+    async def teardown(self, client: httpx.AsyncClient):
+        """Undo writes so every run starts from the same data"""
+    
+    def random_window(self, rng: random.Random, min_days: int, max_days: int) -> Dict[str, str]:
+        span = (self.dataset.last_day - self.dataset.first_day).days
+        length = min(rng.randint(min_days, max_days), span)
+        start = self.dataset.first_day + timedelta(days=rng.randint(0, span - length))
+        return {"start_date": str(start), "end_date": str(start + timedelta(days=length))}
+
+class CheckInSpike(Scenario):
+    name = "checkin_spike"
+    description = "Every employee marks today's attendance at once while dashboards refresh"
+    
+    def __init__(self, dataset: Dataset):
+        super().__init__(dataset)
+        self.pending = list(dataset.employees)
+        random.Random(0).shuffle(self.pending)
+        self.created: List[str] = []
+    
+    def _created(self, user: VirtualUser, response: httpx.Response):
+        if response.status_code == 201:
+            self.created.append(response.json()["id"])
+    
+    def next_call(self, user: VirtualUser) -> Optional[Call]:
+        if user.calls % 10 == 9:
+            return Call("GET /api/dashboard", "GET", "/api/dashboard")
+        if not self.pending:
+            return None
+        employee = self.pending.pop()
+        status = "present" if user.rng.random() < 0.9 else "absent"
+        return Call(
+            "POST /api/attendance", "POST", "/api/attendance",
+            json={"employee_id": employee["id"], "attendance_date": str(date.today()), "status": status},
+            on_response=self._created
+        )
+    
+    async def teardown(self, client: httpx.AsyncClient):
+        for attendance_id in self.created:
+            await client.delete(f"/api/attendance/{attendance_id}")
+
+class DashboardPolling(Scenario):
+    name = "dashboard_polling"
+    description = "Open dashboards refreshing metrics and charts, revalidating with If-None-Match"
+    
+    CHARTS = ["/api/analytics/attendance-trends", "/api/analytics/department-stats", "/api/analytics/monthly-attendance"]
+    
+    def _remember_etag(self, user: VirtualUser, response: httpx.Response):
+        etag = response.headers.get("etag")
+        if etag:
+            user.etags[str(response.request.url.path)] = etag
+    
+    def next_call(self, user: VirtualUser) -> Call:
+        # Metrics on every refresh, one of the charts every few refreshes
+        path = "/api/dashboard" if user.calls % 4 else self.CHARTS[(user.calls // 4) % len(self.CHARTS)]
+        etag = user.etags.get(path)
+        return Call(
+            f"GET {path}", "GET", path,
+            headers={"If-None-Match": etag} if etag else None,
+            on_response=self._remember_etag
+        )
+
+class FilteredLists(Scenario):
+    name = "filtered_lists"
+    description = "Attendance and employee list pages with date, employee, status and department filters"
+    
+    def next_call(self, user: VirtualUser) -> Call:
+        rng = user.rng
+        choice = rng.random()
+        if choice < 0.35:
+            params = self.random_window(rng, 7, 31)
+            if rng.random() < 0.5:
+                params["status"] = rng.choice(["present", "absent"])
+            return Call("GET /api/attendance/filter (range)", "GET", "/api/attendance/filter", params={**params, "limit": 100})
+        if choice < 0.6:
+            employee = rng.choice(self.dataset.employees)
+            params = {**self.random_window(rng, 30, 180), "employee_id": employee["id"], "limit": 100}
+            return Call("GET /api/attendance/filter (employee)", "GET", "/api/attendance/filter", params=params)
+        if choice < 0.75:
+            return Call("GET /api/attendance", "GET", "/api/attendance", params={"limit": 100})
+        if choice < 0.9:
+            params = {"department": rng.choice(self.dataset.departments), "limit": 100}
+            return Call("GET /api/employees/attendance-summaries", "GET", "/api/employees/attendance-summaries", params=params)
+        return Call("GET /api/employees", "GET", "/api/employees", params={"limit": 100})
+
+class Exports(Scenario):
+    name = "exports"
+    description = "Streaming CSV/NDJSON exports for a month, and one employee's full history"
+    
+    def next_call(self, user: VirtualUser) -> Call:
+        rng = user.rng
+        if rng.random() < 0.25:
+            employee = rng.choice(self.dataset.employees)
+            return Call("GET /api/attendance/export (employee)", "GET", "/api/attendance/export", params={"employee_id": employee["id"]})
+        export_format = "ndjson" if rng.random() < 0.25 else "csv"
+        params = {**self.random_window(rng, 28, 31), "format": export_format}
+        return Call(f"GET /api/attendance/export ({export_format}, month)", "GET", "/api/attendance/export", params=params)
+
+SCENARIOS = {scenario.name: scenario for scenario in (CheckInSpike, DashboardPolling, FilteredLists, Exports)}
@@ -0,0 +1,90 @@
+"""
+Rows/sec for large attendance list responses through FastAPI, before and after the fast JSON path.
+    
+    python -m benchmarks.serialization --rows 1000 --iterations 20
+
+Runs in-process against synthetic PostgREST-shaped rows, so no database is needed.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+import httpx
+from fastapi import FastAPI
+from models.schemas import AttendancePage
+from routes.attendance import attendance_row, to_attendance_with_employee
+from services.responses import FastJSONResponse, orjson
+
+def make_rows(count: int) -> list:
+    """Attendance rows with embedded employees, as PostgREST returns them"""
+    employees = [
+        {"employee_id": f"EMP{i:05d}", "full_name": f"Employee {i}", "department": f"Dept {i % 12}"}
+        for i in range(max(count // 20, 1))
+    ]
+    employee_ids = [str(uuid.uuid4()) for _ in employees]
+    start = date(2026, 1, 1)
+    created = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "employee_id": employee_ids[i % len(employees)],
+            "attendance_date": str(start + timedelta(days=i % 365)),
+            "status": "present" if i % 7 else "absent",
+            "created_at": (created + timedelta(minutes=i)).isoformat(),
+            "employees": employees[i % len(employees)]
+        }
+        for i in range(count)
+    ]
+
+def build_app(rows: list) -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/before", response_model=AttendancePage)
+    async def before():
+        # Previous path: a model per row, then FastAPI re-validates and encodes the page
+        return AttendancePage(items=[to_attendance_with_employee(record) for record in rows])
+    
+    @app.get("/dict", response_model=AttendancePage)
+    async def validated_once():
+        # Default path: plain dicts, validated once against response_model
+        return {"items": [attendance_row(record) for record in rows], "next_cursor": None, "total": None}
+    
+    @app.get("/fast", response_model=AttendancePage)
+    async def fast():
+        # FAST_JSON path: trusted dicts encoded directly
+        page = {"items": [attendance_row(record) for record in rows], "next_cursor": None, "total": None}
+        return FastJSONResponse(page)
+    
+    return app
+
+async def measure(client: httpx.AsyncClient, path: str, rows: int, iterations: int) -> float:
+    await client.get(path)  # warm up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        response = await client.get(path)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return rows * iterations / elapsed
+
+async def main(rows: int, iterations: int):
+    app = build_app(make_rows(rows))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        print(f"{rows} rows x {iterations} iterations (encoder: {'orjson' if orjson else 'json'})")
+        baseline = None
+        for label, path in [
+            ("before (model per row + re-validation)", "/before"),
+            ("validated once (dict rows)", "/dict"),
+            ("fast JSON (FAST_JSON=true)", "/fast")
+        ]:
+            rate = await measure(client, path, rows, iterations)
+            baseline = baseline or rate
+            print(f"  {label:<40} {rate:>12,.0f} rows/sec  ({rate / baseline:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark attendance list serialization")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per response")
+    parser.add_argument("--iterations", type=int, default=20, help="Requests per variant")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations))
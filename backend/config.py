@@ -9,7 +9,87 @@ class Settings(BaseSettings):
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_key: str = os.getenv("SUPABASE_KEY", "")
     supabase_service_key: str = os.getenv("SUPABASE_SERVICE_KEY", "")
-    
+
+    # Data access: "supabase" (PostgREST, plus the pool below when set), "postgres"
+    # (direct SQL over the pool only) or "memory" (in-process, not persisted)
+    storage_backend: str = os.getenv("STORAGE_BACKEND", "supabase")
+    supabase_async: bool = os.getenv("SUPABASE_ASYNC", "true").lower() == "true"
+    db_thread_pool_size: int = int(os.getenv("DB_THREAD_POOL_SIZE", "8"))
+
+    # Direct Postgres (asyncpg pool); disabled when DATABASE_URL is empty
+    database_url: str = os.getenv("DATABASE_URL", "")
+    db_pool_min_size: int = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+    db_pool_max_size: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    # Set to 0 when connecting through a transaction-mode pooler (pgbouncer/Supavisor)
+    db_statement_cache_size: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    db_command_timeout: float = float(os.getenv("DB_COMMAND_TIMEOUT", "30"))
+    db_acquire_timeout: float = float(os.getenv("DB_ACQUIRE_TIMEOUT", "10"))
+    db_max_inactive_connection_lifetime: float = float(os.getenv("DB_MAX_INACTIVE_CONNECTION_LIFETIME", "300"))
+    # Independent queries one request may run at once across its db.gather calls
+    # (0 removes the per-request cap); keep below DB_POOL_MAX_SIZE
+    db_fanout_limit: int = int(os.getenv("DB_FANOUT_LIMIT", "4"))
+
+    # Bulk operations
+    bulk_max_items: int = int(os.getenv("BULK_MAX_ITEMS", "5000"))
+    bulk_chunk_size: int = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+    # Largest CSV upload /api/employees/import accepts (the upload is spooled before it is read)
+    import_max_bytes: int = int(os.getenv("IMPORT_MAX_BYTES", str(10 * 1024 * 1024)))
+    export_chunk_size: int = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+    # Response cache (TTLs in seconds)
+    cache_enabled: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    # "memory" (per worker) or "redis" (shared across workers)
+    cache_backend: str = os.getenv("CACHE_BACKEND", "memory")
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    cache_key_prefix: str = os.getenv("CACHE_KEY_PREFIX", "hrms:cache")
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+    cache_ttl_dashboard: float = float(os.getenv("CACHE_TTL_DASHBOARD", "10"))
+    cache_ttl_employees: float = float(os.getenv("CACHE_TTL_EMPLOYEES", "30"))
+    cache_ttl_analytics: float = float(os.getenv("CACHE_TTL_ANALYTICS", "60"))
+    # How long ETag validators reuse the table_versions row; API writes clear it at once,
+    # other writers are seen after at most this long
+    cache_ttl_versions: float = float(os.getenv("CACHE_TTL_VERSIONS", "2"))
+
+    # Encode trusted list/report payloads with orjson and skip response_model re-validation
+    fast_json: bool = os.getenv("FAST_JSON", "false").lower() == "true"
+
+    # Prometheus metrics on /metrics
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Per-request query tracing: log requests over either threshold (0 disables it)
+    trace_queries: bool = os.getenv("TRACE_QUERIES", "true").lower() == "true"
+    trace_max_queries: int = int(os.getenv("TRACE_MAX_QUERIES", "10"))
+    trace_slow_db_ms: float = float(os.getenv("TRACE_SLOW_DB_MS", "250"))
+    # Add a Server-Timing header with the per-request database breakdown
+    server_timing: bool = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+    # Response compression (brotli is used when the package is installed)
+    compression_enabled: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    compression_minimum_size: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    # Analytics reports (longest date range accepted by /api/analytics/attendance)
+    analytics_max_days: int = int(os.getenv("ANALYTICS_MAX_DAYS", "1096"))
+
+    # In-process columnar attendance store for analytics and the dashboard; single-process
+    # deployments, other writers show up after the periodic reload (seconds, 0 disables it)
+    attendance_store_enabled: bool = os.getenv("ATTENDANCE_STORE", "false").lower() == "true"
+    attendance_store_refresh: float = float(os.getenv("ATTENDANCE_STORE_REFRESH", "300"))
+    # Attendance rows read per keyset page while (re)loading the store
+    attendance_store_load_batch: int = int(os.getenv("ATTENDANCE_STORE_LOAD_BATCH", "5000"))
+
+    # Per-employee attendance bitsets for summaries and per-employee totals; built lazily,
+    # same single-process caveat as the attendance store (seconds between rebuilds, 0 disables)
+    attendance_bitmaps_enabled: bool = os.getenv("ATTENDANCE_BITMAPS", "false").lower() == "true"
+    attendance_bitmaps_refresh: float = float(os.getenv("ATTENDANCE_BITMAPS_REFRESH", "300"))
+
+    # Live dashboard event stream (SSE)
+    events_queue_size: int = int(os.getenv("EVENTS_QUEUE_SIZE", "32"))
+    events_max_clients: int = int(os.getenv("EVENTS_MAX_CLIENTS", "500"))
+    events_debounce: float = float(os.getenv("EVENTS_DEBOUNCE", "1"))
+    events_keepalive: float = float(os.getenv("EVENTS_KEEPALIVE", "15"))
+
     # Server
     host: str = os.getenv("HOST", "0.0.0.0")
     port: int = int(os.getenv("PORT", "8000"))
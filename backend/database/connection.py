@@ -1,25 +1,281 @@
-from supabase import create_client, Client
+import asyncio
+import contextvars
+import json
+import time
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Union
+from uuid import UUID
+import asyncpg
+from supabase import acreate_client, create_client, AsyncClient, Client
 from config import settings
+from services.concurrency import fan_out
+from services.metrics import describe_postgrest, describe_sql, observe_query
+from services.tracing import current_trace, fingerprint_postgrest, fingerprint_sql
+
+# Collects PostgREST response sizes for the query currently running in this task
+_response_sizes: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("response_sizes", default=None)
+
+async def _record_response_size(response):
+    """httpx response hook (async client)"""
+    sizes = _response_sizes.get()
+    if sizes is not None:
+        await response.aread()
+        sizes.append(len(response.content))
+
+def _record_response_size_sync(response):
+    """httpx response hook (sync client)"""
+    sizes = _response_sizes.get()
+    if sizes is not None:
+        response.read()
+        sizes.append(len(response.content))
+
+def _observe(backend: str, table: str, operation: str, started: float, fingerprint: Callable[[], str], rows: int = 0, nbytes: int = 0, error: bool = False):
+    """Record one database call in the metrics and in the current request's trace"""
+    seconds = time.perf_counter() - started
+    observe_query(backend, table, operation, seconds, rows=rows, nbytes=nbytes, error=error)
+    trace = current_trace()
+    if trace is not None:
+        # Fingerprinting is only paid for while a request is being traced
+        trace.add(backend, table, operation, fingerprint(), seconds, rows=rows, error=error)
+
+def _row_count(result: Any) -> int:
+    if isinstance(result, list):
+        return len(result)
+    return 0 if result is None else 1
+
+def _status_row_count(status: str) -> int:
+    """Rows affected from a command status such as "INSERT 0 5" or "DELETE 3"."""
+    last = (status or "").rsplit(" ", 1)[-1]
+    return int(last) if last.isdigit() else 0
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Decode json/jsonb columns to Python objects on every pooled connection"""
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog"
+        )
+
+def _to_json_param(value: Any) -> Any:
+    """Convert Python values to what PostgREST expects in an RPC body"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_to_json_param(item) for item in value]
+    return value
 
 class Database:
     def __init__(self):
-        self.client: Client = None
-    
+        self.client: Optional[Union[AsyncClient, Client]] = None
+        self.is_async: bool = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pool: Optional[asyncpg.Pool] = None
+
     async def connect(self):
         """Create Supabase client connection"""
         try:
-            self.client = create_client(
-                settings.supabase_url,
-                settings.supabase_key
-            )
-            print("✅ Supabase client initialized successfully")
+            if settings.supabase_async:
+                self.client = await acreate_client(
+                    settings.supabase_url,
+                    settings.supabase_key
+                )
+                self.is_async = True
+            else:
+                # Sync fallback: every query runs on a bounded thread pool
+                self.client = create_client(
+                    settings.supabase_url,
+                    settings.supabase_key
+                )
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.db_thread_pool_size,
+                    thread_name_prefix="supabase"
+                )
+                self.is_async = False
+            mode = "async" if self.is_async else f"sync, {settings.db_thread_pool_size} threads"
+            print(f"✅ Supabase client initialized successfully ({mode})")
         except Exception as e:
             print(f"❌ Error connecting to Supabase: {e}")
             raise
-    
+
+        if settings.database_url:
+            await self.connect_pool()
+
+    async def connect_pool(self):
+        """Create the direct Postgres connection pool"""
+        try:
+            self.pool = await asyncpg.create_pool(
+                dsn=settings.database_url,
+                min_size=settings.db_pool_min_size,
+                max_size=settings.db_pool_max_size,
+                statement_cache_size=settings.db_statement_cache_size,
+                max_inactive_connection_lifetime=settings.db_max_inactive_connection_lifetime,
+                command_timeout=settings.db_command_timeout,
+                init=_init_connection
+            )
+            print(
+                f"✅ Postgres pool created "
+                f"(min={settings.db_pool_min_size}, max={settings.db_pool_max_size})"
+            )
+        except Exception as e:
+            print(f"❌ Error creating Postgres pool: {e}")
+            raise
+
     async def disconnect(self):
-        """Close Supabase connection"""
+        """Close Supabase connection and Postgres pool"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+        if self.is_async and self.client is not None:
+            await self.client.postgrest.aclose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
         print("✅ Supabase client closed")
 
+    def table(self, name: str):
+        """Start a PostgREST query builder for a table"""
+        return self.client.table(name)
+
+    def _watch_response_sizes(self, query):
+        """Make sure the builder's HTTP session reports response sizes"""
+        session = getattr(getattr(query, "request", None), "session", None)
+        if session is None:
+            return
+        hook = _record_response_size if self.is_async else _record_response_size_sync
+        hooks = session.event_hooks["response"]
+        if hook not in hooks:
+            hooks.append(hook)
+
+    async def run(self, query) -> Any:
+        """Execute a PostgREST query builder without blocking the event loop"""
+        table, operation = describe_postgrest(query)
+        self._watch_response_sizes(query)
+        sizes: List[int] = []
+        token = _response_sizes.set(sizes)
+        started = time.perf_counter()
+        try:
+            if self.is_async:
+                response = await query.execute()
+            else:
+                response = await self.run_sync(query.execute)
+        except Exception:
+            _observe("postgrest", table, operation, started, partial(fingerprint_postgrest, query), error=True)
+            raise
+        finally:
+            _response_sizes.reset(token)
+        _observe(
+            "postgrest", table, operation, started, partial(fingerprint_postgrest, query),
+            rows=_row_count(response.data), nbytes=sum(sizes)
+        )
+        return response
+
+    async def run_sync(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call on the bounded database thread pool"""
+        loop = asyncio.get_running_loop()
+        # Copy the context so per-request state (e.g. response size tracking) reaches the thread
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, partial(context.run, func, *args, **kwargs))
+
+    # ==================== Database functions ====================
+
+    def _function_call_sql(self, fn: str, params: Dict[str, Any]) -> str:
+        args = ", ".join(f"{name} => ${i}" for i, name in enumerate(params, start=1))
+        return f"{fn}({args})"
+
+    async def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Call a set-returning database function, returning its rows as dicts"""
+        params = params or {}
+        if self.pool is not None:
+            rows = await self.fetch(f"SELECT * FROM {self._function_call_sql(fn, params)}", *params.values())
+            return [dict(row) for row in rows]
+        body = {name: _to_json_param(value) for name, value in params.items()}
+        response = await self.run(self.client.rpc(fn, body))
+        return response.data or []
+
+    async def rpc_value(self, fn: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Call a scalar database function (e.g. one returning JSON) in a single round trip"""
+        params = params or {}
+        if self.pool is not None:
+            return await self.fetchval(f"SELECT {self._function_call_sql(fn, params)}", *params.values())
+        body = {name: _to_json_param(value) for name, value in params.items()}
+        response = await self.run(self.client.rpc(fn, body))
+        return response.data
+
+    # ==================== Direct Postgres ====================
+
+    def _require_pool(self) -> asyncpg.Pool:
+        if self.pool is None:
+            raise RuntimeError("Direct Postgres access requires DATABASE_URL to be configured")
+        return self.pool
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        """Borrow a pooled connection, failing fast when the pool is exhausted"""
+        pool = self._require_pool()
+        async with pool.acquire(timeout=settings.db_acquire_timeout) as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[asyncpg.Connection]:
+        """Run the enclosed statements on one connection inside a transaction"""
+        async with self.acquire() as conn:
+            async with conn.transaction():
+                yield conn
+
+    async def _timed(self, query: str, call: Callable[[asyncpg.Connection], Any], count: Callable[[Any], int] = _row_count) -> Any:
+        """Run one statement on a pooled connection, recording its latency and row count"""
+        table, operation = describe_sql(query)
+        started = time.perf_counter()
+        try:
+            async with self.acquire() as conn:
+                result = await call(conn)
+        except Exception:
+            _observe("postgres", table, operation, started, partial(fingerprint_sql, query), error=True)
+            raise
+        _observe("postgres", table, operation, started, partial(fingerprint_sql, query), rows=count(result))
+        return result
+
+    async def fetch(self, query: str, *args) -> List[asyncpg.Record]:
+        return await self._timed(query, lambda conn: conn.fetch(query, *args))
+
+    async def fetchrow(self, query: str, *args) -> Optional[asyncpg.Record]:
+        return await self._timed(query, lambda conn: conn.fetchrow(query, *args))
+
+    async def fetchval(self, query: str, *args, column: int = 0) -> Any:
+        return await self._timed(query, lambda conn: conn.fetchval(query, *args, column=column))
+
+    async def execute(self, query: str, *args) -> str:
+        return await self._timed(query, lambda conn: conn.execute(query, *args), _status_row_count)
+
+    async def executemany(self, query: str, args: Iterable[Sequence]) -> None:
+        await self._timed(query, lambda conn: conn.executemany(query, args), lambda _: 0)
+
+    async def copy_records(self, table: str, records: Iterable[Sequence], columns: List[str]) -> str:
+        """Bulk-load rows with COPY, recorded in the metrics and trace like any other statement"""
+        query = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+        return await self._timed(
+            query,
+            lambda conn: conn.copy_records_to_table(table, records=records, columns=columns),
+            _status_row_count
+        )
+
+    async def gather(self, *calls: Awaitable) -> List[Any]:
+        """Run independent queries concurrently; a request runs at most DB_FANOUT_LIMIT at a time across all of them"""
+        return await fan_out(*calls, limit=settings.db_fanout_limit)
+
+    async def ping(self) -> None:
+        """Round-trip to the database, preferring the direct pool when available"""
+        if self.pool is not None:
+            await self.fetchval("SELECT 1")
+        else:
+            await self.run(self.table("employees").select("id").limit(1))
+
 # Global database instance
 db = Database()
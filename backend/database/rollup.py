@@ -0,0 +1,28 @@
+"""
+Backfill / rebuild the attendance_daily_rollup table.
+
+Usage (from the backend directory):
+    python -m database.rollup
+"""
+import asyncio
+from database.connection import db
+from repositories.storage import storage
+
+async def rebuild_rollup() -> int:
+    """Recompute attendance_daily_rollup from the raw attendance table"""
+    return await db.rpc_value("rebuild_attendance_daily_rollup")
+
+async def main():
+    if storage.name == "memory":
+        print("ℹ️ STORAGE_BACKEND=memory keeps its rollup in process; nothing to rebuild")
+        return
+    # Opens the Postgres pool or the Supabase client, whichever STORAGE_BACKEND uses
+    await storage.connect()
+    try:
+        rows = await rebuild_rollup()
+        print(f"✅ Rebuilt attendance_daily_rollup ({rows} date/department rows)")
+    finally:
+        await storage.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,24 +1,41 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 
 from config import settings
 from database.connection import db
-from routes import employees, attendance, dashboard, analytics
+from repositories.storage import storage
+from services.attendance_store import attendance_store
+from services.cache import cache
+from services.compression import CompressionMiddleware
+from services.concurrency import FanOutLimitMiddleware
+from services.metrics import Gauge, MetricsMiddleware, registry
+from services.tracing import TracingMiddleware
+from services.events import broadcaster, metrics_feed, format_sse
+from routes import employees, attendance, dashboard, analytics, admin
+from services.validation import format_validation_errors
 
 # Lifespan context manager for startup and shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting HRMS Lite API...")
-    await db.connect()
+    await storage.connect()
+    print(f"✅ Storage backend: {storage.name}")
+    if attendance_store.enabled:
+        await attendance_store.load()
+    await cache.connect()
     yield
     # Shutdown
     print("🛑 Shutting down HRMS Lite API...")
-    await db.disconnect()
+    await metrics_feed.close()
+    await cache.close()
+    await attendance_store.close()
+    await storage.close()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -39,15 +56,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# One semaphore per request, shared by all of its db.gather fan-outs
+app.add_middleware(FanOutLimitMiddleware, limit=settings.db_fanout_limit)
+
+# Collect the database calls each request makes; log the expensive ones
+if settings.trace_queries:
+    app.add_middleware(
+        TracingMiddleware,
+        max_queries=settings.trace_max_queries,
+        slow_db_ms=settings.trace_slow_db_ms,
+        server_timing=settings.server_timing,
+        timing_allow_origin=", ".join(settings.cors_origins)
+    )
+
+# Compress JSON and export responses above the size threshold
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality
+    )
+
+# Outermost, so latency covers compression and the full streamed body
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Custom exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors with detailed messages"""
-    errors = []
-    for error in exc.errors():
-        field = " -> ".join(str(loc) for loc in error["loc"])
-        message = error["msg"]
-        errors.append(f"{field}: {message}")
+    errors = format_validation_errors(exc.errors())
     
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -75,6 +114,7 @@ app.include_router(employees.router)
 app.include_router(attendance.router)
 app.include_router(dashboard.router)
 app.include_router(analytics.router)
+app.include_router(admin.router)
 
 # Root endpoint
 @app.get("/", tags=["root"])
@@ -88,17 +128,72 @@ async def root():
         "endpoints": {
             "employees": "/api/employees",
             "attendance": "/api/attendance",
-            "dashboard": "/api/dashboard"
+            "dashboard": "/api/dashboard",
+            "events": "/api/events"
         }
     }
 
+# Live dashboard updates
+@app.get("/api/events", tags=["events"])
+async def stream_events(request: Request):
+    """Server-sent events stream of dashboard metric changes"""
+    try:
+        subscriber = broadcaster.subscribe()
+    except RuntimeError as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"success": False, "error": "Service Unavailable", "detail": str(e)}
+        )
+    
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.events_keepalive)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Comment frames keep proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield format_sse(*message)
+        finally:
+            broadcaster.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Prometheus metrics
+def _pool_connections() -> dict:
+    if db.pool is None:
+        return {}
+    size = db.pool.get_size()
+    idle = db.pool.get_idle_size()
+    return {("busy",): size - idle, ("idle",): idle}
+
+registry.register(Gauge(
+    "hrms_db_pool_connections", "Direct Postgres pool connections by state", ("state",),
+    collect=_pool_connections
+))
+
+@app.get("/metrics", tags=["root"], include_in_schema=False)
+async def metrics():
+    """Request, query and pool metrics in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # Health check endpoint
 @app.get("/health", tags=["root"])
 async def health_check():
     """Health check endpoint for monitoring"""
     try:
-        # Test database connection
-        await db.fetchval("SELECT 1")
+        # Test the storage backend
+        await storage.ping()
         return {
             "success": True,
             "status": "healthy",
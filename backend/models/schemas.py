@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional, Literal
+from typing import Any, Optional, Literal
 from datetime import date, datetime
 from uuid import UUID
 import re
@@ -44,6 +44,17 @@ class EmployeeResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class EmployeeImportRowError(BaseModel):
+    row: int = Field(..., description="Line number in the CSV file (header is line 1)")
+    employee_id: Optional[str] = None
+    error: str
+
+class EmployeeImportResult(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: list[EmployeeImportRowError]
+
 class EmployeeUpdate(BaseModel):
     full_name: Optional[str] = Field(None, min_length=1, max_length=255)
     email: Optional[EmailStr] = None
@@ -65,6 +76,10 @@ class AttendanceCreate(BaseModel):
             raise ValueError("Attendance date cannot be in the future")
         return v
 
+class AttendanceBulkCreate(BaseModel):
+    # Items are validated one by one so a bad row fails alone instead of the whole request
+    items: list[Any] = Field(..., min_length=1, description="AttendanceCreate payloads")
+
 class AttendanceUpdate(BaseModel):
     status: AttendanceStatus = Field(..., description="Updated attendance status")
 
@@ -88,6 +103,42 @@ class AttendanceWithEmployee(BaseModel):
     status: str
     created_at: datetime
 
+class AttendanceBulkItemResult(BaseModel):
+    index: int
+    success: bool
+    record: Optional[AttendanceResponse] = None
+    error: Optional[str] = None
+
+class AttendanceBulkResult(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: list[AttendanceBulkItemResult]
+
+# ==================== Pagination Models ====================
+
+class EmployeePage(BaseModel):
+    items: list[EmployeeResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+class AttendancePage(BaseModel):
+    items: list[AttendanceWithEmployee]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+class AttendanceEmployee(BaseModel):
+    employee_name: str
+    employee_code: str
+    department: str
+
+class AttendanceNormalizedPage(BaseModel):
+    """Attendance rows without the employee join; each employee appears once in `employees`"""
+    items: list[AttendanceResponse]
+    employees: dict[UUID, AttendanceEmployee]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
 # ==================== Filter Models ====================
 
 class AttendanceFilter(BaseModel):
@@ -109,6 +160,19 @@ class EmployeeAttendanceSummary(BaseModel):
     absent_days: int
     attendance_rate: float
 
+class AttendanceCalendar(BaseModel):
+    employee_id: UUID
+    employee_code: str
+    employee_name: str
+    start_date: date
+    end_date: date
+    days: list[Optional[Literal["present", "absent"]]]  # one entry per day from start_date; None when unmarked
+
+class EmployeeAttendanceSummaryPage(BaseModel):
+    items: list[EmployeeAttendanceSummary]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
 class DashboardMetrics(BaseModel):
     total_employees: int
     total_attendance_records: int
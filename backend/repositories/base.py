@@ -0,0 +1,152 @@
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Rows cross the repository boundary in the shape PostgREST returns them: UUIDs,
+# dates and timestamps as ISO strings, attendance rows with the employee embedded
+# under "employees" ({"full_name", "employee_id", "department"}).
+Row = Dict[str, Any]
+
+class DuplicateKeyError(Exception):
+    """A write hit a unique constraint; `field` is the column ("employee_id" or "email")"""
+    
+    def __init__(self, field: str, message: str = ""):
+        super().__init__(message or f"duplicate key value violates unique constraint on {field}")
+        self.field = field
+
+class EmployeeRepository(ABC):
+    @abstractmethod
+    async def create(self, employee: Row) -> Row:
+        """Insert one employee, raising DuplicateKeyError on a taken code or email"""
+    
+    @abstractmethod
+    async def insert_many(self, employees: List[Row]):
+        """Insert a batch of employees in one statement (all or nothing)"""
+    
+    @abstractmethod
+    async def get(self, employee_uuid: str) -> Optional[Row]:
+        pass
+    
+    @abstractmethod
+    async def exists(self, employee_uuid: str) -> bool:
+        pass
+    
+    @abstractmethod
+    async def delete(self, employee_uuid: str):
+        """Delete an employee and, by cascade, their attendance"""
+    
+    @abstractmethod
+    async def list_page(self, limit: int, after: Optional[List[str]] = None) -> List[Row]:
+        """Up to `limit` employees ordered by (created_at, id) descending, after that key"""
+    
+    @abstractmethod
+    async def count(self, department: Optional[str] = None) -> int:
+        pass
+    
+    @abstractmethod
+    async def existing_ids(self, employee_uuids: Iterable[str]) -> Set[str]:
+        """Which of the given UUIDs belong to an employee"""
+    
+    @abstractmethod
+    async def find_conflicts(self, employee_codes: List[str], emails: List[str]) -> List[Row]:
+        """Existing {"employee_id", "email"} pairs clashing with any of the codes or emails"""
+    
+    @abstractmethod
+    async def attendance_summaries(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        department: Optional[str] = None,
+        employee_uuids: Optional[List[str]] = None,
+        after_code: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        """Attendance counts per employee, ordered by employee code (see get_employee_attendance_summaries)"""
+    
+    @abstractmethod
+    async def department_stats(self) -> List[Row]:
+        """{"department", "count"} per department, largest first"""
+    
+    @abstractmethod
+    async def labels(self, department: Optional[str] = None) -> Dict[str, Row]:
+        """{"id", "employee_id", "full_name", "department"} per employee UUID"""
+
+class AttendanceRepository(ABC):
+    @abstractmethod
+    async def upsert(self, records: List[Row]) -> List[Row]:
+        """Insert or overwrite {"employee_id", "attendance_date", "status"} records, returning the saved rows"""
+    
+    @abstractmethod
+    async def exists(self, attendance_id: str) -> bool:
+        pass
+    
+    @abstractmethod
+    async def update_status(self, attendance_id: str, status: str) -> Optional[Row]:
+        """The updated row, or None when there is no such record"""
+    
+    @abstractmethod
+    async def delete(self, attendance_id: str) -> Optional[Row]:
+        """The deleted row, or None when there was no such record"""
+    
+    @abstractmethod
+    async def list(self, filters: Dict[str, Any], limit: int, after: Optional[List[str]] = None) -> List[Row]:
+        """
+        Up to `limit` rows with their employee embedded, ordered by
+        (attendance_date, id) descending after that key. `filters` holds
+        date, start_date, end_date, employee_id and status_filter.
+        """
+    
+    @abstractmethod
+    async def count(self, filters: Dict[str, Any]) -> int:
+        pass
+    
+    @abstractmethod
+    async def dashboard_metrics(self, today: date, recent_limit: int) -> Row:
+        """The get_dashboard_metrics() object"""
+    
+    @abstractmethod
+    async def trends(self, end_date: date, days: int, department: Optional[str] = None) -> List[Row]:
+        """{"attendance_date", "present", "absent"} for every day of the window"""
+    
+    @abstractmethod
+    async def monthly(self, month: date, through: date, department: Optional[str] = None) -> List[Row]:
+        """{"week", "present", "absent", "total", "rate"} for each 7-day block of the month"""
+    
+    @abstractmethod
+    async def department_daily(self, start_date: date, end_date: date, department: Optional[str] = None) -> List[Row]:
+        """Rollup rows {"attendance_date", "department", "present_count", "absent_count"}"""
+    
+    @abstractmethod
+    async def employee_marks(
+        self,
+        start_date: date,
+        end_date: date,
+        department: Optional[str] = None,
+        employee_uuids: Optional[List[str]] = None
+    ) -> List[Row]:
+        """{"attendance_date", "employee_id", "present"} per attendance row in the range, optionally for some employees only"""
+    
+    @abstractmethod
+    async def mark_page(self, limit: int, after: Optional[List[Any]] = None) -> List[Row]:
+        """Up to `limit` {"id", "attendance_date", "employee_id", "present"} rows ordered by (attendance_date, id) descending, after that key"""
+
+class Storage(ABC):
+    """One storage engine: its repositories plus connection lifecycle and change counters"""
+    
+    name = "abstract"
+    employees: EmployeeRepository
+    attendance: AttendanceRepository
+    
+    async def connect(self):
+        pass
+    
+    async def close(self):
+        pass
+    
+    @abstractmethod
+    async def ping(self):
+        """Round-trip to the backing store, raising when it is unreachable"""
+    
+    @abstractmethod
+    async def table_versions(self, tables: Iterable[str]) -> List[Row]:
+        """{"table_name", "version", "updated_at"} per table, sorted by name"""
@@ -0,0 +1,476 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import uuid4
+from repositories.base import AttendanceRepository, DuplicateKeyError, EmployeeRepository, Row, Storage
+from services.rates import percentage
+
+# Sorts after any UUID or ISO date, for inclusive upper bounds on index tuples
+HIGHEST = "\uffff"
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _remove(index: list, key: tuple):
+    del index[bisect_left(index, key)]
+
+class MemoryTables:
+    """
+    Employees and attendance held in process, with the indexes the queries need:
+    hash indexes on employee id, code and email, a sorted list of employee codes,
+    a sorted (employee_id, attendance_date, id) index for per-employee ranges, a
+    sorted (attendance_date, id) index for date-ordered scans, and the daily
+    rollup the triggers keep in SQL.
+    """
+    
+    def __init__(self):
+        self.employees: Dict[str, Row] = {}
+        self.by_code: Dict[str, str] = {}
+        self.by_email: Dict[str, str] = {}
+        self.by_created: List[Tuple[str, str]] = []
+        self.codes: List[str] = []
+        self.departments: Counter = Counter()
+        
+        self.attendance: Dict[str, Row] = {}
+        self.by_employee_date: List[Tuple[str, str, str]] = []
+        self.by_date: List[Tuple[str, str]] = []
+        # attendance_date -> department -> [present, absent]
+        self.rollup: Dict[str, Dict[str, List[int]]] = {}
+        
+        started = _now()
+        self.versions = {table: {"table_name": table, "version": 0, "updated_at": started} for table in ("employees", "attendance")}
+    
+    def bump(self, table: str):
+        self.versions[table]["version"] += 1
+        self.versions[table]["updated_at"] = _now()
+    
+    # ==================== Employees ====================
+    
+    def check_unique(self, employees: List[Row]):
+        codes, emails = set(), set()
+        for employee in employees:
+            if employee["employee_id"] in self.by_code or employee["employee_id"] in codes:
+                raise DuplicateKeyError("employee_id")
+            if employee["email"] in self.by_email or employee["email"] in emails:
+                raise DuplicateKeyError("email")
+            codes.add(employee["employee_id"])
+            emails.add(employee["email"])
+    
+    def insert_employee(self, employee: Row, created_at: str) -> Row:
+        row = {
+            "id": str(uuid4()),
+            "employee_id": employee["employee_id"],
+            "full_name": employee["full_name"],
+            "email": employee["email"],
+            "department": employee["department"],
+            "created_at": created_at,
+            "updated_at": created_at
+        }
+        self.employees[row["id"]] = row
+        self.by_code[row["employee_id"]] = row["id"]
+        self.by_email[row["email"]] = row["id"]
+        insort(self.by_created, (created_at, row["id"]))
+        insort(self.codes, row["employee_id"])
+        self.departments[row["department"]] += 1
+        return row
+    
+    def delete_employee(self, employee_uuid: str):
+        # ON DELETE CASCADE, while the rollup can still see the employee's department
+        lo, hi = self.employee_range(employee_uuid)
+        for _, _, attendance_id in self.by_employee_date[lo:hi]:
+            self.delete_attendance(attendance_id)
+        
+        row = self.employees.pop(employee_uuid)
+        del self.by_code[row["employee_id"]]
+        del self.by_email[row["email"]]
+        _remove(self.by_created, (row["created_at"], employee_uuid))
+        _remove(self.codes, row["employee_id"])
+        self.departments[row["department"]] -= 1
+        if not self.departments[row["department"]]:
+            del self.departments[row["department"]]
+    
+    # ==================== Attendance ====================
+    
+    def employee_range(self, employee_uuid: str, first: Optional[str] = None, last: Optional[str] = None) -> Tuple[int, int]:
+        """Positions of one employee's rows, optionally within [first, last], in by_employee_date"""
+        lo = bisect_left(self.by_employee_date, (employee_uuid, first or ""))
+        hi = bisect_right(self.by_employee_date, (employee_uuid, last or HIGHEST, HIGHEST))
+        return lo, hi
+    
+    def find_attendance(self, employee_uuid: str, attendance_date: str) -> Optional[Row]:
+        lo, hi = self.employee_range(employee_uuid, attendance_date, attendance_date)
+        return self.attendance[self.by_employee_date[lo][2]] if lo < hi else None
+    
+    def count_rollup(self, row: Row, delta: int):
+        department = self.employees[row["employee_id"]]["department"]
+        day = self.rollup.setdefault(row["attendance_date"], {})
+        counts = day.setdefault(department, [0, 0])
+        counts[0 if row["status"] == "present" else 1] += delta
+        if counts == [0, 0]:
+            del day[department]
+            if not day:
+                del self.rollup[row["attendance_date"]]
+    
+    def upsert_attendance(self, record: Row) -> Row:
+        employee_uuid = str(record["employee_id"])
+        if employee_uuid not in self.employees:
+            raise ValueError(f"Employee {employee_uuid} does not exist")
+        attendance_date = str(record["attendance_date"])
+        
+        row = self.find_attendance(employee_uuid, attendance_date)
+        if row is not None:
+            self.count_rollup(row, -1)
+            row["status"] = record["status"]
+        else:
+            row = {
+                "id": str(uuid4()),
+                "employee_id": employee_uuid,
+                "attendance_date": attendance_date,
+                "status": record["status"],
+                "created_at": _now()
+            }
+            self.attendance[row["id"]] = row
+            insort(self.by_employee_date, (employee_uuid, attendance_date, row["id"]))
+            insort(self.by_date, (attendance_date, row["id"]))
+        self.count_rollup(row, 1)
+        return row
+    
+    def delete_attendance(self, attendance_id: str):
+        row = self.attendance.pop(attendance_id)
+        _remove(self.by_employee_date, (row["employee_id"], row["attendance_date"], attendance_id))
+        _remove(self.by_date, (row["attendance_date"], attendance_id))
+        self.count_rollup(row, -1)
+    
+    def bounds(self, filters: Dict[str, Any], after: Optional[List[str]] = None) -> Tuple[list, int, int, int]:
+        """
+        The index slice [lo, hi) holding the rows that match the date and employee filters
+        (before that key), and the position of the attendance id in its entries
+        """
+        first = last = None
+        if filters.get("date"):
+            first = last = str(filters["date"])
+        if filters.get("start_date") and filters.get("end_date"):
+            first = max(first or "", str(filters["start_date"]))
+            last = min(last or HIGHEST, str(filters["end_date"]))
+        
+        if filters.get("employee_id"):
+            employee_uuid = str(filters["employee_id"])
+            index = self.by_employee_date
+            lo, hi = self.employee_range(employee_uuid, first, last)
+            if after:
+                hi = min(hi, bisect_left(index, (employee_uuid, after[0], after[1])))
+            position = 2
+        else:
+            index = self.by_date
+            lo = bisect_left(index, (first,)) if first else 0
+            hi = bisect_right(index, (last, HIGHEST)) if last else len(index)
+            if after:
+                hi = min(hi, bisect_left(index, (after[0], after[1])))
+            position = 1
+        return index, lo, hi, position
+    
+    def scan(self, filters: Dict[str, Any], after: Optional[List[str]] = None) -> Iterator[Row]:
+        """Rows matching the attendance filters in (attendance_date, id) descending order, after that key"""
+        index, lo, hi, position = self.bounds(filters, after)
+        status_filter = filters.get("status_filter")
+        for i in range(hi - 1, lo - 1, -1):
+            row = self.attendance[index[i][position]]
+            if status_filter is None or row["status"] == status_filter:
+                yield row
+    
+    def with_employee(self, row: Row) -> Row:
+        employee = self.employees[row["employee_id"]]
+        return {
+            **row,
+            "employees": {
+                "full_name": employee["full_name"],
+                "employee_id": employee["employee_id"],
+                "department": employee["department"]
+            }
+        }
+    
+    def daily_counts(self, day: str, department: Optional[str] = None) -> Tuple[int, int]:
+        present = absent = 0
+        for name, counts in self.rollup.get(day, {}).items():
+            if department is None or name == department:
+                present += counts[0]
+                absent += counts[1]
+        return present, absent
+    
+    def range_counts(self, first: date, last: date, department: Optional[str] = None) -> Tuple[int, int]:
+        present = absent = 0
+        day = first
+        while day <= last:
+            day_present, day_absent = self.daily_counts(str(day), department)
+            present += day_present
+            absent += day_absent
+            day += timedelta(days=1)
+        return present, absent
+
+class MemoryEmployeeRepository(EmployeeRepository):
+    """Employees in the process's MemoryTables"""
+    
+    def __init__(self, tables: MemoryTables):
+        self.tables = tables
+    
+    async def create(self, employee: Row) -> Optional[Row]:
+        self.tables.check_unique([employee])
+        row = self.tables.insert_employee(employee, _now())
+        self.tables.bump("employees")
+        return dict(row)
+    
+    async def insert_many(self, employees: List[Row]):
+        self.tables.check_unique(employees)
+        created_at = _now()
+        for employee in employees:
+            self.tables.insert_employee(employee, created_at)
+        self.tables.bump("employees")
+    
+    async def get(self, employee_uuid: str) -> Optional[Row]:
+        row = self.tables.employees.get(str(employee_uuid))
+        return dict(row) if row else None
+    
+    async def exists(self, employee_uuid: str) -> bool:
+        return str(employee_uuid) in self.tables.employees
+    
+    async def delete(self, employee_uuid: str):
+        if str(employee_uuid) in self.tables.employees:
+            self.tables.delete_employee(str(employee_uuid))
+        self.tables.bump("employees")
+        self.tables.bump("attendance")
+    
+    async def list_page(self, limit: int, after: Optional[List[str]] = None) -> List[Row]:
+        index = self.tables.by_created
+        hi = bisect_left(index, (after[0], after[1])) if after else len(index)
+        return [dict(self.tables.employees[employee_uuid]) for _, employee_uuid in reversed(index[max(hi - limit, 0):hi])]
+    
+    async def count(self, department: Optional[str] = None) -> int:
+        if department:
+            return self.tables.departments.get(department, 0)
+        return len(self.tables.employees)
+    
+    async def existing_ids(self, employee_uuids: Iterable[str]) -> Set[str]:
+        return {str(employee_uuid) for employee_uuid in employee_uuids if str(employee_uuid) in self.tables.employees}
+    
+    async def find_conflicts(self, employee_codes: List[str], emails: List[str]) -> List[Row]:
+        matches = {self.tables.by_code[code] for code in employee_codes if code in self.tables.by_code}
+        matches |= {self.tables.by_email[email] for email in emails if email in self.tables.by_email}
+        return [
+            {"employee_id": self.tables.employees[employee_uuid]["employee_id"], "email": self.tables.employees[employee_uuid]["email"]}
+            for employee_uuid in matches
+        ]
+    
+    async def attendance_summaries(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        department: Optional[str] = None,
+        employee_uuids: Optional[List[str]] = None,
+        after_code: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        first = str(start_date) if start_date else None
+        last = str(end_date) if end_date else None
+        
+        if employee_uuids is not None:
+            # Look the requested employees up directly instead of walking every code
+            wanted = {str(employee_uuid) for employee_uuid in employee_uuids}
+            codes = sorted(self.tables.employees[employee_uuid]["employee_id"] for employee_uuid in wanted if employee_uuid in self.tables.employees)
+        else:
+            codes = self.tables.codes
+        start = bisect_right(codes, after_code) if after_code is not None else 0
+        
+        summaries = []
+        for code in codes[start:]:
+            if limit is not None and len(summaries) >= limit:
+                break
+            employee = self.tables.employees[self.tables.by_code[code]]
+            if department and employee["department"] != department:
+                continue
+            
+            lo, hi = self.tables.employee_range(employee["id"], first, last)
+            present = sum(1 for _, _, attendance_id in self.tables.by_employee_date[lo:hi] if self.tables.attendance[attendance_id]["status"] == "present")
+            summaries.append({
+                "employee_id": employee["id"],
+                "employee_name": employee["full_name"],
+                "employee_code": code,
+                "department": employee["department"],
+                "total_days": hi - lo,
+                "present_days": present,
+                "absent_days": hi - lo - present,
+                "attendance_rate": percentage(present, hi - lo, 2)
+            })
+        return summaries
+    
+    async def department_stats(self) -> List[Row]:
+        return [
+            {"department": department, "count": count}
+            for department, count in sorted(self.tables.departments.items(), key=lambda item: (-item[1], item[0]))
+        ]
+    
+    async def labels(self, department: Optional[str] = None) -> Dict[str, Row]:
+        return {
+            employee["id"]: {
+                "id": employee["id"],
+                "employee_id": employee["employee_id"],
+                "full_name": employee["full_name"],
+                "department": employee["department"]
+            }
+            for employee in self.tables.employees.values()
+            if not department or employee["department"] == department
+        }
+
+class MemoryAttendanceRepository(AttendanceRepository):
+    """Attendance in the process's MemoryTables; reports read the in-memory daily rollup"""
+    
+    def __init__(self, tables: MemoryTables):
+        self.tables = tables
+    
+    async def upsert(self, records: List[Row]) -> List[Row]:
+        # Check every employee first so a failing batch writes nothing, like one statement
+        missing = {str(record["employee_id"]) for record in records} - self.tables.employees.keys()
+        if missing:
+            raise ValueError(f"Employee {sorted(missing)[0]} does not exist")
+        saved = [dict(self.tables.upsert_attendance(record)) for record in records]
+        self.tables.bump("attendance")
+        return saved
+    
+    async def exists(self, attendance_id: str) -> bool:
+        return str(attendance_id) in self.tables.attendance
+    
+    async def update_status(self, attendance_id: str, status: str) -> Optional[Row]:
+        row = self.tables.attendance.get(str(attendance_id))
+        if row is None:
+            return None
+        if status not in ("present", "absent"):
+            raise ValueError(f"invalid input value for enum attendance_status: \"{status}\"")
+        self.tables.count_rollup(row, -1)
+        row["status"] = status
+        self.tables.count_rollup(row, 1)
+        self.tables.bump("attendance")
+        return dict(row)
+    
+    async def delete(self, attendance_id: str) -> Optional[Row]:
+        row = self.tables.attendance.get(str(attendance_id))
+        if row is not None:
+            self.tables.delete_attendance(str(attendance_id))
+        self.tables.bump("attendance")
+        return dict(row) if row else None
+    
+    async def list(self, filters: Dict[str, Any], limit: int, after: Optional[List[str]] = None) -> List[Row]:
+        rows = []
+        for row in self.tables.scan(filters, after):
+            if len(rows) >= limit:
+                break
+            rows.append(self.tables.with_employee(row))
+        return rows
+    
+    async def count(self, filters: Dict[str, Any]) -> int:
+        # The date and employee filters are index ranges; only a status filter needs the rows
+        index, lo, hi, position = self.tables.bounds(filters)
+        status_filter = filters.get("status_filter")
+        if status_filter is None:
+            return max(hi - lo, 0)
+        return sum(1 for i in range(lo, hi) if self.tables.attendance[index[i][position]]["status"] == status_filter)
+    
+    async def dashboard_metrics(self, today: date, recent_limit: int) -> Row:
+        present = absent = 0
+        for departments in self.tables.rollup.values():
+            for day_present, day_absent in departments.values():
+                present += day_present
+                absent += day_absent
+        today_present, today_absent = self.tables.daily_counts(str(today))
+        recent = self.tables.by_created[-recent_limit:] if recent_limit > 0 else []
+        return {
+            "total_employees": len(self.tables.employees),
+            "total_attendance_records": present + absent,
+            "today_present": today_present,
+            "today_absent": today_absent,
+            "total_absent": absent,
+            "overall_attendance_rate": percentage(present, present + absent, 2),
+            "recent_employees": [dict(self.tables.employees[employee_uuid]) for _, employee_uuid in reversed(recent)]
+        }
+    
+    async def trends(self, end_date: date, days: int, department: Optional[str] = None) -> List[Row]:
+        rows = []
+        for offset in range(days - 1, -1, -1):
+            day = str(end_date - timedelta(days=offset))
+            present, absent = self.tables.daily_counts(day, department)
+            rows.append({"attendance_date": day, "present": present, "absent": absent})
+        return rows
+    
+    async def monthly(self, month: date, through: date, department: Optional[str] = None) -> List[Row]:
+        first_day = month.replace(day=1)
+        next_month = (first_day + timedelta(days=32)).replace(day=1)
+        last_day = min(next_month - timedelta(days=1), through)
+        
+        rows = []
+        week = 1
+        while last_day >= first_day + timedelta(days=(week - 1) * 7):
+            start = first_day + timedelta(days=(week - 1) * 7)
+            present, absent = self.tables.range_counts(start, min(start + timedelta(days=6), last_day), department)
+            rows.append({
+                "week": f"Week {week}",
+                "present": present,
+                "absent": absent,
+                "total": present + absent,
+                "rate": percentage(present, present + absent, 1)
+            })
+            week += 1
+        return rows
+    
+    async def department_daily(self, start_date: date, end_date: date, department: Optional[str] = None) -> List[Row]:
+        rows = []
+        day = start_date
+        while day <= end_date:
+            for name, (present, absent) in sorted(self.tables.rollup.get(str(day), {}).items()):
+                if department is None or name == department:
+                    rows.append({"attendance_date": str(day), "department": name, "present_count": present, "absent_count": absent})
+            day += timedelta(days=1)
+        return rows
+    
+    async def employee_marks(
+        self,
+        start_date: date,
+        end_date: date,
+        department: Optional[str] = None,
+        employee_uuids: Optional[List[str]] = None
+    ) -> List[Row]:
+        if employee_uuids is not None:
+            rows = [
+                row
+                for employee_uuid in employee_uuids
+                for row in self.tables.scan({"start_date": start_date, "end_date": end_date, "employee_id": employee_uuid})
+            ]
+        else:
+            rows = self.tables.scan({"start_date": start_date, "end_date": end_date})
+        return [
+            {"attendance_date": row["attendance_date"], "employee_id": row["employee_id"], "present": row["status"] == "present"}
+            for row in rows
+            if department is None or self.tables.employees[row["employee_id"]]["department"] == department
+        ]
+    
+    async def mark_page(self, limit: int, after: Optional[List[Any]] = None) -> List[Row]:
+        rows = []
+        for row in self.tables.scan({}, [str(value) for value in after] if after else None):
+            if len(rows) >= limit:
+                break
+            rows.append({"id": row["id"], "attendance_date": row["attendance_date"], "employee_id": row["employee_id"], "present": row["status"] == "present"})
+        return rows
+
+class MemoryStorage(Storage):
+    """Everything in process memory; data lives as long as the process (tests, benchmarks, local runs)"""
+    
+    name = "memory"
+    
+    def __init__(self):
+        self.tables = MemoryTables()
+        self.employees = MemoryEmployeeRepository(self.tables)
+        self.attendance = MemoryAttendanceRepository(self.tables)
+    
+    async def ping(self):
+        pass
+    
+    async def table_versions(self, tables: Iterable[str]) -> List[Row]:
+        return [dict(self.tables.versions[table]) for table in sorted(tables)]
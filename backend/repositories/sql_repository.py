@@ -0,0 +1,289 @@
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+import asyncpg
+from config import settings
+from database.connection import db
+from repositories.base import AttendanceRepository, DuplicateKeyError, EmployeeRepository, Row, Storage
+
+EMPLOYEE_COLUMNS = ["employee_id", "full_name", "email", "department"]
+
+ATTENDANCE_SELECT = (
+    "SELECT a.id, a.employee_id, a.attendance_date, a.status::text AS status, a.created_at, "
+    "e.full_name, e.employee_id AS employee_code, e.department "
+    "FROM attendance a JOIN employees e ON e.id = a.employee_id"
+)
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def json_row(record) -> Row:
+    """An asyncpg record in PostgREST's JSON shape (UUIDs, dates and timestamps as strings)"""
+    return {key: _json_value(value) for key, value in record.items()}
+
+def _attendance_row(record) -> Row:
+    row = json_row(record)
+    row["employees"] = {
+        "full_name": row.pop("full_name"),
+        "employee_id": row.pop("employee_code"),
+        "department": row.pop("department")
+    }
+    return row
+
+def _as_date(value: Any) -> date:
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+def attendance_where(filters: Dict[str, Any], params: List[Any]) -> List[str]:
+    """SQL conditions for the shared attendance filters, appending their values to `params`"""
+    conditions = []
+    
+    def param(value: Any) -> str:
+        params.append(value)
+        return f"${len(params)}"
+    
+    if filters.get("date"):
+        conditions.append(f"a.attendance_date = {param(_as_date(filters['date']))}")
+    if filters.get("start_date") and filters.get("end_date"):
+        conditions.append(f"a.attendance_date >= {param(_as_date(filters['start_date']))}")
+        conditions.append(f"a.attendance_date <= {param(_as_date(filters['end_date']))}")
+    if filters.get("employee_id"):
+        conditions.append(f"a.employee_id = {param(str(filters['employee_id']))}::uuid")
+    if filters.get("status_filter"):
+        conditions.append(f"a.status::text = {param(filters['status_filter'])}")
+    return conditions
+
+class PostgresEmployeeRepository(EmployeeRepository):
+    """Employees over the direct asyncpg pool"""
+    
+    async def create(self, employee: Row) -> Optional[Row]:
+        try:
+            record = await db.fetchrow(
+                "INSERT INTO employees (employee_id, full_name, email, department) "
+                "VALUES ($1, $2, $3, $4) RETURNING *",
+                *(employee[column] for column in EMPLOYEE_COLUMNS)
+            )
+        except asyncpg.UniqueViolationError as e:
+            field = "employee_id" if "employee_id" in (e.constraint_name or "") else "email"
+            raise DuplicateKeyError(field, str(e))
+        return json_row(record) if record else None
+    
+    async def insert_many(self, employees: List[Row]):
+        records = [tuple(employee[column] for column in EMPLOYEE_COLUMNS) for employee in employees]
+        await db.copy_records("employees", records, EMPLOYEE_COLUMNS)
+    
+    async def get(self, employee_uuid: str) -> Optional[Row]:
+        record = await db.fetchrow("SELECT * FROM employees WHERE id = $1::uuid", str(employee_uuid))
+        return json_row(record) if record else None
+    
+    async def exists(self, employee_uuid: str) -> bool:
+        return await db.fetchval("SELECT EXISTS (SELECT 1 FROM employees WHERE id = $1::uuid)", str(employee_uuid))
+    
+    async def delete(self, employee_uuid: str):
+        await db.execute("DELETE FROM employees WHERE id = $1::uuid", str(employee_uuid))
+    
+    async def list_page(self, limit: int, after: Optional[List[str]] = None) -> List[Row]:
+        if after:
+            records = await db.fetch(
+                "SELECT * FROM employees WHERE (created_at, id) < ($1, $2::uuid) "
+                "ORDER BY created_at DESC, id DESC LIMIT $3",
+                datetime.fromisoformat(after[0]), after[1], limit
+            )
+        else:
+            records = await db.fetch("SELECT * FROM employees ORDER BY created_at DESC, id DESC LIMIT $1", limit)
+        return [json_row(record) for record in records]
+    
+    async def count(self, department: Optional[str] = None) -> int:
+        return await db.fetchval(
+            "SELECT COUNT(*) FROM employees WHERE ($1::text IS NULL OR department = $1)",
+            department
+        )
+    
+    async def existing_ids(self, employee_uuids: Iterable[str]) -> Set[str]:
+        records = await db.fetch(
+            "SELECT id::text AS id FROM employees WHERE id = ANY($1::uuid[])",
+            [str(employee_uuid) for employee_uuid in employee_uuids]
+        )
+        return {record["id"] for record in records}
+    
+    async def find_conflicts(self, employee_codes: List[str], emails: List[str]) -> List[Row]:
+        return await db.rpc("find_employee_conflicts", {
+            "p_employee_ids": employee_codes,
+            "p_emails": emails
+        })
+    
+    async def attendance_summaries(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        department: Optional[str] = None,
+        employee_uuids: Optional[List[str]] = None,
+        after_code: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        return await db.rpc("get_employee_attendance_summaries", {
+            "p_start_date": start_date,
+            "p_end_date": end_date,
+            "p_department": department,
+            "p_employee_ids": [str(u) for u in employee_uuids] if employee_uuids is not None else None,
+            "p_after_code": after_code,
+            "p_limit": limit
+        })
+    
+    async def department_stats(self) -> List[Row]:
+        return await db.rpc("get_department_stats")
+    
+    async def labels(self, department: Optional[str] = None) -> Dict[str, Row]:
+        records = await db.fetch(
+            "SELECT id::text AS id, employee_id, full_name, department FROM employees "
+            "WHERE ($1::text IS NULL OR department = $1)",
+            department
+        )
+        return {record["id"]: dict(record) for record in records}
+
+class PostgresAttendanceRepository(AttendanceRepository):
+    """Attendance over the direct asyncpg pool"""
+    
+    async def upsert(self, records: List[Row]) -> List[Row]:
+        # One multi-row statement; callers pass at most one record per employee/date
+        rows = await db.fetch(
+            "INSERT INTO attendance (employee_id, attendance_date, status) "
+            "SELECT employee_id, attendance_date, status::attendance_status "
+            "FROM unnest($1::uuid[], $2::date[], $3::text[]) AS t(employee_id, attendance_date, status) "
+            "ON CONFLICT (employee_id, attendance_date) DO UPDATE SET status = EXCLUDED.status "
+            "RETURNING id, employee_id, attendance_date, status::text AS status, created_at",
+            [str(record["employee_id"]) for record in records],
+            [_as_date(record["attendance_date"]) for record in records],
+            [record["status"] for record in records]
+        )
+        return [json_row(row) for row in rows]
+    
+    async def exists(self, attendance_id: str) -> bool:
+        return await db.fetchval("SELECT EXISTS (SELECT 1 FROM attendance WHERE id = $1::uuid)", str(attendance_id))
+    
+    async def update_status(self, attendance_id: str, status: str) -> Optional[Row]:
+        record = await db.fetchrow(
+            "UPDATE attendance SET status = $2::attendance_status WHERE id = $1::uuid "
+            "RETURNING id, employee_id, attendance_date, status::text AS status, created_at",
+            str(attendance_id), status
+        )
+        return json_row(record) if record else None
+    
+    async def delete(self, attendance_id: str) -> Optional[Row]:
+        record = await db.fetchrow(
+            "DELETE FROM attendance WHERE id = $1::uuid "
+            "RETURNING id, employee_id, attendance_date, status::text AS status, created_at",
+            str(attendance_id)
+        )
+        return json_row(record) if record else None
+    
+    async def list(self, filters: Dict[str, Any], limit: int, after: Optional[List[str]] = None) -> List[Row]:
+        params: List[Any] = []
+        conditions = attendance_where(filters, params)
+        if after:
+            params.extend([_as_date(after[0]), after[1]])
+            conditions.append(f"(a.attendance_date, a.id) < (${len(params) - 1}, ${len(params)}::uuid)")
+        params.append(limit)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        records = await db.fetch(
+            f"{ATTENDANCE_SELECT}{where} ORDER BY a.attendance_date DESC, a.id DESC LIMIT ${len(params)}",
+            *params
+        )
+        return [_attendance_row(record) for record in records]
+    
+    async def count(self, filters: Dict[str, Any]) -> int:
+        params: List[Any] = []
+        conditions = attendance_where(filters, params)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return await db.fetchval(f"SELECT COUNT(*) FROM attendance a{where}", *params)
+    
+    async def dashboard_metrics(self, today: date, recent_limit: int) -> Row:
+        return await db.rpc_value("get_dashboard_metrics", {
+            "p_today": today,
+            "p_recent_limit": recent_limit
+        })
+    
+    async def trends(self, end_date: date, days: int, department: Optional[str] = None) -> List[Row]:
+        return await db.rpc("get_attendance_trends", {
+            "p_end_date": end_date,
+            "p_days": days,
+            "p_department": department
+        })
+    
+    async def monthly(self, month: date, through: date, department: Optional[str] = None) -> List[Row]:
+        return await db.rpc("get_monthly_attendance", {
+            "p_month": month,
+            "p_through": through,
+            "p_department": department
+        })
+    
+    async def department_daily(self, start_date: date, end_date: date, department: Optional[str] = None) -> List[Row]:
+        records = await db.fetch(
+            "SELECT attendance_date, department, present_count, absent_count "
+            "FROM attendance_daily_rollup "
+            "WHERE attendance_date BETWEEN $1 AND $2 AND ($3::text IS NULL OR department = $3)",
+            start_date, end_date, department
+        )
+        return [dict(record) for record in records]
+    
+    async def employee_marks(
+        self,
+        start_date: date,
+        end_date: date,
+        department: Optional[str] = None,
+        employee_uuids: Optional[List[str]] = None
+    ) -> List[Row]:
+        records = await db.fetch(
+            "SELECT a.attendance_date, a.employee_id::text AS employee_id, a.status = 'present' AS present "
+            "FROM attendance a JOIN employees e ON e.id = a.employee_id "
+            "WHERE a.attendance_date BETWEEN $1 AND $2 AND ($3::text IS NULL OR e.department = $3) "
+            "AND ($4::uuid[] IS NULL OR a.employee_id = ANY($4::uuid[]))",
+            start_date, end_date, department,
+            [str(employee_uuid) for employee_uuid in employee_uuids] if employee_uuids is not None else None
+        )
+        return [dict(record) for record in records]
+    
+    async def mark_page(self, limit: int, after: Optional[List[Any]] = None) -> List[Row]:
+        select = (
+            "SELECT id::text AS id, attendance_date, employee_id::text AS employee_id, status = 'present' AS present "
+            "FROM attendance"
+        )
+        if after:
+            records = await db.fetch(
+                f"{select} WHERE (attendance_date, id) < ($1, $2::uuid) ORDER BY attendance_date DESC, id DESC LIMIT $3",
+                _as_date(after[0]), after[1], limit
+            )
+        else:
+            records = await db.fetch(f"{select} ORDER BY attendance_date DESC, id DESC LIMIT $1", limit)
+        return [dict(record) for record in records]
+
+class PostgresStorage(Storage):
+    """Direct SQL over the asyncpg pool only; no Supabase client is created"""
+    
+    name = "postgres"
+    
+    def __init__(self):
+        self.employees = PostgresEmployeeRepository()
+        self.attendance = PostgresAttendanceRepository()
+    
+    async def connect(self):
+        if not settings.database_url:
+            raise RuntimeError("STORAGE_BACKEND=postgres requires DATABASE_URL to be configured")
+        await db.connect_pool()
+    
+    async def close(self):
+        await db.disconnect()
+    
+    async def ping(self):
+        await db.fetchval("SELECT 1")
+    
+    async def table_versions(self, tables: Iterable[str]) -> List[Row]:
+        records = await db.fetch(
+            "SELECT table_name, version, updated_at FROM table_versions "
+            "WHERE table_name = ANY($1::text[]) ORDER BY table_name",
+            sorted(tables)
+        )
+        return [json_row(record) for record in records]
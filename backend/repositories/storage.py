@@ -0,0 +1,17 @@
+from config import settings
+from repositories.base import Storage
+from repositories.memory_repository import MemoryStorage
+from repositories.sql_repository import PostgresStorage
+from repositories.supabase_repository import SupabaseStorage
+
+def create_storage() -> Storage:
+    if settings.storage_backend == "supabase":
+        return SupabaseStorage()
+    if settings.storage_backend == "postgres":
+        return PostgresStorage()
+    if settings.storage_backend == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND '{settings.storage_backend}' (expected 'supabase', 'postgres' or 'memory')")
+
+# Global storage the routes and services read and write through
+storage = create_storage()
@@ -0,0 +1,270 @@
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+from config import settings
+from database.connection import db
+from repositories.base import AttendanceRepository, DuplicateKeyError, EmployeeRepository, Row, Storage
+from repositories.sql_repository import PostgresAttendanceRepository, PostgresEmployeeRepository
+from services.pagination import keyset_filter
+
+ATTENDANCE_WITH_EMPLOYEE = "*, employees(full_name, employee_id, department)"
+
+def apply_attendance_filters(
+    query,
+    date: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    employee_id: Optional[UUID] = None,
+    status_filter: Optional[str] = None
+):
+    """Apply the shared attendance filters to a PostgREST query"""
+    if date:
+        query = query.eq("attendance_date", date)
+    if start_date and end_date:
+        query = query.gte("attendance_date", start_date).lte("attendance_date", end_date)
+    if employee_id:
+        query = query.eq("employee_id", str(employee_id))
+    if status_filter:
+        query = query.eq("status", status_filter)
+    return query
+
+async def fetch_all(build_query) -> List[Row]:
+    """Page through a PostgREST query, which caps the rows returned per request"""
+    rows: List[Row] = []
+    chunk = settings.export_chunk_size
+    while True:
+        response = await db.run(build_query().range(len(rows), len(rows) + chunk - 1))
+        rows.extend(response.data)
+        if len(response.data) < chunk:
+            return rows
+
+class SupabaseEmployeeRepository(EmployeeRepository):
+    """Employees through PostgREST; database functions, COPY and bulk reads use the direct pool when configured"""
+    
+    def __init__(self):
+        self.sql = PostgresEmployeeRepository()
+    
+    async def create(self, employee: Row) -> Optional[Row]:
+        try:
+            response = await db.run(db.table("employees").insert(employee))
+        except Exception as e:
+            error_msg = str(e)
+            if "duplicate" in error_msg.lower() or "unique" in error_msg.lower():
+                if "employee_id" in error_msg:
+                    raise DuplicateKeyError("employee_id", error_msg)
+                if "email" in error_msg:
+                    raise DuplicateKeyError("email", error_msg)
+            raise
+        return response.data[0] if response.data else None
+    
+    async def insert_many(self, employees: List[Row]):
+        if db.pool is not None:
+            await self.sql.insert_many(employees)
+        else:
+            await db.run(db.table("employees").insert(employees))
+    
+    async def get(self, employee_uuid: str) -> Optional[Row]:
+        response = await db.run(db.table("employees").select("*").eq("id", str(employee_uuid)))
+        return response.data[0] if response.data else None
+    
+    async def exists(self, employee_uuid: str) -> bool:
+        response = await db.run(db.table("employees").select("id").eq("id", str(employee_uuid)))
+        return bool(response.data)
+    
+    async def delete(self, employee_uuid: str):
+        await db.run(db.table("employees").delete().eq("id", str(employee_uuid)))
+    
+    async def list_page(self, limit: int, after: Optional[List[str]] = None) -> List[Row]:
+        query = db.table("employees").select("*")
+        if after:
+            query = query.or_(keyset_filter(["created_at", "id"], after))
+        response = await db.run(query
+            .order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(limit))
+        return response.data
+    
+    async def count(self, department: Optional[str] = None) -> int:
+        query = db.table("employees").select("id", count="exact", head=True)
+        if department:
+            query = query.eq("department", department)
+        response = await db.run(query)
+        return response.count or 0
+    
+    async def existing_ids(self, employee_uuids: Iterable[str]) -> Set[str]:
+        rows = await db.rpc("filter_existing_employee_ids", {"p_ids": list(employee_uuids)})
+        return {str(row["id"]) for row in rows}
+    
+    async def find_conflicts(self, employee_codes: List[str], emails: List[str]) -> List[Row]:
+        return await db.rpc("find_employee_conflicts", {
+            "p_employee_ids": employee_codes,
+            "p_emails": emails
+        })
+    
+    async def attendance_summaries(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        department: Optional[str] = None,
+        employee_uuids: Optional[List[str]] = None,
+        after_code: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        return await db.rpc("get_employee_attendance_summaries", {
+            "p_start_date": start_date,
+            "p_end_date": end_date,
+            "p_department": department,
+            "p_employee_ids": employee_uuids,
+            "p_after_code": after_code,
+            "p_limit": limit
+        })
+    
+    async def department_stats(self) -> List[Row]:
+        return await db.rpc("get_department_stats")
+    
+    async def labels(self, department: Optional[str] = None) -> Dict[str, Row]:
+        if db.pool is not None:
+            return await self.sql.labels(department)
+        
+        def build_query():
+            query = db.table("employees").select("id, employee_id, full_name, department")
+            if department:
+                query = query.eq("department", department)
+            return query.order("id")
+        return {row["id"]: row for row in await fetch_all(build_query)}
+
+class SupabaseAttendanceRepository(AttendanceRepository):
+    """Attendance through PostgREST; reports use the database functions and bulk reads the pool when configured"""
+    
+    def __init__(self):
+        self.sql = PostgresAttendanceRepository()
+    
+    async def upsert(self, records: List[Row]) -> List[Row]:
+        response = await db.run(db.table("attendance").upsert(records, on_conflict="employee_id,attendance_date"))
+        return response.data
+    
+    async def exists(self, attendance_id: str) -> bool:
+        response = await db.run(db.table("attendance").select("id").eq("id", str(attendance_id)))
+        return bool(response.data)
+    
+    async def update_status(self, attendance_id: str, status: str) -> Optional[Row]:
+        response = await db.run(db.table("attendance").update({"status": status}).eq("id", str(attendance_id)))
+        return response.data[0] if response.data else None
+    
+    async def delete(self, attendance_id: str) -> Optional[Row]:
+        response = await db.run(db.table("attendance").delete().eq("id", str(attendance_id)))
+        return response.data[0] if response.data else None
+    
+    async def list(self, filters: Dict[str, Any], limit: int, after: Optional[List[str]] = None) -> List[Row]:
+        query = apply_attendance_filters(db.table("attendance").select(ATTENDANCE_WITH_EMPLOYEE), **filters)
+        if after:
+            query = query.or_(keyset_filter(["attendance_date", "id"], after))
+        response = await db.run(query
+            .order("attendance_date", desc=True)
+            .order("id", desc=True)
+            .limit(limit))
+        return response.data
+    
+    async def count(self, filters: Dict[str, Any]) -> int:
+        query = db.table("attendance").select("id", count="exact", head=True)
+        response = await db.run(apply_attendance_filters(query, **filters))
+        return response.count or 0
+    
+    async def dashboard_metrics(self, today: date, recent_limit: int) -> Row:
+        return await db.rpc_value("get_dashboard_metrics", {
+            "p_today": today,
+            "p_recent_limit": recent_limit
+        })
+    
+    async def trends(self, end_date: date, days: int, department: Optional[str] = None) -> List[Row]:
+        return await db.rpc("get_attendance_trends", {
+            "p_end_date": end_date,
+            "p_days": days,
+            "p_department": department
+        })
+    
+    async def monthly(self, month: date, through: date, department: Optional[str] = None) -> List[Row]:
+        return await db.rpc("get_monthly_attendance", {
+            "p_month": month,
+            "p_through": through,
+            "p_department": department
+        })
+    
+    async def department_daily(self, start_date: date, end_date: date, department: Optional[str] = None) -> List[Row]:
+        if db.pool is not None:
+            return await self.sql.department_daily(start_date, end_date, department)
+        
+        def build_query():
+            query = db.table("attendance_daily_rollup")\
+                .select("attendance_date, department, present_count, absent_count")\
+                .gte("attendance_date", str(start_date))\
+                .lte("attendance_date", str(end_date))
+            if department:
+                query = query.eq("department", department)
+            return query.order("attendance_date").order("department")
+        return await fetch_all(build_query)
+    
+    async def employee_marks(
+        self,
+        start_date: date,
+        end_date: date,
+        department: Optional[str] = None,
+        employee_uuids: Optional[List[str]] = None
+    ) -> List[Row]:
+        if db.pool is not None:
+            return await self.sql.employee_marks(start_date, end_date, department, employee_uuids)
+        
+        def build_query():
+            query = db.table("attendance")\
+                .select("id, attendance_date, employee_id, status, employees!inner(department)")\
+                .gte("attendance_date", str(start_date))\
+                .lte("attendance_date", str(end_date))
+            if department:
+                query = query.eq("employees.department", department)
+            if employee_uuids is not None:
+                query = query.in_("employee_id", [str(employee_uuid) for employee_uuid in employee_uuids])
+            return query.order("id")
+        return [
+            {**row, "present": row["status"] == "present"}
+            for row in await fetch_all(build_query)
+        ]
+    
+    async def mark_page(self, limit: int, after: Optional[List[Any]] = None) -> List[Row]:
+        if db.pool is not None:
+            return await self.sql.mark_page(limit, after)
+        
+        query = db.table("attendance").select("id, attendance_date, employee_id, status")
+        if after:
+            query = query.or_(keyset_filter(["attendance_date", "id"], [str(value) for value in after]))
+        response = await db.run(query
+            .order("attendance_date", desc=True)
+            .order("id", desc=True)
+            .limit(limit))
+        return [
+            {"id": row["id"], "attendance_date": row["attendance_date"], "employee_id": row["employee_id"], "present": row["status"] == "present"}
+            for row in response.data
+        ]
+
+class SupabaseStorage(Storage):
+    """Supabase (PostgREST), plus the direct Postgres pool when DATABASE_URL is set"""
+    
+    name = "supabase"
+    
+    def __init__(self):
+        self.employees = SupabaseEmployeeRepository()
+        self.attendance = SupabaseAttendanceRepository()
+    
+    async def connect(self):
+        await db.connect()
+    
+    async def close(self):
+        await db.disconnect()
+    
+    async def ping(self):
+        await db.ping()
+    
+    async def table_versions(self, tables: Iterable[str]) -> List[Row]:
+        response = await db.run(db.table("table_versions")
+            .select("table_name, version, updated_at")
+            .in_("table_name", sorted(tables)))
+        return sorted(response.data, key=lambda row: row["table_name"])
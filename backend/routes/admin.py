@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from models.schemas import SuccessResponse
+from services.cache import cache
+from services.events import broadcaster
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Get hit/miss counters and sizes for every response cache"""
+    return cache.stats()
+
+@router.delete("/cache", response_model=SuccessResponse)
+async def clear_cache():
+    """Drop every cached response"""
+    await cache.clear()
+    return SuccessResponse(success=True, message="Cache cleared")
+
+@router.get("/events")
+async def get_event_stats():
+    """Get connected clients and delivery counters for the live event stream"""
+    return broadcaster.stats()
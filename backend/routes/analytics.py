@@ -1,41 +1,81 @@
-from fastapi import APIRouter, HTTPException, status
-from database.connection import db
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response
+from typing import Optional
+from config import settings
+from repositories.storage import storage
+from services.attendance_store import attendance_store
+from services.cache import cache
+from services.conditional import check_conditional
+from services.responses import json_response
+from services.attendance_analytics import Granularity, GroupBy, attendance_report
 from datetime import date, timedelta
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
+async def load_attendance_trends(end_date: date, days: int, department: Optional[str] = None) -> list:
+    """Daily present/absent counts for the window, zero-filled"""
+    source = attendance_store if attendance_store.enabled else storage.attendance
+    rows = await source.trends(end_date, days, department)
+    return [
+        {"date": str(row["attendance_date"]), "present": row["present"], "absent": row["absent"]}
+        for row in rows
+    ]
+
+async def load_department_stats() -> list:
+    """Employee count per department, largest first"""
+    rows = await storage.employees.department_stats()
+    return [{"department": row["department"], "count": row["count"]} for row in rows]
+
+async def load_monthly_attendance(month: date, through: date, department: Optional[str] = None) -> list:
+    """Weekly present/absent counts and rate for a month, up to `through`"""
+    source = attendance_store if attendance_store.enabled else storage.attendance
+    rows = await source.monthly(month, through, department)
+    return [
+        {
+            "week": row["week"],
+            "present": row["present"],
+            "absent": row["absent"],
+            "total": row["total"],
+            "rate": float(row["rate"])
+        }
+        for row in rows
+    ]
+
+def parse_month(month: Optional[str], today: date) -> date:
+    """First day of a YYYY-MM month (default: the current month)"""
+    if month is None:
+        return date(today.year, today.month, 1)
+    try:
+        year, month_num = (int(part) for part in month.split("-"))
+        return date(year, month_num, 1)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid month '{month}', expected YYYY-MM"
+        )
+
 @router.get("/attendance-trends")
-async def get_attendance_trends():
-    """Get attendance trends for the last 7 days"""
+async def get_attendance_trends(
+    request: Request,
+    response: Response,
+    days: int = Query(7, ge=1, le=366),
+    end_date: Optional[date] = Query(None, description="Last day of the window (default: today)"),
+    department: Optional[str] = Query(None)
+):
+    """Get daily attendance trends for the last N days"""
     try:
-        # Get last 7 days of attendance data
-        end_date = date.today()
-        start_date = end_date - timedelta(days=6)
-        
-        attendance_response = db.client.table("attendance")\
-            .select("attendance_date, status")\
-            .gte("attendance_date", str(start_date))\
-            .lte("attendance_date", str(end_date))\
-            .execute()
-        
-        # Group by date and status
-        trends = {}
-        for record in attendance_response.data:
-            date_str = record["attendance_date"]
-            if date_str not in trends:
-                trends[date_str] = {"date": date_str, "present": 0, "absent": 0}
-            trends[date_str][record["status"]] += 1
+        end_date = end_date or date.today()
         
-        # Fill missing dates with zeros
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = str(current_date)
-            if date_str not in trends:
-                trends[date_str] = {"date": date_str, "present": 0, "absent": 0}
-            current_date += timedelta(days=1)
+        not_modified, headers = await check_conditional(request, ["employees", "attendance"], end_date)
+        if not_modified:
+            return not_modified
+        response.headers.update(headers)
         
-        result = sorted(trends.values(), key=lambda x: x["date"])
-        return result
+        result = await cache.get_or_load(
+            "analytics",
+            ("attendance-trends", end_date, days, department, headers["ETag"]),
+            lambda: load_attendance_trends(end_date, days, department)
+        )
+        return json_response(result, response)
     
     except Exception as e:
         raise HTTPException(
@@ -44,19 +84,20 @@ async def get_attendance_trends():
         )
 
 @router.get("/department-stats")
-async def get_department_stats():
+async def get_department_stats(request: Request, response: Response):
     """Get employee count by department"""
     try:
-        employees_response = db.client.table("employees").select("department").execute()
-        
-        # Count by department
-        dept_count = {}
-        for emp in employees_response.data:
-            dept = emp["department"]
-            dept_count[dept] = dept_count.get(dept, 0) + 1
+        not_modified, headers = await check_conditional(request, ["employees"])
+        if not_modified:
+            return not_modified
+        response.headers.update(headers)
         
-        result = [{"department": k, "count": v} for k, v in dept_count.items()]
-        return sorted(result, key=lambda x: x["count"], reverse=True)
+        result = await cache.get_or_load(
+            "department_stats",
+            ("department-stats", headers["ETag"]),
+            load_department_stats
+        )
+        return json_response(result, response)
     
     except Exception as e:
         raise HTTPException(
@@ -65,46 +106,79 @@ async def get_department_stats():
         )
 
 @router.get("/monthly-attendance")
-async def get_monthly_attendance():
-    """Get attendance rate for the current month by week"""
+async def get_monthly_attendance(
+    request: Request,
+    response: Response,
+    month: Optional[str] = Query(None, description="Month as YYYY-MM (default: current month)"),
+    department: Optional[str] = Query(None)
+):
+    """Get attendance rate for a month by week"""
     try:
-        # Get first day of current month
         today = date.today()
-        first_day = date(today.year, today.month, 1)
+        first_day = parse_month(month, today)
         
-        attendance_response = db.client.table("attendance")\
-            .select("attendance_date, status")\
-            .gte("attendance_date", str(first_day))\
-            .lte("attendance_date", str(today))\
-            .execute()
+        not_modified, headers = await check_conditional(request, ["employees", "attendance"], today)
+        if not_modified:
+            return not_modified
+        response.headers.update(headers)
         
-        # Group by week
-        weekly_data = {}
-        for record in attendance_response.data:
-            att_date = date.fromisoformat(record["attendance_date"])
-            week_num = (att_date.day - 1) // 7 + 1
-            week_key = f"Week {week_num}"
-            
-            if week_key not in weekly_data:
-                weekly_data[week_key] = {"week": week_key, "present": 0, "absent": 0, "total": 0}
-            
-            weekly_data[week_key]["total"] += 1
-            if record["status"] == "present":
-                weekly_data[week_key]["present"] += 1
-            else:
-                weekly_data[week_key]["absent"] += 1
+        result = await cache.get_or_load(
+            "analytics",
+            ("monthly-attendance", first_day, today, department, headers["ETag"]),
+            lambda: load_monthly_attendance(first_day, today, department)
+        )
+        return json_response(result, response)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching monthly attendance: {str(e)}"
+        )
+
+@router.get("/attendance")
+async def get_attendance_report(
+    request: Request,
+    response: Response,
+    start_date: Optional[date] = Query(None, description="First day (default: 30 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Last day (default: today)"),
+    granularity: Granularity = Query("day"),
+    group_by: GroupBy = Query("department"),
+    department: Optional[str] = Query(None)
+):
+    """Get present/absent counts and rates per department or employee for each day, week or month"""
+    try:
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=29)
         
-        # Calculate rate
-        for week in weekly_data.values():
-            if week["total"] > 0:
-                week["rate"] = round((week["present"] / week["total"]) * 100, 1)
-            else:
-                week["rate"] = 0
+        if start_date > end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start_date must be on or before end_date"
+            )
+        if (end_date - start_date).days >= settings.analytics_max_days:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Date range cannot exceed {settings.analytics_max_days} days"
+            )
         
-        return sorted(weekly_data.values(), key=lambda x: x["week"])
+        not_modified, headers = await check_conditional(request, ["employees", "attendance"], start_date, end_date)
+        if not_modified:
+            return not_modified
+        response.headers.update(headers)
+        
+        result = await cache.get_or_load(
+            "analytics",
+            ("attendance", start_date, end_date, granularity, group_by, department, headers["ETag"]),
+            lambda: attendance_report(start_date, end_date, granularity, group_by, department)
+        )
+        return json_response(result, response)
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching monthly attendance: {str(e)}"
+            detail=f"Error fetching attendance report: {str(e)}"
         )
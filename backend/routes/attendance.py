@@ -1,42 +1,61 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Literal, Optional, Tuple, Union
 from uuid import UUID
 from datetime import date as dt_date
+import csv
+import io
+from pydantic import ValidationError
 from models.schemas import (
-    AttendanceCreate, AttendanceResponse,
-    AttendanceWithEmployee, SuccessResponse
+    AttendanceCreate, AttendanceResponse, AttendanceBulkCreate,
+    AttendanceBulkItemResult, AttendanceBulkResult,
+    AttendanceWithEmployee, AttendancePage, AttendanceNormalizedPage, SuccessResponse
 )
+from config import settings
 from database.connection import db
+from repositories.storage import storage
+from services.attendance_bitmaps import attendance_bitmaps, count_attendance
+from services.attendance_store import attendance_store
+from services.cache import cache
+from services.events import metrics_feed
+from services.conditional import check_conditional
+from services.responses import json_response
+from services.pagination import DATE_ID, encode_cursor, decode_cursor
+from services.validation import format_validation_errors
 
 router = APIRouter(prefix="/api/attendance", tags=["attendance"])
 
+AttendanceShape = Literal["flat", "normalized"]
+
 @router.post("", response_model=AttendanceResponse, status_code=status.HTTP_201_CREATED)
 async def mark_attendance(attendance: AttendanceCreate):
     """Mark attendance for an employee"""
     try:
         # Check if employee exists
-        emp_response = db.client.table("employees").select("id").eq("id", str(attendance.employee_id)).execute()
-        
-        if not emp_response.data:
+        if not await storage.employees.exists(str(attendance.employee_id)):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Employee with ID {attendance.employee_id} not found"
             )
         
         # Upsert attendance (insert or update if exists)
-        response = db.client.table("attendance").upsert({
+        rows = await storage.attendance.upsert([{
             "employee_id": str(attendance.employee_id),
             "attendance_date": str(attendance.attendance_date),
             "status": attendance.status
-        }, on_conflict="employee_id,attendance_date").execute()
+        }])
         
-        if not response.data:
+        if not rows:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to mark attendance"
             )
         
-        return AttendanceResponse(**response.data[0])
+        attendance_store.record_upserts(rows)
+        attendance_bitmaps.record_upserts(rows)
+        await cache.invalidate("attendance")
+        metrics_feed.notify()
+        return AttendanceResponse(**rows[0])
     
     except HTTPException:
         raise
@@ -46,95 +65,326 @@ async def mark_attendance(attendance: AttendanceCreate):
             detail=f"Error marking attendance: {str(e)}"
         )
 
-@router.get("", response_model=List[AttendanceWithEmployee])
-async def get_attendance_records(employee_id: Optional[UUID] = Query(None)):
-    """Get attendance records with employee details"""
+@router.post("/bulk", response_model=AttendanceBulkResult)
+async def mark_attendance_bulk(payload: AttendanceBulkCreate):
+    """
+    Mark attendance for many employees at once
+    
+    Each item is validated on its own and reported in `results` by its index;
+    valid items are upserted in chunks of multi-row statements.
+    """
+    if len(payload.items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_max_items} items can be marked per request"
+        )
+    
     try:
-        query = db.client.table("attendance").select("*, employees(full_name, employee_id, department)")
+        results = [AttendanceBulkItemResult(index=i, success=False) for i in range(len(payload.items))]
+        
+        # Validate every item in one pass; the last item for an employee/date wins
+        pending = {}
+        for i, item in enumerate(payload.items):
+            try:
+                attendance = AttendanceCreate.model_validate(item)
+            except ValidationError as e:
+                results[i].error = "; ".join(format_validation_errors(e.errors()))
+                continue
+            key = (str(attendance.employee_id), str(attendance.attendance_date))
+            if key in pending:
+                previous, _ = pending[key]
+                results[previous].error = f"Superseded by item {i} for the same employee and date"
+            pending[key] = (i, attendance)
         
-        if employee_id:
-            query = query.eq("employee_id", str(employee_id))
+        # One set-based existence check for all referenced employees
+        if pending:
+            employee_ids = sorted({employee_id for employee_id, _ in pending})
+            existing = await storage.employees.existing_ids(employee_ids)
+            for key in list(pending):
+                if key[0] not in existing:
+                    i, attendance = pending.pop(key)
+                    results[i].error = f"Employee with ID {attendance.employee_id} not found"
         
-        response = query.order("attendance_date", desc=True).execute()
+        # Upsert in chunked multi-row statements
+        items = list(pending.values())
+        for start in range(0, len(items), settings.bulk_chunk_size):
+            chunk = items[start:start + settings.bulk_chunk_size]
+            try:
+                rows = await storage.attendance.upsert([
+                    {
+                        "employee_id": str(attendance.employee_id),
+                        "attendance_date": str(attendance.attendance_date),
+                        "status": attendance.status
+                    }
+                    for _, attendance in chunk
+                ])
+            except Exception as e:
+                for i, _ in chunk:
+                    results[i].error = f"Error marking attendance: {str(e)}"
+                continue
+            
+            attendance_store.record_upserts(rows)
+            attendance_bitmaps.record_upserts(rows)
+            saved = {(row["employee_id"], row["attendance_date"]): row for row in rows}
+            for i, attendance in chunk:
+                row = saved.get((str(attendance.employee_id), str(attendance.attendance_date)))
+                if row is None:
+                    results[i].error = "Failed to mark attendance"
+                else:
+                    results[i].success = True
+                    results[i].record = AttendanceResponse(**row)
         
-        result = []
-        for record in response.data:
-            emp_data = record.get("employees", {})
-            result.append(AttendanceWithEmployee(
-                id=record["id"],
-                employee_id=record["employee_id"],
-                employee_name=emp_data.get("full_name", ""),
-                employee_code=emp_data.get("employee_id", ""),
-                department=emp_data.get("department", ""),
-                attendance_date=record["attendance_date"],
-                status=record["status"],
-                created_at=record["created_at"]
-            ))
+        succeeded = sum(1 for result in results if result.success)
+        if succeeded:
+            await cache.invalidate("attendance")
+            metrics_feed.notify()
+        return AttendanceBulkResult(
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            results=results
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error marking attendance: {str(e)}"
+        )
+
+def attendance_row(record: dict) -> dict:
+    """Flatten a PostgREST attendance row with its embedded employee"""
+    emp_data = record.get("employees") or {}
+    return {
+        "id": record["id"],
+        "employee_id": record["employee_id"],
+        "employee_name": emp_data.get("full_name", ""),
+        "employee_code": emp_data.get("employee_id", ""),
+        "department": emp_data.get("department", ""),
+        "attendance_date": record["attendance_date"],
+        "status": record["status"],
+        "created_at": record["created_at"]
+    }
+
+def to_attendance_with_employee(record: dict) -> AttendanceWithEmployee:
+    return AttendanceWithEmployee(**attendance_row(record))
+
+def normalize_attendance_rows(rows: list) -> Tuple[list, dict]:
+    """Split PostgREST rows into bare attendance rows and a deduplicated employees dict"""
+    items = []
+    employees = {}
+    for record in rows:
+        items.append({
+            "id": record["id"],
+            "employee_id": record["employee_id"],
+            "attendance_date": record["attendance_date"],
+            "status": record["status"],
+            "created_at": record["created_at"]
+        })
+        if record["employee_id"] not in employees:
+            emp_data = record.get("employees") or {}
+            employees[record["employee_id"]] = {
+                "employee_name": emp_data.get("full_name", ""),
+                "employee_code": emp_data.get("employee_id", ""),
+                "department": emp_data.get("department", "")
+            }
+    return items, employees
+
+def attendance_filters(
+    date: Optional[str],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    employee_id: Optional[UUID],
+    status_filter: Optional[str]
+) -> dict:
+    """The shared attendance filters, with a 400 for any date that is not YYYY-MM-DD"""
+    filters = {"employee_id": employee_id, "status_filter": status_filter}
+    for name, value in (("date", date), ("start_date", start_date), ("end_date", end_date)):
+        try:
+            filters[name] = str(dt_date.fromisoformat(value)) if value else None
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid {name} '{value}', expected YYYY-MM-DD"
+            )
+    return filters
+
+async def fetch_attendance_rows(filters: dict, limit: int, after: Optional[list] = None) -> list:
+    """Fetch up to `limit` raw attendance rows after the (attendance_date, id) key `after`"""
+    return await storage.attendance.list(filters, limit, after)
+
+async def fetch_attendance_page(
+    filters: dict,
+    limit: int,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    shape: AttendanceShape = "flat"
+) -> dict:
+    """
+    Fetch one keyset page of attendance ordered by (attendance_date, id) descending,
+    as an AttendancePage dict or, for shape="normalized", an AttendanceNormalizedPage dict
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, DATE_ID)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    # Fetch one extra row to know whether another page exists; the total is counted alongside
+    if include_total:
+        rows, total = await db.gather(fetch_attendance_rows(filters, limit + 1, after), count_attendance(filters))
+    else:
+        rows, total = await fetch_attendance_rows(filters, limit + 1, after), None
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["attendance_date"], rows[-1]["id"])
+    
+    # Rows come straight from the database, so they are not validated here
+    if shape == "normalized":
+        items, employees = normalize_attendance_rows(rows)
+        return {"items": items, "employees": employees, "next_cursor": next_cursor, "total": total}
+    return {
+        "items": [attendance_row(record) for record in rows],
+        "next_cursor": next_cursor,
+        "total": total
+    }
+
+@router.get("", response_model=Union[AttendancePage, AttendanceNormalizedPage])
+async def get_attendance_records(
+    request: Request,
+    response: Response,
+    employee_id: Optional[UUID] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False),
+    shape: AttendanceShape = Query("flat", description="normalized: employee details once in `employees` instead of on every row")
+):
+    """Get attendance records with employee details, one keyset page at a time"""
+    try:
+        # Rows embed employee details, so employee writes change the payload too
+        not_modified, headers = await check_conditional(request, ["attendance", "employees"])
+        if not_modified:
+            return not_modified
+        response.headers.update(headers)
         
-        return result
+        page = await fetch_attendance_page({"employee_id": employee_id}, limit, cursor, include_total, shape)
+        return json_response(page, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching attendance: {str(e)}"
         )
 
-@router.get("/filter", response_model=List[AttendanceWithEmployee])
+@router.get("/filter", response_model=Union[AttendancePage, AttendanceNormalizedPage])
 async def filter_attendance(
+    response: Response,
     date: Optional[str] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     employee_id: Optional[UUID] = Query(None),
-    status: Optional[str] = Query(None)
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False),
+    shape: AttendanceShape = Query("flat", description="normalized: employee details once in `employees` instead of on every row")
 ):
-    """Filter attendance records"""
+    """Filter attendance records, one keyset page at a time"""
     try:
-        query = db.client.table("attendance").select("*, employees(full_name, employee_id, department)")
-        
-        if date:
-            query = query.eq("attendance_date", date)
-        if start_date and end_date:
-            query = query.gte("attendance_date", start_date).lte("attendance_date", end_date)
-        if employee_id:
-            query = query.eq("employee_id", str(employee_id))
-        if status:
-            query = query.eq("status", status)
-        
-        response = query.order("attendance_date", desc=True).execute()
-        
-        result = []
-        for record in response.data:
-            emp_data = record.get("employees", {})
-            result.append(AttendanceWithEmployee(
-                id=record["id"],
-                employee_id=record["employee_id"],
-                employee_name=emp_data.get("full_name", ""),
-                employee_code=emp_data.get("employee_id", ""),
-                department=emp_data.get("department", ""),
-                attendance_date=record["attendance_date"],
-                status=record["status"],
-                created_at=record["created_at"]
-            ))
-        
-        return result
+        filters = attendance_filters(date, start_date, end_date, employee_id, status_filter)
+        page = await fetch_attendance_page(filters, limit, cursor, include_total, shape)
+        return json_response(page, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error filtering attendance: {str(e)}"
         )
 
+EXPORT_COLUMNS = [
+    "id", "employee_id", "employee_code", "employee_name", "department",
+    "attendance_date", "status", "created_at"
+]
+
+async def iter_attendance_export(filters: dict, export_format: str) -> AsyncIterator[str]:
+    """Stream attendance as CSV or NDJSON, reading one keyset chunk at a time"""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+    
+    after = None
+    while True:
+        rows = await fetch_attendance_rows(filters, settings.export_chunk_size, after)
+        if not rows:
+            break
+        
+        buffer = io.StringIO()
+        if export_format == "csv":
+            writer = csv.writer(buffer)
+            for record in rows:
+                emp_data = record.get("employees") or {}
+                writer.writerow([
+                    record["id"], record["employee_id"],
+                    emp_data.get("employee_id", ""), emp_data.get("full_name", ""),
+                    emp_data.get("department", ""),
+                    record["attendance_date"], record["status"], record["created_at"]
+                ])
+        else:
+            for record in rows:
+                buffer.write(to_attendance_with_employee(record).model_dump_json())
+                buffer.write("\n")
+        yield buffer.getvalue()
+        
+        if len(rows) < settings.export_chunk_size:
+            break
+        after = [rows[-1]["attendance_date"], rows[-1]["id"]]
+
+@router.get("/export")
+async def export_attendance(
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    date: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    employee_id: Optional[UUID] = Query(None),
+    status_filter: Optional[str] = Query(None, alias="status")
+):
+    """
+    Export attendance records matching the filters as CSV or NDJSON
+    
+    Rows are streamed in keyset chunks so memory stays flat for any date range.
+    """
+    filters = attendance_filters(date, start_date, end_date, employee_id, status_filter)
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"attendance-{dt_date.today()}.{export_format}"
+    return StreamingResponse(
+        iter_attendance_export(filters, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.put("/{attendance_id}", response_model=AttendanceResponse)
-async def update_attendance(attendance_id: UUID, status: str):
+async def update_attendance(attendance_id: UUID, attendance_status: str = Query(..., alias="status")):
     """Update attendance status"""
     try:
-        response = db.client.table("attendance").update({"status": status}).eq("id", str(attendance_id)).execute()
+        row = await storage.attendance.update_status(str(attendance_id), attendance_status)
         
-        if not response.data:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Attendance record {attendance_id} not found"
             )
         
-        return AttendanceResponse(**response.data[0])
+        attendance_store.record_upserts([row])
+        attendance_bitmaps.record_upserts([row])
+        await cache.invalidate("attendance")
+        metrics_feed.notify()
+        return AttendanceResponse(**row)
     except HTTPException:
         raise
     except Exception as e:
@@ -147,15 +397,18 @@ async def update_attendance(attendance_id: UUID, status: str):
 async def delete_attendance(attendance_id: UUID):
     """Delete attendance record"""
     try:
-        check_response = db.client.table("attendance").select("id").eq("id", str(attendance_id)).execute()
-        
-        if not check_response.data:
+        if not await storage.attendance.exists(str(attendance_id)):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Attendance record {attendance_id} not found"
             )
         
-        db.client.table("attendance").delete().eq("id", str(attendance_id)).execute()
+        row = await storage.attendance.delete(str(attendance_id))
+        if row:
+            attendance_store.record_delete(row)
+            attendance_bitmaps.record_delete(row)
+        await cache.invalidate("attendance")
+        metrics_feed.notify()
         
         return SuccessResponse(success=True, message="Attendance deleted successfully")
     except HTTPException:
@@ -1,73 +1,34 @@
-from fastapi import APIRouter, HTTPException, status
-from models.schemas import DashboardMetrics, EmployeeResponse
-from database.connection import db
+from fastapi import APIRouter, HTTPException, status, Request, Response
+from models.schemas import DashboardMetrics
+from repositories.storage import storage
+from services.attendance_store import attendance_store
+from services.cache import cache
+from services.conditional import check_conditional
+from services.responses import json_response
 from datetime import date
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
 @router.get("", response_model=DashboardMetrics)
-async def get_dashboard_metrics():
+async def get_dashboard_metrics(request: Request, response: Response):
     """Get dashboard metrics and statistics"""
     try:
-        # Total employees
-        emp_response = db.client.table("employees").select("*", count="exact").execute()
-        total_employees = emp_response.count or 0
+        today = date.today()
         
-        # Total attendance records
-        att_response = db.client.table("attendance").select("*", count="exact").execute()
-        total_attendance_records = att_response.count or 0
+        # Today's counts also change at midnight, so the date is part of the validator
+        not_modified, headers = await check_conditional(request, ["employees", "attendance"], today)
+        if not_modified:
+            return not_modified
+        response.headers.update(headers)
         
-        # Today's attendance
-        today = str(date.today())
-        today_present = db.client.table("attendance")\
-            .select("*", count="exact")\
-            .eq("attendance_date", today)\
-            .eq("status", "present")\
-            .execute()
-        today_present_count = today_present.count or 0
+        async def load_metrics() -> dict:
+            # One aggregate query, or counts from the in-process store plus the recent employees
+            source = attendance_store if attendance_store.enabled else storage.attendance
+            metrics = await source.dashboard_metrics(today, 5)
+            return DashboardMetrics(**metrics).model_dump(mode="json")
         
-        today_absent = db.client.table("attendance")\
-            .select("*", count="exact")\
-            .eq("attendance_date", today)\
-            .eq("status", "absent")\
-            .execute()
-        today_absent_count = today_absent.count or 0
-        
-        # Total absent (all time)
-        total_absent = db.client.table("attendance")\
-            .select("*", count="exact")\
-            .eq("status", "absent")\
-            .execute()
-        total_absent_count = total_absent.count or 0
-        
-        # Overall attendance rate
-        if total_attendance_records > 0:
-            present_response = db.client.table("attendance")\
-                .select("*", count="exact")\
-                .eq("status", "present")\
-                .execute()
-            present_count = present_response.count or 0
-            overall_attendance_rate = round((present_count / total_attendance_records) * 100, 2)
-        else:
-            overall_attendance_rate = 0.0
-        
-        # Recent employees (last 5)
-        recent_response = db.client.table("employees")\
-            .select("*")\
-            .order("created_at", desc=True)\
-            .limit(5)\
-            .execute()
-        recent_employees = [EmployeeResponse(**emp) for emp in recent_response.data]
-        
-        return DashboardMetrics(
-            total_employees=total_employees,
-            total_attendance_records=total_attendance_records,
-            today_present=today_present_count,
-            today_absent=today_absent_count,
-            total_absent=total_absent_count,
-            overall_attendance_rate=float(overall_attendance_rate),
-            recent_employees=recent_employees
-        )
+        metrics = await cache.get_or_load("dashboard", ("metrics", today, headers["ETag"]), load_metrics)
+        return json_response(metrics, response)
     
     except Exception as e:
         raise HTTPException(
@@ -1,11 +1,24 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response, UploadFile, File
+from typing import List, Optional
 from uuid import UUID
+from datetime import date, timedelta
+import io
 from models.schemas import (
-    EmployeeCreate, EmployeeResponse,
-    SuccessResponse, EmployeeAttendanceSummary
+    EmployeeCreate, EmployeeResponse, EmployeePage, EmployeeImportResult,
+    SuccessResponse, EmployeeAttendanceSummary, EmployeeAttendanceSummaryPage, AttendanceCalendar
 )
+from config import settings
 from database.connection import db
+from repositories.base import DuplicateKeyError
+from repositories.storage import storage
+from services.attendance_bitmaps import attendance_bitmaps
+from services.attendance_store import attendance_store
+from services.cache import cache
+from services.events import metrics_feed
+from services.conditional import check_conditional
+from services.employee_import import import_employees
+from services.responses import json_response
+from services.pagination import CREATED_AT_ID, encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/api/employees", tags=["employees"])
 
@@ -13,64 +26,219 @@ router = APIRouter(prefix="/api/employees", tags=["employees"])
 async def create_employee(employee: EmployeeCreate):
     """Create a new employee"""
     try:
-        response = db.client.table("employees").insert({
+        row = await storage.employees.create({
             "employee_id": employee.employee_id,
             "full_name": employee.full_name,
             "email": employee.email,
             "department": employee.department
-        }).execute()
+        })
         
-        if not response.data:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create employee"
             )
         
-        return EmployeeResponse(**response.data[0])
+        attendance_store.add_employee(row)
+        attendance_bitmaps.add_employee(row)
+        await cache.invalidate("employees")
+        metrics_feed.notify()
+        return EmployeeResponse(**row)
     
+    except HTTPException:
+        raise
+    except DuplicateKeyError as e:
+        if e.field == "employee_id":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Employee ID '{employee.employee_id}' already exists"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Email '{employee.email}' is already registered"
+        )
     except Exception as e:
-        error_msg = str(e)
-        if "duplicate" in error_msg.lower() or "unique" in error_msg.lower():
-            if "employee_id" in error_msg:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Employee ID '{employee.employee_id}' already exists"
-                )
-            elif "email" in error_msg:
-                raise HTTPException(
-                    status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Email '{employee.email}' is already registered"
-                )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating employee: {str(e)}"
         )
 
-@router.get("", response_model=List[EmployeeResponse])
-async def get_all_employees():
-    """Get all employees"""
+@router.post("/import", response_model=EmployeeImportResult)
+async def import_employees_csv(
+    file: UploadFile = File(..., description="CSV with employee_id, full_name, email, department columns")
+):
+    """
+    Bulk-create employees from a CSV upload
+    
+    The upload is spooled in full before this runs (up to IMPORT_MAX_BYTES);
+    rows are then validated and inserted in batches, and rows that fail
+    validation or clash with existing employees are listed in `errors` by line number.
+    """
+    if file.size is not None and file.size > settings.import_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"CSV uploads are limited to {settings.import_max_bytes} bytes"
+        )
+    
+    try:
+        lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        result = await import_employees(lines)
+        if result.imported:
+            await attendance_store.sync_employees()
+            attendance_bitmaps.sync_employees()
+            await cache.invalidate("employees")
+            metrics_feed.notify()
+        return result
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error importing employees: {str(e)}"
+        )
+
+async def fetch_employee_page(limit: int, cursor: Optional[str] = None, include_total: bool = False) -> dict:
+    """Fetch one keyset page of employees ordered by (created_at, id) descending, as an EmployeePage dict"""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, CREATED_AT_ID)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    # Fetch one extra row to know whether another page exists; the total is counted alongside
+    if include_total:
+        rows, total = await db.gather(storage.employees.list_page(limit + 1, after), storage.employees.count())
+    else:
+        rows, total = await storage.employees.list_page(limit + 1, after), None
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    
+    # Rows come straight from the database, so they are not validated here
+    return {"items": rows, "next_cursor": next_cursor, "total": total}
+
+@router.get("", response_model=EmployeePage)
+async def get_all_employees(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False)
+):
+    """Get employees, newest first, one keyset page at a time"""
     try:
-        response = db.client.table("employees").select("*").order("created_at", desc=True).execute()
-        return [EmployeeResponse(**emp) for emp in response.data]
+        not_modified, headers = await check_conditional(request, ["employees"])
+        if not_modified:
+            return not_modified
+        response.headers.update(headers)
+        
+        page = await cache.get_or_load(
+            "employees",
+            ("page", limit, cursor, include_total, headers["ETag"]),
+            lambda: fetch_employee_page(limit, cursor, include_total)
+        )
+        return json_response(page, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching employees: {str(e)}"
         )
 
+async def fetch_attendance_summaries(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    department: Optional[str] = None,
+    employee_ids: Optional[List[UUID]] = None,
+    after_code: Optional[str] = None,
+    limit: Optional[int] = None
+) -> List[dict]:
+    """Attendance counts per employee, ordered by employee code; from the bitsets when enabled, else one GROUP BY aggregate"""
+    source = attendance_bitmaps if attendance_bitmaps.enabled else storage.employees
+    return await source.attendance_summaries(
+        start_date, end_date, department,
+        employee_uuids=[str(employee_id) for employee_id in employee_ids] if employee_ids is not None else None,
+        after_code=after_code,
+        limit=limit
+    )
+
+def validate_date_range(start_date: Optional[date], end_date: Optional[date]):
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date"
+        )
+
+@router.get("/attendance-summaries", response_model=EmployeeAttendanceSummaryPage)
+async def get_attendance_summaries(
+    request: Request,
+    response: Response,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    department: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False)
+):
+    """Get attendance summaries for all employees, ordered by employee code, one page at a time"""
+    try:
+        validate_date_range(start_date, end_date)
+        
+        after_code = None
+        if cursor:
+            try:
+                (after_code,) = decode_cursor(cursor, (str,))
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        not_modified, headers = await check_conditional(request, ["employees", "attendance"])
+        if not_modified:
+            return not_modified
+        response.headers.update(headers)
+        
+        # Fetch one extra summary to know whether another page exists; the total is counted alongside
+        summaries = fetch_attendance_summaries(
+            start_date, end_date, department, after_code=after_code, limit=limit + 1
+        )
+        if include_total:
+            items, total = await db.gather(summaries, storage.employees.count(department))
+        else:
+            items, total = await summaries, None
+        
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1]["employee_code"])
+        
+        return json_response({"items": items, "next_cursor": next_cursor, "total": total}, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching attendance summaries: {str(e)}"
+        )
+
 @router.get("/{employee_uuid}", response_model=EmployeeResponse)
 async def get_employee(employee_uuid: UUID):
     """Get a single employee by UUID"""
     try:
-        response = db.client.table("employees").select("*").eq("id", str(employee_uuid)).execute()
+        row = await storage.employees.get(str(employee_uuid))
         
-        if not response.data:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Employee with ID {employee_uuid} not found"
             )
         
-        return EmployeeResponse(**response.data[0])
+        return EmployeeResponse(**row)
     except HTTPException:
         raise
     except Exception as e:
@@ -84,16 +252,19 @@ async def delete_employee(employee_uuid: UUID):
     """Delete an employee"""
     try:
         # Check if exists
-        check_response = db.client.table("employees").select("id").eq("id", str(employee_uuid)).execute()
-        
-        if not check_response.data:
+        if not await storage.employees.exists(str(employee_uuid)):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Employee with ID {employee_uuid} not found"
             )
         
         # Delete employee
-        db.client.table("employees").delete().eq("id", str(employee_uuid)).execute()
+        await storage.employees.delete(str(employee_uuid))
+        attendance_store.remove_employee(str(employee_uuid))
+        attendance_bitmaps.remove_employee(str(employee_uuid))
+        # Attendance rows go with the employee (ON DELETE CASCADE)
+        await cache.invalidate("employees", "attendance")
+        metrics_feed.notify()
         
         return SuccessResponse(
             success=True,
@@ -108,38 +279,25 @@ async def delete_employee(employee_uuid: UUID):
         )
 
 @router.get("/{employee_uuid}/attendance-summary", response_model=EmployeeAttendanceSummary)
-async def get_employee_attendance_summary(employee_uuid: UUID):
+async def get_employee_attendance_summary(
+    employee_uuid: UUID,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None)
+):
     """Get attendance summary for a specific employee"""
     try:
-        # Get employee
-        emp_response = db.client.table("employees").select("*").eq("id", str(employee_uuid)).execute()
+        validate_date_range(start_date, end_date)
+        
+        # Same aggregate as the all-employees summaries, restricted to one employee
+        summaries = await fetch_attendance_summaries(start_date, end_date, employee_ids=[employee_uuid])
         
-        if not emp_response.data:
+        if not summaries:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Employee with ID {employee_uuid} not found"
             )
         
-        employee = emp_response.data[0]
-        
-        # Get attendance records
-        att_response = db.client.table("attendance").select("*").eq("employee_id", str(employee_uuid)).execute()
-        
-        total_days = len(att_response.data)
-        present_days = sum(1 for record in att_response.data if record["status"] == "present")
-        absent_days = sum(1 for record in att_response.data if record["status"] == "absent")
-        attendance_rate = round((present_days / total_days * 100), 2) if total_days > 0 else 0.0
-        
-        return EmployeeAttendanceSummary(
-            employee_id=employee["id"],
-            employee_name=employee["full_name"],
-            employee_code=employee["employee_id"],
-            department=employee["department"],
-            total_days=total_days,
-            present_days=present_days,
-            absent_days=absent_days,
-            attendance_rate=attendance_rate
-        )
+        return EmployeeAttendanceSummary(**summaries[0])
     except HTTPException:
         raise
     except Exception as e:
@@ -147,3 +305,60 @@ async def get_employee_attendance_summary(employee_uuid: UUID):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching attendance summary: {str(e)}"
         )
+
+async def fetch_attendance_calendar(employee_uuid: UUID, start_date: date, end_date: date) -> Optional[dict]:
+    """One employee's status per day; bitset slices when enabled, else the employee and their marks"""
+    if attendance_bitmaps.enabled:
+        return await attendance_bitmaps.calendar(str(employee_uuid), start_date, end_date)
+    
+    employee, marks = await db.gather(
+        storage.employees.get(str(employee_uuid)),
+        storage.attendance.employee_marks(start_date, end_date, employee_uuids=[str(employee_uuid)])
+    )
+    if not employee:
+        return None
+    days = [None] * ((end_date - start_date).days + 1)
+    for mark in marks:
+        day = mark["attendance_date"]
+        day = day if isinstance(day, date) else date.fromisoformat(str(day))
+        days[(day - start_date).days] = "present" if mark["present"] else "absent"
+    return {
+        "employee_id": employee["id"],
+        "employee_code": employee["employee_id"],
+        "employee_name": employee["full_name"],
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "days": days
+    }
+
+@router.get("/{employee_uuid}/attendance-calendar", response_model=AttendanceCalendar)
+async def get_employee_attendance_calendar(
+    employee_uuid: UUID,
+    start_date: Optional[date] = Query(None, description="Default: 30 days before end_date"),
+    end_date: Optional[date] = Query(None, description="Default: today")
+):
+    """Get one employee's attendance status for every day of a date range"""
+    try:
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=29)
+        validate_date_range(start_date, end_date)
+        if (end_date - start_date).days >= settings.analytics_max_days:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Date range cannot exceed {settings.analytics_max_days} days"
+            )
+        
+        calendar = await fetch_attendance_calendar(employee_uuid, start_date, end_date)
+        if calendar is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Employee with ID {employee_uuid} not found"
+            )
+        return AttendanceCalendar(**calendar)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching attendance calendar: {str(e)}"
+        )
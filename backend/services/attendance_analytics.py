@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Literal, Optional
+import numpy as np
+from database.connection import db
+from repositories.storage import storage
+from services.attendance_store import attendance_store
+
+Granularity = Literal["day", "week", "month"]
+GroupBy = Literal["department", "employee"]
+
+@dataclass
+class AttendanceColumns:
+    """Attendance counts as parallel arrays, one element per (day, group) fact"""
+    day: np.ndarray        # datetime64[D]
+    group: np.ndarray      # int32 index into keys
+    present: np.ndarray    # int32
+    absent: np.ndarray     # int32
+    keys: List[str]
+    
+    @classmethod
+    def from_rows(cls, days: List[Any], groups: List[str], present: List[int], absent: List[int]) -> "AttendanceColumns":
+        keys, codes = np.unique(np.array(groups, dtype=str), return_inverse=True)
+        return cls(
+            day=np.array(days, dtype="datetime64[D]"),
+            group=codes.astype(np.int32),
+            present=np.array(present, dtype=np.int32),
+            absent=np.array(absent, dtype=np.int32),
+            keys=keys.tolist()
+        )
+    
+    @classmethod
+    def from_scan(cls, day: np.ndarray, codes: np.ndarray, present: np.ndarray, names: List[str]) -> "AttendanceColumns":
+        """From attendance store arrays, one fact per row; groups are ordered by name like from_rows"""
+        used = np.unique(codes)
+        keys = sorted(names[code] for code in used)
+        position = {key: i for i, key in enumerate(keys)}
+        remap = np.zeros(len(names), dtype=np.int32)
+        for code in used:
+            remap[code] = position[names[code]]
+        return cls(
+            day=day.astype("datetime64[D]"),
+            group=remap[codes],
+            present=present.astype(np.int32),
+            absent=(~present).astype(np.int32),
+            keys=keys
+        )
+
+# ==================== Bucketing ====================
+
+def period_starts(start_date: date, end_date: date, granularity: Granularity) -> List[date]:
+    """First day of every period overlapping the range (weeks start on Monday)"""
+    if granularity == "day":
+        first = start_date
+    elif granularity == "week":
+        first = start_date - timedelta(days=start_date.weekday())
+    else:
+        first = date(start_date.year, start_date.month, 1)
+    
+    periods = []
+    current = first
+    while current <= end_date:
+        periods.append(current)
+        if granularity == "day":
+            current += timedelta(days=1)
+        elif granularity == "week":
+            current += timedelta(days=7)
+        else:
+            current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+    return periods
+
+def bucket_index(days: np.ndarray, start_date: date, granularity: Granularity) -> np.ndarray:
+    """Index of the period each day falls in, relative to the first period"""
+    start = np.datetime64(start_date, "D")
+    if granularity == "day":
+        return (days - start).astype(np.int64)
+    if granularity == "week":
+        # 1970-01-01 was a Thursday, so shift by 3 days to count Monday-based weeks
+        offset = np.timedelta64(3, "D")
+        return ((days + offset).astype(np.int64) // 7) - ((start + offset).astype(np.int64) // 7)
+    return (days.astype("datetime64[M]") - start.astype("datetime64[M]")).astype(np.int64)
+
+def aggregate(columns: AttendanceColumns, start_date: date, end_date: date, granularity: Granularity) -> Dict[str, Any]:
+    """Sum present/absent per (group, period) with one bincount per measure"""
+    periods = period_starts(start_date, end_date, granularity)
+    n_periods = len(periods)
+    n_groups = len(columns.keys)
+    
+    in_range = (columns.day >= np.datetime64(start_date, "D")) & (columns.day <= np.datetime64(end_date, "D"))
+    buckets = bucket_index(columns.day[in_range], start_date, granularity)
+    flat = columns.group[in_range].astype(np.int64) * n_periods + buckets
+    
+    size = n_groups * n_periods
+    present = np.bincount(flat, weights=columns.present[in_range], minlength=size).astype(np.int64)
+    absent = np.bincount(flat, weights=columns.absent[in_range], minlength=size).astype(np.int64)
+    present = present.reshape(n_groups, n_periods)
+    absent = absent.reshape(n_groups, n_periods)
+    
+    total = present + absent
+    rate = np.zeros(total.shape)
+    np.divide(present * 100.0, total, out=rate, where=total > 0)
+    
+    return {
+        "periods": [str(period) for period in periods],
+        "present": present,
+        "absent": absent,
+        "rate": np.round(rate, 1)
+    }
+
+# ==================== Loading ====================
+
+async def load_department_columns(start_date: date, end_date: date, department: Optional[str] = None) -> AttendanceColumns:
+    """Per-department daily counts from the attendance rollup, or per-row facts from the attendance store"""
+    if attendance_store.enabled:
+        table = await attendance_store.get_table()
+        employee, day, present = table.scan(start_date, end_date, department)
+        return AttendanceColumns.from_scan(day, table.employee_departments()[employee], present, table.departments)
+    
+    rows = await storage.attendance.department_daily(start_date, end_date, department)
+    return AttendanceColumns.from_rows(
+        [row["attendance_date"] for row in rows],
+        [row["department"] for row in rows],
+        [row["present_count"] for row in rows],
+        [row["absent_count"] for row in rows]
+    )
+
+async def load_employee_columns(start_date: date, end_date: date, department: Optional[str] = None) -> AttendanceColumns:
+    """Per-employee attendance marks, one fact per attendance row"""
+    if attendance_store.enabled:
+        table = await attendance_store.get_table()
+        employee, day, present = table.scan(start_date, end_date, department)
+        names = [info.id if info else "" for info in table.employees]
+        return AttendanceColumns.from_scan(day, employee, present, names)
+    
+    rows = await storage.attendance.employee_marks(start_date, end_date, department)
+    present = [1 if row["present"] else 0 for row in rows]
+    return AttendanceColumns.from_rows(
+        [row["attendance_date"] for row in rows],
+        [row["employee_id"] for row in rows],
+        present,
+        [1 - value for value in present]
+    )
+
+async def load_employee_labels(department: Optional[str] = None) -> Dict[str, dict]:
+    """Code, name and department per employee UUID"""
+    if attendance_store.enabled:
+        return await attendance_store.labels(department)
+    return await storage.employees.labels(department)
+
+async def attendance_report(
+    start_date: date,
+    end_date: date,
+    granularity: Granularity,
+    group_by: GroupBy,
+    department: Optional[str] = None
+) -> Dict[str, Any]:
+    """Present/absent counts and rates per group and period over an arbitrary date range"""
+    labels = {}
+    if group_by == "department":
+        columns = await load_department_columns(start_date, end_date, department)
+    else:
+        # The marks and the employee labels are independent reads
+        columns, labels = await db.gather(
+            load_employee_columns(start_date, end_date, department),
+            load_employee_labels(department)
+        )
+    
+    result = aggregate(columns, start_date, end_date, granularity)
+    
+    groups = []
+    for i, key in enumerate(columns.keys):
+        group = {"key": key, "name": key}
+        if group_by == "employee":
+            employee = labels.get(key, {})
+            group.update({
+                "name": employee.get("full_name", key),
+                "employee_code": employee.get("employee_id"),
+                "department": employee.get("department")
+            })
+        group.update({
+            "present": result["present"][i].tolist(),
+            "absent": result["absent"][i].tolist(),
+            "rate": result["rate"][i].tolist()
+        })
+        groups.append(group)
+    
+    if group_by == "employee":
+        groups.sort(key=lambda group: group["employee_code"] or group["key"])
+    
+    return {
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "granularity": granularity,
+        "group_by": group_by,
+        "periods": result["periods"],
+        "groups": groups
+    }
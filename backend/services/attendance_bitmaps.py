@@ -0,0 +1,330 @@
+"""
+Optional per-employee attendance bitsets for summaries and per-employee counts.
+
+Each employee gets two bitsets over day ordinals, one bit per day for "marked"
+and one for "present", spanning only the days between their first and last
+mark. Counts over any date range are two prefix popcount lookups per bitset,
+so summaries for any span cost the same. The employee directory and each
+employee's bitsets are built lazily from the attendance table on first use.
+The write handlers then keep them current, and everything is rebuilt after
+ATTENDANCE_BITMAPS_REFRESH seconds to pick up writes from other processes.
+"""
+import asyncio
+import time
+from bisect import bisect_right, insort
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config import settings
+from repositories.base import Row
+from repositories.memory_repository import HIGHEST
+from repositories.storage import storage
+from services.attendance_store import day_ordinal
+from services.rates import percentage
+
+# Set bits per byte value
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.int32)
+
+class Bitset:
+    """Packed bits with a lazily rebuilt running popcount per byte"""
+    
+    __slots__ = ("bits", "_prefix")
+    
+    def __init__(self, bits: np.ndarray):
+        self.bits = bits
+        self._prefix: Optional[np.ndarray] = None
+    
+    def set(self, i: int, value: bool):
+        if value:
+            self.bits[i >> 3] |= np.uint8(1 << (i & 7))
+        else:
+            self.bits[i >> 3] &= np.uint8(~(1 << (i & 7)) & 0xFF)
+        self._prefix = None
+    
+    def prepend(self, nbytes: int):
+        self.bits = np.concatenate((np.zeros(nbytes, dtype=np.uint8), self.bits))
+        self._prefix = None
+    
+    def append(self, nbytes: int):
+        self.bits = np.concatenate((self.bits, np.zeros(nbytes, dtype=np.uint8)))
+        self._prefix = None
+    
+    def slice(self, start: int, length: int) -> np.ndarray:
+        """Bits [start, start + length) as booleans; positions outside the bitset are False"""
+        out = np.zeros(length, dtype=bool)
+        lo, hi = max(start, 0), min(start + length, len(self.bits) * 8)
+        if lo < hi:
+            bits = np.unpackbits(self.bits[lo >> 3:(hi + 7) >> 3], bitorder="little")
+            out[lo - start:hi - start] = bits[lo & 7:(lo & 7) + hi - lo]
+        return out
+    
+    def ones_before(self, i: int) -> int:
+        """Set bits in positions [0, i)"""
+        if self._prefix is None:
+            self._prefix = np.concatenate(([0], np.cumsum(POPCOUNT[self.bits])))
+        byte = i >> 3
+        if byte >= len(self.bits):
+            return int(self._prefix[-1])
+        return int(self._prefix[byte] + POPCOUNT[self.bits[byte] & ((1 << (i & 7)) - 1)])
+
+class EmployeeDays:
+    """One employee's directory entry and, once built, their bitsets; bit i is day `base + i`"""
+    
+    __slots__ = ("id", "employee_id", "full_name", "department", "base", "marked", "present")
+    
+    def __init__(self, row: Row):
+        self.id = str(row["id"])
+        self.employee_id = row["employee_id"]
+        self.full_name = row["full_name"]
+        self.department = row["department"]
+        self.base = 0
+        self.marked: Optional[Bitset] = None
+        self.present: Optional[Bitset] = None
+    
+    @property
+    def built(self) -> bool:
+        return self.marked is not None
+    
+    def build(self, days: np.ndarray, present: np.ndarray):
+        # Start on a byte boundary so growing to the left moves whole bytes
+        self.base = int(days.min()) & ~7 if len(days) else 0
+        size = (int(days.max()) - self.base + 8) & ~7 if len(days) else 0
+        marked_bits = np.zeros(size, dtype=bool)
+        present_bits = np.zeros(size, dtype=bool)
+        marked_bits[days - self.base] = True
+        present_bits[days[present] - self.base] = True
+        self.marked = Bitset(np.packbits(marked_bits, bitorder="little"))
+        self.present = Bitset(np.packbits(present_bits, bitorder="little"))
+    
+    def _position(self, day: int) -> int:
+        """Bit position of a day, growing the bitsets to cover it"""
+        if not len(self.marked.bits):
+            # First mark: start the bitsets at that day, not at the ordinal origin
+            self.base = day & ~7
+        elif day < self.base:
+            nbytes = ((self.base - day) + 7) >> 3
+            self.marked.prepend(nbytes)
+            self.present.prepend(nbytes)
+            self.base -= nbytes * 8
+        position = day - self.base
+        if position >> 3 >= len(self.marked.bits):
+            nbytes = (position >> 3) - len(self.marked.bits) + 1
+            self.marked.append(nbytes)
+            self.present.append(nbytes)
+        return position
+    
+    def mark(self, day: int, status: str):
+        position = self._position(day)
+        self.marked.set(position, True)
+        self.present.set(position, status == "present")
+    
+    def unmark(self, day: int):
+        position = day - self.base
+        if 0 <= position < len(self.marked.bits) * 8:
+            self.marked.set(position, False)
+            self.present.set(position, False)
+    
+    def counts(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Tuple[int, int]:
+        """(marked, present) days in the inclusive range; open ends are unbounded"""
+        start = max(day_ordinal(start_date) - self.base, 0) if start_date else 0
+        end = day_ordinal(end_date) - self.base + 1 if end_date else len(self.marked.bits) * 8
+        if end <= start:
+            return 0, 0
+        return (
+            self.marked.ones_before(end) - self.marked.ones_before(start),
+            self.present.ones_before(end) - self.present.ones_before(start)
+        )
+    
+    def statuses(self, start_date: date, end_date: date) -> List[Optional[str]]:
+        """Status per day of the inclusive range: "present", "absent" or None when unmarked"""
+        start = day_ordinal(start_date) - self.base
+        length = (end_date - start_date).days + 1
+        marked = self.marked.slice(start, length)
+        present = self.present.slice(start, length)
+        return [("present" if is_present else "absent") if is_marked else None for is_marked, is_present in zip(marked.tolist(), present.tolist())]
+    
+    def summary(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Row:
+        """Same shape as a get_employee_attendance_summaries() row"""
+        marked, present = self.counts(start_date, end_date)
+        return {
+            "employee_id": self.id,
+            "employee_name": self.full_name,
+            "employee_code": self.employee_id,
+            "department": self.department,
+            "total_days": marked,
+            "present_days": present,
+            "absent_days": marked - present,
+            "attendance_rate": percentage(present, marked, 2)
+        }
+
+class AttendanceBitmapIndex:
+    """Directory of employees by code, their lazily built bitsets, and the hooks the write handlers call"""
+    
+    def __init__(self, enabled: bool, refresh: float):
+        self.enabled = enabled
+        self.refresh = refresh
+        self.entries: Dict[str, EmployeeDays] = {}
+        self.codes: List[Tuple[str, str]] = []
+        self.loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # Writes for employees whose bitsets are being read from the database, replayed after the build
+        self._pending: Dict[str, List[Tuple[str, tuple]]] = {}
+    
+    async def _directory(self):
+        stale = self.loaded_at is None or (self.refresh and time.monotonic() - self.loaded_at > self.refresh)
+        if not stale:
+            return
+        async with self._lock:
+            if self.loaded_at is not None and not (self.refresh and time.monotonic() - self.loaded_at > self.refresh):
+                return
+            labels = await storage.employees.labels()
+            self.entries = {employee_uuid: EmployeeDays(row) for employee_uuid, row in labels.items()}
+            self.codes = sorted((entry.employee_id, entry.id) for entry in self.entries.values())
+            self.loaded_at = time.monotonic()
+    
+    async def _build(self, entries: List[EmployeeDays]):
+        """Read the bitsets of the employees that have none yet, in one query"""
+        if all(entry.built for entry in entries):
+            return
+        async with self._lock:
+            missing = [entry for entry in entries if not entry.built]
+            if not missing:
+                return
+            for entry in missing:
+                self._pending[entry.id] = []
+            try:
+                marks = await storage.attendance.employee_marks(date.min, date.max, employee_uuids=[entry.id for entry in missing])
+                grouped: Dict[str, List[Row]] = {entry.id: [] for entry in missing}
+                for row in marks:
+                    grouped[str(row["employee_id"])].append(row)
+                for entry in missing:
+                    rows = grouped[entry.id]
+                    days = np.array([row["attendance_date"] for row in rows], dtype="datetime64[D]").astype(np.int64)
+                    entry.build(days, np.array([bool(row["present"]) for row in rows], dtype=bool))
+                    for method, args in self._pending[entry.id]:
+                        getattr(entry, method)(*args)
+            finally:
+                for entry in missing:
+                    self._pending.pop(entry.id, None)
+    
+    # ==================== Write hooks ====================
+    
+    def _apply(self, employee_uuid: str, method: str, *args):
+        entry = self.entries.get(employee_uuid)
+        if entry is None:
+            return
+        if employee_uuid in self._pending:
+            self._pending[employee_uuid].append((method, args))
+        elif entry.built:
+            getattr(entry, method)(*args)
+    
+    def record_upserts(self, rows: List[Row]):
+        """After attendance rows were inserted or their status changed"""
+        if not self.enabled:
+            return
+        for row in rows:
+            self._apply(str(row["employee_id"]), "mark", day_ordinal(row["attendance_date"]), row["status"])
+    
+    def record_delete(self, row: Row):
+        if self.enabled:
+            self._apply(str(row["employee_id"]), "unmark", day_ordinal(row["attendance_date"]))
+    
+    def add_employee(self, row: Row):
+        if not self.enabled or self.loaded_at is None or str(row["id"]) in self.entries:
+            return
+        entry = EmployeeDays(row)
+        entry.build(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool))
+        self.entries[entry.id] = entry
+        insort(self.codes, (entry.employee_id, entry.id))
+    
+    def remove_employee(self, employee_uuid: str):
+        entry = self.entries.pop(str(employee_uuid), None)
+        if entry is not None:
+            self.codes.remove((entry.employee_id, entry.id))
+    
+    def sync_employees(self):
+        """Employees were created in bulk (CSV import); reread the directory on next use"""
+        self.loaded_at = None
+    
+    # ==================== Reads ====================
+    
+    async def attendance_summaries(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        department: Optional[str] = None,
+        employee_uuids: Optional[List[Any]] = None,
+        after_code: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        """Same rows as EmployeeRepository.attendance_summaries, from the bitsets"""
+        await self._directory()
+        if employee_uuids is not None:
+            wanted = {str(employee_uuid) for employee_uuid in employee_uuids}
+            codes = sorted((self.entries[uuid].employee_id, uuid) for uuid in wanted if uuid in self.entries)
+        else:
+            codes = self.codes
+        
+        page = []
+        for code, employee_uuid in codes[bisect_right(codes, (after_code, HIGHEST)) if after_code is not None else 0:]:
+            if limit is not None and len(page) >= limit:
+                break
+            entry = self.entries[employee_uuid]
+            if department and entry.department != department:
+                continue
+            page.append(entry)
+        
+        await self._build(page)
+        return [entry.summary(start_date, end_date) for entry in page]
+    
+    async def calendar(self, employee_uuid: str, start_date: date, end_date: date) -> Optional[Row]:
+        """One employee's status per day over the range, sliced from their bitsets; None if unknown"""
+        await self._directory()
+        entry = self.entries.get(str(employee_uuid))
+        if entry is None:
+            return None
+        await self._build([entry])
+        return {
+            "employee_id": entry.id,
+            "employee_code": entry.employee_id,
+            "employee_name": entry.full_name,
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "days": entry.statuses(start_date, end_date)
+        }
+    
+    async def count(self, filters: Dict[str, Any]) -> Optional[int]:
+        """Rows matching attendance filters that name an employee, or None when the bitsets cannot answer"""
+        status_filter = filters.get("status_filter")
+        if not filters.get("employee_id") or status_filter not in (None, "present", "absent"):
+            return None
+        await self._directory()
+        entry = self.entries.get(str(filters["employee_id"]))
+        if entry is None:
+            return 0
+        await self._build([entry])
+        
+        start_date = end_date = None
+        if filters.get("date"):
+            start_date = end_date = date.fromisoformat(str(filters["date"]))
+        if filters.get("start_date") and filters.get("end_date"):
+            start_date = max(start_date or date.min, date.fromisoformat(str(filters["start_date"])))
+            end_date = min(end_date or date.max, date.fromisoformat(str(filters["end_date"])))
+        
+        marked, present = entry.counts(start_date, end_date)
+        if status_filter == "present":
+            return present
+        if status_filter == "absent":
+            return marked - present
+        return marked
+
+# Global index; built lazily on first use when ATTENDANCE_BITMAPS is enabled
+attendance_bitmaps = AttendanceBitmapIndex(settings.attendance_bitmaps_enabled, settings.attendance_bitmaps_refresh)
+
+async def count_attendance(filters: Dict[str, Any]) -> int:
+    """Count attendance rows matching the filters; one employee's come from their bitsets when enabled"""
+    if attendance_bitmaps.enabled:
+        total = await attendance_bitmaps.count(filters)
+        if total is not None:
+            return total
+    return await storage.attendance.count(filters)
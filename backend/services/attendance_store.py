@@ -0,0 +1,400 @@
+"""
+Optional in-process columnar copy of the attendance table for analytics.
+
+Attendance is held as parallel arrays, an int32 employee index and an int32
+day ordinal per row, with each row's status and liveness in two packed
+bitmaps. Employee metadata sits in a __slots__ table. Range counts for the
+dashboard, trends, monthly and report endpoints then become vectorized scans
+instead of database round trips. The store is loaded at startup (ATTENDANCE_STORE=true),
+one keyset page of marks at a time straight into the columns, and the write
+handlers apply their changes to it after they commit. Writes made by other
+processes show up after the next reload, every ATTENDANCE_STORE_REFRESH
+seconds, so it suits single-process deployments.
+"""
+import asyncio
+import time
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from config import settings
+from database.connection import db
+from repositories.base import Row
+from repositories.storage import storage
+from services.rates import percentage
+
+EPOCH = date(1970, 1, 1)
+
+def day_ordinal(value: Any) -> int:
+    """Days since 1970-01-01 for a date or ISO date string"""
+    if not isinstance(value, date):
+        value = date.fromisoformat(str(value)[:10])
+    return (value - EPOCH).days
+
+def row_keys(employee: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """One int64 per (employee, day) pair, ordered by employee then day"""
+    return (employee.astype(np.int64) << 32) | (day.astype(np.int64) & 0xFFFFFFFF)
+
+class EmployeeInfo:
+    __slots__ = ("id", "employee_id", "full_name", "department", "department_index")
+    
+    def __init__(self, id: str, employee_id: str, full_name: str, department: str, department_index: int):
+        self.id = id
+        self.employee_id = employee_id
+        self.full_name = full_name
+        self.department = department
+        self.department_index = department_index
+
+class Bitmap:
+    """Growable packed bit array, one bit per attendance slot"""
+    
+    __slots__ = ("bits",)
+    
+    def __init__(self, capacity: int):
+        self.bits = np.zeros((capacity + 7) // 8, dtype=np.uint8)
+    
+    @classmethod
+    def from_bools(cls, values: np.ndarray, capacity: int) -> "Bitmap":
+        bitmap = cls(capacity)
+        packed = np.packbits(values, bitorder="little")
+        bitmap.bits[:len(packed)] = packed
+        return bitmap
+    
+    def grow(self, capacity: int):
+        bits = np.zeros((capacity + 7) // 8, dtype=np.uint8)
+        bits[:len(self.bits)] = self.bits
+        self.bits = bits
+    
+    def set(self, i: int, value: bool):
+        if value:
+            self.bits[i >> 3] |= np.uint8(1 << (i & 7))
+        else:
+            self.bits[i >> 3] &= np.uint8(~(1 << (i & 7)) & 0xFF)
+    
+    def unpack(self, size: int) -> np.ndarray:
+        return np.unpackbits(self.bits, count=size, bitorder="little").view(bool)
+
+class AttendanceTable:
+    """
+    The columns plus a lookup from (employee, day) to slot: a sorted key array
+    for older slots and a dict for slots appended since the last reindex.
+    Deleted rows are cleared in the `live` bitmap rather than moved.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self.employees: List[Optional[EmployeeInfo]] = []
+        self.index_of: Dict[str, int] = {}
+        self.departments: List[str] = []
+        self.department_index: Dict[str, int] = {}
+        self._employee_departments: Optional[np.ndarray] = None
+        
+        self.size = 0
+        self.employee = np.zeros(capacity, dtype=np.int32)
+        self.day = np.zeros(capacity, dtype=np.int32)
+        self.present = Bitmap(capacity)
+        self.live = Bitmap(capacity)
+        
+        self.index_keys = np.zeros(0, dtype=np.int64)
+        self.index_slots = np.zeros(0, dtype=np.int32)
+        self.recent: Dict[int, int] = {}
+    
+    @classmethod
+    async def load(cls, employees: Iterable[Row], batches: AsyncIterator[List[Row]], capacity: int) -> "AttendanceTable":
+        """
+        Fill preallocated columns from batches of attendance rows
+        
+        Only the batch being copied is held as Python rows; `capacity` is the
+        expected row count, and the columns grow if more rows turn up.
+        """
+        table = cls(max(capacity, 1024))
+        for employee in employees:
+            table.add_employee(employee)
+        present = np.zeros(len(table.employee), dtype=bool)
+        
+        async for rows in batches:
+            count = len(rows)
+            employee = np.fromiter((table.index_of.get(str(row["employee_id"]), -1) for row in rows), np.int32, count)
+            day = np.fromiter((day_ordinal(row["attendance_date"]) for row in rows), np.int32, count)
+            status = np.fromiter((bool(row["present"]) for row in rows), bool, count)
+            # Marks of employees created after the labels were read come back through the replay
+            keep = employee >= 0
+            
+            start, end = table.size, table.size + int(np.count_nonzero(keep))
+            if end > len(table.employee):
+                capacity = max(end, 2 * len(table.employee))
+                table.employee = np.resize(table.employee, capacity)
+                table.day = np.resize(table.day, capacity)
+                present = np.resize(present, capacity)
+            table.employee[start:end] = employee[keep]
+            table.day[start:end] = day[keep]
+            present[start:end] = status[keep]
+            table.size = end
+        
+        table.present = Bitmap.from_bools(present[:table.size], len(table.employee))
+        table.live = Bitmap.from_bools(np.ones(table.size, dtype=bool), len(table.employee))
+        table.reindex()
+        return table
+    
+    # ==================== Employees ====================
+    
+    def add_employee(self, row: Row):
+        employee_uuid = str(row["id"])
+        if employee_uuid in self.index_of:
+            return
+        department_index = self.department_index.get(row["department"])
+        if department_index is None:
+            department_index = self.department_index[row["department"]] = len(self.departments)
+            self.departments.append(row["department"])
+        self.index_of[employee_uuid] = len(self.employees)
+        self.employees.append(EmployeeInfo(employee_uuid, row["employee_id"], row["full_name"], row["department"], department_index))
+        self._employee_departments = None
+    
+    def remove_employee(self, employee_uuid: str):
+        index = self.index_of.pop(str(employee_uuid), None)
+        if index is None:
+            return
+        self.employees[index] = None
+        self._employee_departments = None
+        # ON DELETE CASCADE
+        live = self.live.unpack(self.size)
+        live[self.employee[:self.size] == index] = False
+        self.live = Bitmap.from_bools(live, len(self.employee))
+    
+    def employee_departments(self) -> np.ndarray:
+        """Department index per employee index (-1 for deleted employees)"""
+        if self._employee_departments is None:
+            self._employee_departments = np.array(
+                [info.department_index if info else -1 for info in self.employees], dtype=np.int32
+            )
+        return self._employee_departments
+    
+    # ==================== Attendance ====================
+    
+    def reindex(self):
+        keys = row_keys(self.employee[:self.size], self.day[:self.size])
+        order = np.argsort(keys, kind="stable")
+        self.index_keys = keys[order]
+        self.index_slots = order.astype(np.int32)
+        self.recent = {}
+    
+    def find(self, key: int) -> Optional[int]:
+        slot = self.recent.get(key)
+        if slot is not None:
+            return slot
+        i = int(np.searchsorted(self.index_keys, key))
+        if i < len(self.index_keys) and self.index_keys[i] == key:
+            return int(self.index_slots[i])
+        return None
+    
+    def append(self, employee: int, day: int, present: bool, key: int):
+        if self.size == len(self.employee):
+            capacity = 2 * len(self.employee)
+            self.employee = np.resize(self.employee, capacity)
+            self.day = np.resize(self.day, capacity)
+            self.present.grow(capacity)
+            self.live.grow(capacity)
+        slot = self.size
+        self.employee[slot] = employee
+        self.day[slot] = day
+        self.present.set(slot, present)
+        self.live.set(slot, True)
+        self.size += 1
+        self.recent[key] = slot
+        if len(self.recent) > max(1024, self.size // 8):
+            self.reindex()
+    
+    def upsert(self, rows: Iterable[Row]):
+        for row in rows:
+            employee = self.index_of.get(str(row["employee_id"]))
+            if employee is None:
+                continue
+            day = day_ordinal(row["attendance_date"])
+            key = (employee << 32) | (day & 0xFFFFFFFF)
+            present = row["status"] == "present"
+            slot = self.find(key)
+            if slot is None:
+                self.append(employee, day, present, key)
+            else:
+                self.present.set(slot, present)
+                self.live.set(slot, True)
+    
+    def remove(self, row: Row):
+        employee = self.index_of.get(str(row["employee_id"]))
+        if employee is None:
+            return
+        slot = self.find((employee << 32) | (day_ordinal(row["attendance_date"]) & 0xFFFFFFFF))
+        if slot is not None:
+            self.live.set(slot, False)
+    
+    # ==================== Scans ====================
+    
+    def scan(self, start_date: date, end_date: date, department: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(employee index, day ordinal, present) arrays for the live rows in the range"""
+        size = self.size
+        day = self.day[:size]
+        mask = self.live.unpack(size) & (day >= day_ordinal(start_date)) & (day <= day_ordinal(end_date))
+        if department is not None:
+            department_index = self.department_index.get(department, -1)
+            mask &= self.employee_departments()[self.employee[:size]] == department_index
+        slots = np.flatnonzero(mask)
+        return self.employee[slots], day[slots], self.present.unpack(size)[slots]
+    
+    def daily_counts(self, start_date: date, end_date: date, department: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Present and absent counts for every day of the range"""
+        _, day, present = self.scan(start_date, end_date, department)
+        days = (end_date - start_date).days + 1
+        offsets = day - day_ordinal(start_date)
+        total = np.bincount(offsets, minlength=days)
+        present_counts = np.bincount(offsets, weights=present, minlength=days).astype(np.int64)
+        return present_counts, total - present_counts
+    
+    def totals(self) -> Tuple[int, int]:
+        """(present, total) over every live row"""
+        live = self.live.unpack(self.size)
+        return int(np.count_nonzero(live & self.present.unpack(self.size))), int(np.count_nonzero(live))
+
+async def attendance_batches(batch_size: int) -> AsyncIterator[List[Row]]:
+    """Every attendance mark, one keyset page at a time"""
+    after = None
+    while True:
+        rows = await storage.attendance.mark_page(batch_size, after)
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        after = [rows[-1]["attendance_date"], rows[-1]["id"]]
+
+class AttendanceStore:
+    """The process-wide table, its (re)loading and the hooks the write handlers call"""
+    
+    def __init__(self, enabled: bool, refresh: float):
+        self.enabled = enabled
+        self.refresh = refresh
+        self.table: Optional[AttendanceTable] = None
+        self.loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._reload: Optional[asyncio.Task] = None
+        # Writes applied while a load is reading the database, replayed onto the new table
+        self._replay: Optional[List[Tuple[str, tuple]]] = None
+    
+    async def load(self):
+        async with self._lock:
+            await self._load()
+    
+    async def _load(self):
+        self._replay = []
+        try:
+            labels, capacity = await db.gather(storage.employees.labels(), storage.attendance.count({}))
+            table = await AttendanceTable.load(labels.values(), attendance_batches(settings.attendance_store_load_batch), capacity)
+            for method, args in self._replay:
+                getattr(table, method)(*args)
+        finally:
+            self._replay = None
+        self.table = table
+        self.loaded_at = time.monotonic()
+        print(f"✅ Attendance store loaded ({table.size} rows, {len(table.index_of)} employees)")
+    
+    async def get_table(self) -> AttendanceTable:
+        if self.table is None:
+            async with self._lock:
+                if self.table is None:
+                    await self._load()
+        elif self.refresh and time.monotonic() - self.loaded_at > self.refresh:
+            # Serve the current table while a fresh copy loads in the background
+            if self._reload is None or self._reload.done():
+                self._reload = asyncio.create_task(self.load())
+        return self.table
+    
+    async def close(self):
+        if self._reload is not None:
+            self._reload.cancel()
+    
+    # ==================== Write hooks ====================
+    
+    def _apply(self, method: str, *args):
+        if not self.enabled:
+            return
+        if self._replay is not None:
+            self._replay.append((method, args))
+        if self.table is not None:
+            getattr(self.table, method)(*args)
+    
+    def record_upserts(self, rows: List[Row]):
+        """After attendance rows were inserted or their status changed"""
+        self._apply("upsert", rows)
+    
+    def record_delete(self, row: Row):
+        self._apply("remove", row)
+    
+    def add_employee(self, row: Row):
+        self._apply("add_employee", row)
+    
+    def remove_employee(self, employee_uuid: str):
+        self._apply("remove_employee", str(employee_uuid))
+    
+    async def sync_employees(self):
+        """Pick up employees created in bulk (CSV import)"""
+        if not self.enabled:
+            return
+        for row in (await storage.employees.labels()).values():
+            self.add_employee(row)
+    
+    # ==================== Reports ====================
+    
+    async def dashboard_metrics(self, today: date, recent_limit: int) -> Row:
+        """Same object as get_dashboard_metrics(); only the recent employees come from the database"""
+        if recent_limit > 0:
+            table, recent_employees = await db.gather(self.get_table(), storage.employees.list_page(recent_limit))
+        else:
+            table, recent_employees = await self.get_table(), []
+        present, total = table.totals()
+        today_present, today_absent = table.daily_counts(today, today)
+        return {
+            "total_employees": len(table.index_of),
+            "total_attendance_records": total,
+            "today_present": int(today_present[0]),
+            "today_absent": int(today_absent[0]),
+            "total_absent": total - present,
+            "overall_attendance_rate": percentage(present, total, 2),
+            "recent_employees": recent_employees
+        }
+    
+    async def trends(self, end_date: date, days: int, department: Optional[str] = None) -> List[Row]:
+        start_date = end_date - timedelta(days=days - 1)
+        present, absent = (await self.get_table()).daily_counts(start_date, end_date, department)
+        return [
+            {"attendance_date": str(start_date + timedelta(days=i)), "present": int(present[i]), "absent": int(absent[i])}
+            for i in range(days)
+        ]
+    
+    async def monthly(self, month: date, through: date, department: Optional[str] = None) -> List[Row]:
+        first_day = month.replace(day=1)
+        next_month = (first_day + timedelta(days=32)).replace(day=1)
+        last_day = min(next_month - timedelta(days=1), through)
+        if last_day < first_day:
+            return []
+        
+        present, absent = (await self.get_table()).daily_counts(first_day, last_day, department)
+        week_starts = np.arange(0, len(present), 7)
+        weekly_present = np.add.reduceat(present, week_starts)
+        weekly_absent = np.add.reduceat(absent, week_starts)
+        return [
+            {
+                "week": f"Week {week + 1}",
+                "present": int(week_present),
+                "absent": int(week_absent),
+                "total": int(week_present + week_absent),
+                "rate": percentage(int(week_present), int(week_present + week_absent), 1)
+            }
+            for week, (week_present, week_absent) in enumerate(zip(weekly_present, weekly_absent))
+        ]
+    
+    async def labels(self, department: Optional[str] = None) -> Dict[str, Row]:
+        table = await self.get_table()
+        return {
+            info.id: {"id": info.id, "employee_id": info.employee_id, "full_name": info.full_name, "department": info.department}
+            for info in table.employees
+            if info is not None and (not department or info.department == department)
+        }
+
+# Global store; lifespan loads it when ATTENDANCE_STORE is enabled
+attendance_store = AttendanceStore(settings.attendance_store_enabled, settings.attendance_store_refresh)
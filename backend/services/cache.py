@@ -0,0 +1,273 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Tuple
+from config import settings
+
+Loader = Callable[[], Awaitable[Any]]
+
+class LoadAbandoned(Exception):
+    """The request running a coalesced load was cancelled; waiters retry instead of failing"""
+
+# ==================== Backends ====================
+
+class CacheBackend(ABC):
+    """Storage for cached values and per-table version counters"""
+    
+    name = "abstract"
+    
+    async def connect(self):
+        pass
+    
+    async def close(self):
+        pass
+    
+    @abstractmethod
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value)"""
+    
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float):
+        pass
+    
+    @abstractmethod
+    async def get_versions(self, tables: List[str]) -> List[int]:
+        pass
+    
+    @abstractmethod
+    async def bump_versions(self, tables: List[str]):
+        pass
+    
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU store with TTLs; the local stand-in for Redis"""
+    
+    name = "memory"
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Start versions from the clock so keys never repeat across restarts
+        self._epoch = int(time.time() * 1000)
+        self._versions: Dict[str, int] = {}
+        self.evictions = 0
+    
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+    
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    async def get_versions(self, tables: List[str]) -> List[int]:
+        return [self._versions.get(table, self._epoch) for table in tables]
+    
+    async def bump_versions(self, tables: List[str]):
+        # Entries under old versions become unreachable and age out via LRU/TTL
+        for table in tables:
+            self._versions[table] = self._versions.get(table, self._epoch) + 1
+    
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "evictions": self.evictions
+        }
+
+class RedisBackend(CacheBackend):
+    """Redis store shared by every uvicorn worker"""
+    
+    name = "redis"
+    
+    def __init__(self, url: str, prefix: str):
+        self.url = url
+        self.prefix = prefix
+        self.client = None
+    
+    async def connect(self):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self.client = redis.from_url(self.url)
+        await self.client.ping()
+    
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+    
+    def _version_key(self, table: str) -> str:
+        return f"{self.prefix}:version:{table}"
+    
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        raw = await self.client.get(f"{self.prefix}:{key}")
+        if raw is None:
+            return False, None
+        return True, json.loads(raw)
+    
+    async def set(self, key: str, value: Any, ttl: float):
+        await self.client.set(f"{self.prefix}:{key}", json.dumps(value), px=int(ttl * 1000))
+    
+    async def get_versions(self, tables: List[str]) -> List[int]:
+        values = await self.client.mget([self._version_key(table) for table in tables])
+        return [int(value or 0) for value in values]
+    
+    async def bump_versions(self, tables: List[str]):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for table in tables:
+                pipe.incr(self._version_key(table))
+            await pipe.execute()
+    
+    def stats(self) -> dict:
+        return {"backend": self.name, "prefix": self.prefix}
+
+def create_backend() -> CacheBackend:
+    if settings.cache_backend == "redis":
+        return RedisBackend(settings.redis_url, settings.cache_key_prefix)
+    if settings.cache_backend == "memory":
+        return MemoryBackend(settings.cache_max_entries)
+    raise ValueError(f"Unknown CACHE_BACKEND '{settings.cache_backend}' (expected 'memory' or 'redis')")
+
+# ==================== Cache ====================
+
+class CacheNamespace:
+    """TTL, table dependencies and hit/miss counters for one group of cached responses"""
+    
+    def __init__(self, name: str, ttl: float, depends_on: Iterable[str]):
+        self.name = name
+        self.ttl = ttl
+        self.depends_on: List[str] = list(depends_on)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "ttl": self.ttl,
+            "depends_on": self.depends_on,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+class Cache:
+    """
+    Response cache with version-stamped keys.
+    
+    Every key embeds the current versions of the tables its namespace reads,
+    so a write that bumps a table version (from any worker, when the backend
+    is shared) makes all older entries unreachable at once. Cached values
+    must be JSON-serializable.
+    """
+    
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._namespaces: Dict[str, CacheNamespace] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.tables: set = set()
+    
+    async def connect(self):
+        """Switch to the configured backend"""
+        self.backend = create_backend()
+        await self.backend.connect()
+        print(f"✅ Response cache ready ({self.backend.name})")
+    
+    async def close(self):
+        await self.backend.close()
+    
+    def register(self, name: str, ttl: float, depends_on: Iterable[str]) -> CacheNamespace:
+        namespace = CacheNamespace(name, ttl, depends_on)
+        self._namespaces[name] = namespace
+        self.tables.update(namespace.depends_on)
+        return namespace
+    
+    async def _versioned_key(self, namespace: CacheNamespace, key: Hashable) -> str:
+        versions = await self.backend.get_versions(namespace.depends_on)
+        stamp = ".".join(str(version) for version in versions)
+        return f"{namespace.name}:{stamp}:{key!r}"
+    
+    async def get_or_load(self, name: str, key: Hashable, loader: Loader) -> Any:
+        if not settings.cache_enabled:
+            return await loader()
+        
+        namespace = self._namespaces[name]
+        full_key = await self._versioned_key(namespace, key)
+        
+        found, value = await self.backend.get(full_key)
+        if found:
+            namespace.hits += 1
+            return value
+        namespace.misses += 1
+        
+        # Join a load for the same key that is already running in this worker
+        while (inflight := self._inflight.get(full_key)) is not None:
+            namespace.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except LoadAbandoned:
+                # Its request went away; run the load here unless another waiter already took over
+                continue
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # Only this request was cancelled; the requests waiting on the load should not be
+            future.set_exception(LoadAbandoned())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            # A write during the load bumped the versions, so this key is never read again
+            await self.backend.set(full_key, value, namespace.ttl)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(full_key, None)
+    
+    async def invalidate(self, *tables: str):
+        """Invalidate every namespace that reads any of the written tables"""
+        await self.backend.bump_versions(list(tables))
+    
+    async def clear(self):
+        await self.backend.bump_versions(sorted(self.tables))
+    
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.cache_enabled,
+            **self.backend.stats(),
+            "namespaces": [namespace.stats() for namespace in self._namespaces.values()]
+        }
+
+# Global cache; lifespan swaps in the configured backend on startup
+cache = Cache(MemoryBackend(settings.cache_max_entries))
+cache.register("dashboard", settings.cache_ttl_dashboard, depends_on=("employees", "attendance"))
+cache.register("employees", settings.cache_ttl_employees, depends_on=("employees",))
+cache.register("department_stats", settings.cache_ttl_analytics, depends_on=("employees",))
+cache.register("analytics", settings.cache_ttl_analytics, depends_on=("employees", "attendance"))
+cache.register("table_versions", settings.cache_ttl_versions, depends_on=("employees", "attendance"))
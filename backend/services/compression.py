@@ -0,0 +1,174 @@
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Media types worth compressing; images, archives and event streams pass through
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/xml"
+)
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    
+    def allows(encoding: str) -> bool:
+        return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+    
+    if brotli is not None and allows("br"):
+        return "br"
+    if allows("gzip"):
+        return "gzip"
+    return None
+
+class StreamCompressor:
+    """Incremental gzip/brotli encoder that can flush after every chunk"""
+    
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            output = self._brotli.process(data)
+            return output + self._brotli.flush() if flush else output
+        output = self._zlib.compress(data)
+        return output + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else output
+    
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli (when installed) or gzip.
+    
+    Single-body responses under `minimum_size` bytes are sent as-is.
+    Streaming responses (exports) are compressed chunk by chunk and flushed
+    after each one, so clients still receive rows as they are produced.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+    
+    def _should_compress(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES
+    
+    def _new_compressor(self) -> StreamCompressor:
+        return StreamCompressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+    
+    async def send(self, message: Message):
+        message_type = message["type"]
+        
+        if message_type == "http.response.start":
+            # Hold the headers until the first body chunk shows how big the response is
+            self.start_message = message
+            self.passthrough = not self._should_compress(Headers(raw=message["headers"]))
+            return
+        
+        if message_type != "http.response.body":
+            await self._send(message)
+            return
+        
+        if self.passthrough:
+            if self.start_message is not None:
+                await self._send(self.start_message)
+                self.start_message = None
+            await self._send(message)
+            return
+        
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        
+        if self.start_message is not None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Small enough that compressing would not pay off
+                await self._send(self.start_message)
+                self.start_message = None
+                await self._send(message)
+                self.passthrough = True
+                return
+            
+            self.compressor = self._new_compressor()
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                # Length is unknown until the stream ends
+                del headers["Content-Length"]
+                body = self.compressor.compress(body, flush=True)
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+            await self._send(self.start_message)
+            self.start_message = None
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+        
+        if more_body:
+            body = self.compressor.compress(body, flush=True)
+        else:
+            body = self.compressor.compress(body) + self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
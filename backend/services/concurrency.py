@@ -0,0 +1,101 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, List, Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+class _Slot:
+    """One running call's claim on its request's semaphore"""
+    
+    __slots__ = ("semaphore", "held")
+    
+    def __init__(self, semaphore: asyncio.Semaphore):
+        self.semaphore = semaphore
+        self.held = True
+
+# The semaphore shared by every fan-out in the current request, and the slot the current task runs in
+_request_slots: ContextVar[Optional[asyncio.Semaphore]] = ContextVar("fan_out_slots", default=None)
+_current_slot: ContextVar[Optional[_Slot]] = ContextVar("fan_out_slot", default=None)
+
+async def _limited(call: Awaitable, semaphore: Optional[asyncio.Semaphore]) -> Any:
+    if semaphore is None:
+        return await call
+    await semaphore.acquire()
+    # Each task runs in its own copy of the context, so this is only seen by the call
+    slot = _Slot(semaphore)
+    _current_slot.set(slot)
+    try:
+        return await call
+    finally:
+        if slot.held:
+            semaphore.release()
+
+async def fan_out(*calls: Awaitable, limit: Optional[int] = None) -> List[Any]:
+    """
+    Await independent calls concurrently and return their results in order
+    
+    Inside a request wrapped by FanOutLimitMiddleware, every fan-out shares the
+    request's cap, including nested and sequential ones; elsewhere at most `limit`
+    run at once. A call that fans out itself hands its slot back while it waits
+    for its own calls, so nesting cannot deadlock. The first failure cancels the
+    calls still running and is re-raised once they have stopped, and cancelling
+    the caller cancels them all, so no call outlives this one (like asyncio.TaskGroup).
+    """
+    if len(calls) <= 1:
+        return [await call for call in calls]
+    
+    semaphore = _request_slots.get()
+    if semaphore is None and limit and limit < len(calls):
+        semaphore = asyncio.Semaphore(limit)
+    
+    # Waiting on our own calls is not running a query; free our slot for them meanwhile
+    slot = _current_slot.get()
+    if slot is not None and (slot.semaphore is not semaphore or not slot.held):
+        slot = None
+    if slot is not None:
+        slot.held = False
+        slot.semaphore.release()
+    
+    try:
+        return await _run(calls, semaphore)
+    finally:
+        if slot is not None:
+            await slot.semaphore.acquire()
+            slot.held = True
+
+async def _run(calls, semaphore: Optional[asyncio.Semaphore]) -> List[Any]:
+    tasks = [asyncio.ensure_future(_limited(call, semaphore)) for call in calls]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except BaseException:
+        # The caller was cancelled
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    
+    if pending:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    for task in tasks:
+        if task in done and not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+    return [task.result() for task in tasks]
+
+class FanOutLimitMiddleware:
+    """Give each HTTP request one semaphore that caps the concurrent calls of all its fan-outs"""
+    
+    def __init__(self, app: ASGIApp, limit: int = 4):
+        self.app = app
+        self.limit = limit
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or self.limit <= 0:
+            await self.app(scope, receive, send)
+            return
+        
+        token = _request_slots.set(asyncio.Semaphore(self.limit))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_slots.reset(token)
@@ -0,0 +1,76 @@
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+from fastapi import Request, Response, status
+from repositories.storage import storage
+from services.cache import cache
+
+async def get_table_versions(tables: Iterable[str]) -> list:
+    """
+    Read the trigger-maintained change counters for the given tables
+    
+    The rows are cached for CACHE_TTL_VERSIONS, and writes through the API
+    invalidate them, so a cache hit or 304 does not cost a database query.
+    """
+    tables = list(tables)
+    
+    async def load_versions() -> list:
+        rows = await storage.table_versions(tables)
+        return [
+            {"table_name": row["table_name"], "version": row["version"], "updated_at": str(row["updated_at"])}
+            for row in rows
+        ]
+    
+    return await cache.get_or_load("table_versions", tuple(tables), load_versions)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" are the same validator
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+async def check_conditional(request: Request, tables: Iterable[str], *extra) -> Tuple[Optional[Response], dict]:
+    """
+    Build ETag/Last-Modified validators from table versions and the request.
+    
+    Returns (304 response or None, headers to attach to a full response).
+    `extra` holds anything else the payload depends on, such as today's date.
+    The ETag also tracks writes made outside this API, so handlers add it to
+    their cache keys to keep cached bodies and validators in step.
+    """
+    versions = await get_table_versions(tables)
+    
+    fingerprint = repr((
+        request.url.path,
+        str(request.url.query),
+        [(row["table_name"], row["version"], row["updated_at"]) for row in versions],
+        extra
+    ))
+    etag = f'W/"{hashlib.sha1(fingerprint.encode()).hexdigest()[:24]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    last_modified = max((datetime.fromisoformat(str(row["updated_at"])) for row in versions), default=None)
+    if last_modified is not None and not extra:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif "Last-Modified" in headers and request.headers.get("if-modified-since"):
+        not_modified = _not_modified_since(request.headers["if-modified-since"], last_modified)
+    else:
+        not_modified = False
+    
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers), headers
+    return None, headers
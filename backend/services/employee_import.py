@@ -0,0 +1,154 @@
+"""
+Bulk employee import from CSV.
+
+The CSV needs the columns employee_id, full_name, email and department.
+Rows are read and validated with EmployeeCreate in batches, checked for
+conflicts against existing employees with one query per batch, and each
+batch is inserted in one statement through the configured storage (COPY over
+the direct Postgres pool, a multi-row insert through PostgREST).
+
+Usage (from the backend directory):
+    python -m services.employee_import employees.csv [--batch-size 500]
+"""
+import argparse
+import asyncio
+import csv
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterable, List, Tuple
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from repositories.storage import storage
+from models.schemas import EmployeeCreate, EmployeeImportResult, EmployeeImportRowError
+from services.validation import format_validation_errors
+
+IMPORT_COLUMNS = ["employee_id", "full_name", "email", "department"]
+
+async def _load_batch(batch: List[Tuple[int, EmployeeCreate]], result: EmployeeImportResult):
+    """Drop rows that clash with existing employees, then load the rest in one statement"""
+    conflicts = await storage.employees.find_conflicts(
+        [employee.employee_id for _, employee in batch],
+        [employee.email for _, employee in batch]
+    )
+    taken_ids = {row["employee_id"] for row in conflicts}
+    taken_emails = {row["email"] for row in conflicts}
+    
+    valid = []
+    for row_number, employee in batch:
+        if employee.employee_id in taken_ids:
+            error = f"Employee ID '{employee.employee_id}' already exists"
+        elif employee.email in taken_emails:
+            error = f"Email '{employee.email}' is already registered"
+        else:
+            valid.append((row_number, employee))
+            continue
+        result.errors.append(EmployeeImportRowError(row=row_number, employee_id=employee.employee_id, error=error))
+    
+    if not valid:
+        return
+    
+    try:
+        await storage.employees.insert_many([employee.model_dump(include=set(IMPORT_COLUMNS)) for _, employee in valid])
+    except Exception as e:
+        # A concurrent writer can still win the race; the whole statement is rolled back
+        for row_number, employee in valid:
+            result.errors.append(EmployeeImportRowError(
+                row=row_number,
+                employee_id=employee.employee_id,
+                error=f"Error importing employee: {str(e)}"
+            ))
+        return
+    
+    result.imported += len(valid)
+
+async def _read_rows(reader: csv.DictReader, batch_size: int) -> AsyncIterator[Dict[str, str]]:
+    """CSV rows, read from the file on a worker thread one batch at a time"""
+    while True:
+        rows = await run_in_threadpool(lambda: list(islice(reader, batch_size)))
+        if not rows:
+            return
+        for row in rows:
+            yield row
+
+async def import_employees(lines: Iterable[str], batch_size: int = None) -> EmployeeImportResult:
+    """
+    Import employees from CSV text lines, returning a per-row error report
+    
+    The lines are read and split into rows on a worker thread, one batch at a
+    time, so a large upload spooled to disk does not block the event loop.
+    """
+    batch_size = batch_size or settings.bulk_chunk_size
+    reader = csv.DictReader(lines)
+    
+    fieldnames = await run_in_threadpool(lambda: reader.fieldnames)
+    missing = [column for column in IMPORT_COLUMNS if column not in (fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+    
+    result = EmployeeImportResult(total_rows=0, imported=0, failed=0, errors=[])
+    seen_ids, seen_emails = set(), set()
+    batch: List[Tuple[int, EmployeeCreate]] = []
+    
+    row_number = 1
+    async for row in _read_rows(reader, batch_size):
+        row_number += 1
+        result.total_rows += 1
+        try:
+            employee = EmployeeCreate(**{column: row.get(column) or "" for column in IMPORT_COLUMNS})
+        except ValidationError as e:
+            result.errors.append(EmployeeImportRowError(
+                row=row_number,
+                employee_id=row.get("employee_id"),
+                error="; ".join(format_validation_errors(e.errors()))
+            ))
+            continue
+        
+        # Duplicates inside the file itself
+        if employee.employee_id in seen_ids:
+            result.errors.append(EmployeeImportRowError(
+                row=row_number,
+                employee_id=employee.employee_id,
+                error=f"Employee ID '{employee.employee_id}' appears more than once in the file"
+            ))
+            continue
+        if employee.email in seen_emails:
+            result.errors.append(EmployeeImportRowError(
+                row=row_number,
+                employee_id=employee.employee_id,
+                error=f"Email '{employee.email}' appears more than once in the file"
+            ))
+            continue
+        seen_ids.add(employee.employee_id)
+        seen_emails.add(employee.email)
+        
+        batch.append((row_number, employee))
+        if len(batch) >= batch_size:
+            await _load_batch(batch, result)
+            batch = []
+    
+    if batch:
+        await _load_batch(batch, result)
+    
+    result.errors.sort(key=lambda error: error.row)
+    result.failed = len(result.errors)
+    return result
+
+async def main():
+    parser = argparse.ArgumentParser(description="Import employees from a CSV file")
+    parser.add_argument("path", help="CSV file with employee_id, full_name, email, department columns")
+    parser.add_argument("--batch-size", type=int, default=settings.bulk_chunk_size)
+    args = parser.parse_args()
+    
+    await storage.connect()
+    try:
+        with open(args.path, newline="", encoding="utf-8-sig") as f:
+            result = await import_employees(f, args.batch_size)
+    finally:
+        await storage.close()
+    
+    print(f"✅ Imported {result.imported} of {result.total_rows} employees")
+    for error in result.errors:
+        print(f"❌ Row {error.row} ({error.employee_id or '-'}): {error.error}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+import asyncio
+import json
+from datetime import date
+from typing import Any, Optional, Set, Tuple
+from config import settings
+from repositories.storage import storage
+from services.attendance_store import attendance_store
+from models.schemas import DashboardMetrics
+
+Event = Tuple[str, Any]
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+class Subscriber:
+    """One connected client and its bounded queue of pending events"""
+    
+    def __init__(self, queue_size: int):
+        # None is the close sentinel pushed on shutdown
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+class Broadcaster:
+    """
+    In-process fan-out of events to connected clients.
+    
+    Publishing never awaits a client: each subscriber has a bounded queue,
+    and a client that falls behind has its backlog replaced by a single
+    "resync" event telling it to refetch instead of buffering without limit.
+    """
+    
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscriber] = set()
+        self.published = 0
+        self.resyncs = 0
+    
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+    
+    def subscribe(self) -> Subscriber:
+        if len(self._subscribers) >= self.max_subscribers:
+            raise RuntimeError("Too many event stream clients connected")
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+    
+    def publish(self, event: str, data: Any):
+        self.published += 1
+        for subscriber in self._subscribers:
+            try:
+                subscriber.queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                subscriber.dropped += 1
+                self.resyncs += 1
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(("resync", {}))
+    
+    def close(self):
+        """Tell every open stream to finish so shutdown is not held up"""
+        for subscriber in self._subscribers:
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(None)
+    
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "max_subscribers": self.max_subscribers,
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "resyncs": self.resyncs
+        }
+
+class MetricsFeed:
+    """
+    Pushes dashboard metric deltas after writes.
+    
+    Writes only mark the feed dirty; a single background task waits for the
+    debounce interval, reloads the metrics once and publishes the fields that
+    changed, so a burst of check-ins costs one aggregate query per interval
+    no matter how many clients are connected. A failed reload publishes
+    nothing; the next write tries again.
+    """
+    
+    def __init__(self, broadcaster: Broadcaster, debounce: float):
+        self.broadcaster = broadcaster
+        self.debounce = debounce
+        self._snapshot: Optional[dict] = None
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+    
+    def notify(self):
+        """Called by the routers after a committed employee/attendance write"""
+        if not self.broadcaster.subscriber_count:
+            # Nobody is listening; the next client starts from a full REST load
+            self._snapshot = None
+            return
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+    
+    async def _load(self) -> dict:
+        source = attendance_store if attendance_store.enabled else storage.attendance
+        metrics = await source.dashboard_metrics(date.today(), 5)
+        return DashboardMetrics(**metrics).model_dump(mode="json")
+    
+    async def _flush(self):
+        # Writes that land while a load is running set the flag again and get another pass
+        while self._dirty:
+            self._dirty = False
+            await asyncio.sleep(self.debounce)
+            try:
+                metrics = await self._load()
+            except Exception as e:
+                # Keep the last snapshot; the next write retries and publishes everything that changed since it.
+                # A resync here would send every client to /api/dashboard while the database is failing.
+                print(f"❌ Error loading metrics for event stream: {e}")
+                continue
+            
+            previous = self._snapshot or {}
+            changes = {key: value for key, value in metrics.items() if previous.get(key) != value}
+            self._snapshot = metrics
+            if changes:
+                self.broadcaster.publish("metrics", changes)
+    
+    async def close(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.broadcaster.close()
+
+# Global event fan-out for the live dashboard
+broadcaster = Broadcaster(settings.events_queue_size, settings.events_max_clients)
+metrics_feed = MetricsFeed(broadcaster, settings.events_debounce)
@@ -0,0 +1,229 @@
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+# ==================== Metric types ====================
+
+class Metric(ABC):
+    kind = "untyped"
+    
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+    
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines for every label set"""
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    kind = "counter"
+    
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+class Gauge(Metric):
+    kind = "gauge"
+    
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), collect: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        # Optional callback read at scrape time (e.g. pool sizes)
+        self._collect = collect
+    
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+    
+    def samples(self) -> List[str]:
+        values = self._collect() if self._collect else self._values
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(values.items())
+        ]
+
+class Histogram(Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+    
+    def observe(self, *labels: str, value: float):
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        state[-2] += value
+        state[-1] += 1
+    
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, inf)} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {state[-1]}")
+        return lines
+
+class Registry:
+    """Process-local metrics rendered in the Prometheus text format"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+    
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "hrms_http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+))
+http_request_duration = registry.register(Histogram(
+    "hrms_http_request_duration_seconds", "HTTP request latency until the last body chunk is sent", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "hrms_http_requests_in_flight", "HTTP requests currently being handled"
+))
+db_query_duration = registry.register(Histogram(
+    "hrms_db_query_duration_seconds", "Database call latency", ("backend", "table", "operation")
+))
+db_query_rows = registry.register(Counter(
+    "hrms_db_query_rows_total", "Rows returned by database calls", ("backend", "table", "operation")
+))
+db_query_bytes = registry.register(Counter(
+    "hrms_db_query_bytes_total", "Response bytes received from PostgREST", ("backend", "table", "operation")
+))
+db_query_errors = registry.register(Counter(
+    "hrms_db_query_errors_total", "Database calls that raised", ("backend", "table", "operation")
+))
+
+# ==================== Database labels ====================
+
+_POSTGREST_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+def describe_postgrest(query) -> Tuple[str, str]:
+    """(table, operation) for a PostgREST request builder"""
+    request = getattr(query, "request", None)
+    if request is None:
+        return "unknown", "unknown"
+    segments = [segment for segment in str(request.path).split("?")[0].split("/") if segment]
+    if len(segments) >= 2 and segments[-2] == "rpc":
+        return segments[-1], "rpc"
+    operation = _POSTGREST_OPERATIONS.get(request.http_method, request.http_method.lower())
+    if operation == "insert" and "merge-duplicates" in request.headers.get("prefer", ""):
+        operation = "upsert"
+    return (segments[-1] if segments else "unknown"), operation
+
+_SQL_TARGET = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+([\w.]+)\s*(\()?", re.IGNORECASE)
+_SQL_FUNCTION = re.compile(r"^\s*SELECT\s+([\w.]+)\s*\(", re.IGNORECASE)
+_SQL_COPY = re.compile(r"^\s*COPY\s+([\w.]+)", re.IGNORECASE)
+
+def describe_sql(query: str) -> Tuple[str, str]:
+    """(table, operation) for a SQL statement sent over the asyncpg pool"""
+    words = query.split(None, 1)
+    operation = words[0].lower() if words else "unknown"
+    copy = _SQL_COPY.match(query)
+    if copy:
+        return copy.group(1), operation
+    target = _SQL_TARGET.search(query)
+    if target:
+        # "SELECT * FROM fn(...)" calls a set-returning function
+        return target.group(1), "rpc" if target.group(2) and operation == "select" else operation
+    function = _SQL_FUNCTION.match(query)
+    if function:
+        return function.group(1), "rpc"
+    return "none", operation
+
+def observe_query(backend: str, table: str, operation: str, seconds: float, rows: int = 0, nbytes: int = 0, error: bool = False):
+    db_query_duration.observe(backend, table, operation, value=seconds)
+    if error:
+        db_query_errors.inc(backend, table, operation)
+        return
+    db_query_rows.inc(backend, table, operation, amount=rows)
+    if nbytes:
+        db_query_bytes.inc(backend, table, operation, amount=nbytes)
+
+# ==================== HTTP middleware ====================
+
+class MetricsMiddleware:
+    """Record latency, status code and in-flight count for every HTTP request"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status_code = 500
+        http_requests_in_flight.inc()
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            # The router stores the matched route in the scope; the template keeps label cardinality bounded
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_request_duration.observe(method, route_path, value=time.perf_counter() - started)
+            http_requests_total.inc(method, route_path, str(status_code))
@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, List, Sequence
+from uuid import UUID
+
+# Cursor value checks per list; each parser raises ValueError on a value the query could not use
+CREATED_AT_ID = (datetime.fromisoformat, UUID)
+DATE_ID = (date.fromisoformat, UUID)
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable[[str], Any]] = (str, str)) -> List[str]:
+    """
+    Decode a cursor produced by encode_cursor, raising ValueError if it is malformed
+    or a value does not parse with its entry in `parsers` (one per sort column)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != len(parsers) or not all(isinstance(v, str) for v in values):
+        raise ValueError("Invalid pagination cursor")
+    try:
+        for parse, value in zip(parsers, values):
+            parse(value)
+    except ValueError:
+        raise ValueError("Invalid pagination cursor")
+    return values
+
+def keyset_filter(columns: List[str], values: List[str]) -> str:
+    """
+    PostgREST or-filter selecting rows strictly after (values) in descending
+    (columns) order, e.g. created_at < x OR (created_at = x AND id < y)
+    """
+    (first, second), (first_value, second_value) = columns, values
+    return (
+        f'{first}.lt."{first_value}",'
+        f'and({first}.eq."{first_value}",{second}.lt."{second_value}")'
+    )
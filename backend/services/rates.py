@@ -0,0 +1,8 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+def percentage(present: int, total: int, places: int) -> float:
+    """present / total as a percentage, rounded half away from zero like SQL ROUND"""
+    if not total:
+        return 0
+    exponent = Decimal(1).scaleb(-places)
+    return float((Decimal(present * 100) / Decimal(total)).quantize(exponent, rounding=ROUND_HALF_UP))
@@ -0,0 +1,52 @@
+import json
+from decimal import Decimal
+from typing import Any, Optional
+from uuid import UUID
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Encode the few types orjson/json don't handle natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        # asyncpg returns its own UUID subclass, which orjson doesn't recognise
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if orjson is None:
+        # stdlib json: UUID, date and datetime
+        return value.isoformat() if hasattr(value, "isoformat") else str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when installed (stdlib json otherwise)"""
+    
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def json_response(content: Any, response: Optional[Response] = None) -> Any:
+    """
+    Return trusted content (rows built from database data) from an endpoint.
+    
+    With FAST_JSON enabled the content is encoded directly, skipping
+    FastAPI's response_model validation and jsonable_encoder pass; headers
+    already set on the endpoint's `response` (ETag, Cache-Control) are
+    carried over. Otherwise the content is returned as-is for FastAPI to
+    validate and encode as usual.
+    """
+    if not settings.fast_json:
+        return content
+    fast = FastJSONResponse(content)
+    if response is not None:
+        fast.headers.update(response.headers)
+    return fast
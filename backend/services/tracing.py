@@ -0,0 +1,180 @@
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+@dataclass
+class QueryRecord:
+    """One database call made while handling a request"""
+    backend: str
+    table: str
+    operation: str
+    fingerprint: str
+    offset: float      # seconds from the start of the request
+    seconds: float
+    rows: int
+    error: bool
+
+class QueryTrace:
+    """Every database call made by one request, in the order they finished"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries: List[QueryRecord] = []
+        # Set once the response is sent; background tasks that inherited the context stop recording
+        self.finished = False
+    
+    @property
+    def query_count(self) -> int:
+        return len(self.queries)
+    
+    @property
+    def db_seconds(self) -> float:
+        return sum(query.seconds for query in self.queries)
+    
+    def add(self, backend: str, table: str, operation: str, fingerprint: str, seconds: float, rows: int = 0, error: bool = False):
+        offset = time.perf_counter() - self.started - seconds
+        self.queries.append(QueryRecord(backend, table, operation, fingerprint, offset, seconds, rows, error))
+    
+    def by_fingerprint(self) -> List[Tuple[str, int, float]]:
+        """(fingerprint, calls, seconds), slowest first; repeated fingerprints point at N+1 loops"""
+        groups: Dict[str, List[float]] = {}
+        for query in self.queries:
+            group = groups.setdefault(f"{query.backend} {query.fingerprint}", [0, 0.0])
+            group[0] += 1
+            group[1] += query.seconds
+        return sorted(((key, int(calls), seconds) for key, (calls, seconds) in groups.items()), key=lambda item: -item[2])
+    
+    def server_timing(self, limit: int = 8) -> str:
+        """Server-Timing header value: total DB time plus the slowest table/operation pairs"""
+        elapsed = time.perf_counter() - self.started
+        entries = [
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.query_count} queries"',
+            f"app;dur={elapsed * 1000:.1f}"
+        ]
+        groups: Dict[Tuple[str, str], List[float]] = {}
+        for query in self.queries:
+            group = groups.setdefault((query.table, query.operation), [0, 0.0])
+            group[0] += 1
+            group[1] += query.seconds
+        slowest = sorted(groups.items(), key=lambda item: -item[1][1])[:limit]
+        for (table, operation), (calls, seconds) in slowest:
+            name = re.sub(r"[^A-Za-z0-9_-]", "_", f"db-{table}-{operation}")
+            entries.append(f'{name};dur={seconds * 1000:.1f};desc="{int(calls)}x {operation} {table}"')
+        return ", ".join(entries)
+
+_current_trace: ContextVar[Optional[QueryTrace]] = ContextVar("query_trace", default=None)
+
+def current_trace() -> Optional[QueryTrace]:
+    """The trace of the request being handled, if tracing is on and the request is still open"""
+    trace = _current_trace.get()
+    if trace is None or trace.finished:
+        return None
+    return trace
+
+# ==================== Fingerprints ====================
+
+# PostgREST parameters that describe the shape of a query rather than its values
+_POSTGREST_SHAPE_PARAMS = ("select", "order", "on_conflict", "columns")
+_POSTGREST_OPERATOR = re.compile(r"^((?:not\.)?[a-z]+)\.")
+
+def fingerprint_postgrest(query) -> str:
+    """Method, path and filters of a PostgREST request with the values replaced by ?"""
+    request = getattr(query, "request", None)
+    if request is None:
+        return "unknown"
+    path = "/" + str(request.path).split("/rest/v1/", 1)[-1].lstrip("/")
+    if request.json and path.startswith("/rpc/"):
+        return f"{request.http_method} {path}({', '.join(sorted(request.json))})"
+    params = []
+    for key, value in request.params.multi_items():
+        if key in _POSTGREST_SHAPE_PARAMS:
+            params.append(f"{key}={value}")
+        elif key in ("limit", "offset"):
+            params.append(f"{key}=?")
+        else:
+            # "eq.abc" -> "eq.?", "not.in.(...)" -> "not.in.?"; or/and groups collapse entirely
+            operator = _POSTGREST_OPERATOR.match(value)
+            params.append(f"{key}={operator.group(1)}.?" if operator else f"{key}=?")
+    return f"{request.http_method} {path}" + (f"?{'&'.join(params)}" if params else "")
+
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_SQL_SPACE = re.compile(r"\s+")
+
+def fingerprint_sql(query: str, max_length: int = 200) -> str:
+    """SQL text with literals replaced by ? and whitespace collapsed ($n parameters are kept)"""
+    normalized = _SQL_SPACE.sub(" ", _SQL_NUMBER.sub("?", _SQL_STRING.sub("?", query))).strip()
+    return normalized if len(normalized) <= max_length else normalized[:max_length - 3] + "..."
+
+# ==================== Middleware ====================
+
+class TracingMiddleware:
+    """
+    Collect every database call made while handling a request.
+    
+    Requests over `max_queries` calls or `slow_db_ms` of database time are
+    logged with a per-fingerprint breakdown (0 disables a threshold). With
+    `server_timing` on, responses carry a Server-Timing header that browser
+    devtools show next to the request; streamed responses only include the
+    calls made before their headers were sent.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_queries: int = 10,
+        slow_db_ms: float = 250,
+        server_timing: bool = False,
+        timing_allow_origin: str = "*"
+    ):
+        self.app = app
+        self.max_queries = max_queries
+        self.slow_db_ms = slow_db_ms
+        self.server_timing = server_timing
+        self.timing_allow_origin = timing_allow_origin
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        trace = QueryTrace()
+        token = _current_trace.set(trace)
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", trace.server_timing())
+                    headers.append("Timing-Allow-Origin", self.timing_allow_origin)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            trace.finished = True
+            _current_trace.reset(token)
+            self._report(scope, status_code, trace)
+    
+    def _report(self, scope: Scope, status_code: int, trace: QueryTrace):
+        db_ms = trace.db_seconds * 1000
+        too_many = self.max_queries and trace.query_count > self.max_queries
+        too_slow = self.slow_db_ms and db_ms > self.slow_db_ms
+        if not (too_many or too_slow):
+            return
+        
+        elapsed_ms = (time.perf_counter() - trace.started) * 1000
+        lines = [
+            f"🐢 {scope['method']} {scope['path']} {status_code}: "
+            f"{trace.query_count} queries, {db_ms:.1f} ms in database ({elapsed_ms:.1f} ms total)"
+        ]
+        for fingerprint, calls, seconds in trace.by_fingerprint():
+            lines.append(f"    {calls:>3}x {seconds * 1000:8.1f} ms  {fingerprint}")
+        print("\n".join(lines))
@@ -0,0 +1,9 @@
+from typing import List
+
+def format_validation_errors(errors: List[dict]) -> List[str]:
+    """Render Pydantic error dicts as 'field -> path: message' strings"""
+    messages = []
+    for error in errors:
+        field = " -> ".join(str(loc) for loc in error["loc"])
+        messages.append(f"{field}: {error['msg']}" if field else error["msg"])
+    return messages
@@ -0,0 +1,15 @@
+import os
+import sys
+
+# Run the app on the in-memory engine with no cache; set before config is imported
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ["CACHE_ENABLED"] = "false"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
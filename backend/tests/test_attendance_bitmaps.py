@@ -0,0 +1,28 @@
+from datetime import date
+import numpy as np
+from services.attendance_bitmaps import EmployeeDays
+from services.attendance_store import day_ordinal
+
+def new_employee() -> EmployeeDays:
+    entry = EmployeeDays({"id": "e1", "employee_id": "BIT001", "full_name": "Bitset Test", "department": "HR"})
+    entry.build(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool))
+    return entry
+
+def test_first_mark_allocates_from_that_day():
+    entry = new_employee()
+    entry.mark(day_ordinal(date(2026, 1, 5)), "present")
+    
+    assert len(entry.marked.bits) == 1
+    assert len(entry.present.bits) == 1
+    assert entry.counts() == (1, 1)
+
+def test_marks_grow_in_both_directions():
+    entry = new_employee()
+    entry.mark(day_ordinal(date(2026, 1, 5)), "present")
+    entry.mark(day_ordinal(date(2026, 1, 30)), "absent")
+    entry.mark(day_ordinal(date(2025, 12, 20)), "present")
+    
+    assert len(entry.marked.bits) <= 7
+    assert entry.counts() == (3, 2)
+    assert entry.counts(date(2026, 1, 1), date(2026, 1, 31)) == (2, 1)
+    assert entry.statuses(date(2026, 1, 4), date(2026, 1, 6)) == [None, "present", None]
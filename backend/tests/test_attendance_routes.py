@@ -0,0 +1,65 @@
+from uuid import uuid4
+import pytest
+
+def test_update_unknown_attendance_returns_404(client):
+    response = client.put(f"/api/attendance/{uuid4()}", params={"status": "present"})
+    assert response.status_code == 404
+    assert "not found" in response.json()["detail"]
+
+def test_update_attendance_status(client):
+    employee = client.post("/api/employees", json={
+        "employee_id": "UPD001",
+        "full_name": "Update Test",
+        "email": "update.test@example.com",
+        "department": "Engineering"
+    }).json()
+    marked = client.post("/api/attendance", json={
+        "employee_id": employee["id"],
+        "attendance_date": "2026-01-05",
+        "status": "present"
+    }).json()
+    
+    response = client.put(f"/api/attendance/{marked['id']}", params={"status": "absent"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "absent"
+
+@pytest.mark.parametrize("path", ["/api/attendance/filter", "/api/attendance/export"])
+@pytest.mark.parametrize("params", [
+    {"date": "2026-02-30"},
+    {"start_date": "yesterday", "end_date": "2026-01-31"},
+    {"employee_id": "00000000-0000-0000-0000-000000000000", "start_date": "2026-01-01", "end_date": "2026-1-5", "include_total": True}
+])
+def test_invalid_filter_dates_return_400(client, path, params):
+    response = client.get(path, params=params)
+    assert response.status_code == 400
+    assert "expected YYYY-MM-DD" in response.json()["detail"]
+
+def test_bulk_mark_reports_conflicts_per_item(client):
+    employee = client.post("/api/employees", json={
+        "employee_id": "BLK001",
+        "full_name": "Bulk Test",
+        "email": "bulk.test@example.com",
+        "department": "Operations"
+    }).json()
+    client.post("/api/attendance", json={"employee_id": employee["id"], "attendance_date": "2026-02-02", "status": "present"})
+    
+    response = client.post("/api/attendance/bulk", json={"items": [
+        {"employee_id": employee["id"], "attendance_date": "2026-02-03", "status": "present"},
+        {"employee_id": employee["id"], "attendance_date": "2026-02-03", "status": "absent"},
+        {"employee_id": str(uuid4()), "attendance_date": "2026-02-03", "status": "present"},
+        {"employee_id": employee["id"], "attendance_date": "2026-02-04", "status": "late"},
+        {"employee_id": employee["id"], "attendance_date": "2026-02-02", "status": "absent"}
+    ]})
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["total"], result["succeeded"], result["failed"]) == (5, 2, 3)
+    
+    items = result["results"]
+    assert items[0]["error"] == "Superseded by item 1 for the same employee and date"
+    assert items[1]["success"] and items[1]["record"]["status"] == "absent"
+    assert "not found" in items[2]["error"]
+    assert not items[3]["success"] and items[3]["error"]
+    # An existing mark for the same day is overwritten, not duplicated
+    assert items[4]["success"] and items[4]["record"]["status"] == "absent"
+    marks = client.get("/api/attendance/filter", params={"employee_id": employee["id"], "date": "2026-02-02"}).json()["items"]
+    assert [mark["status"] for mark in marks] == ["absent"]
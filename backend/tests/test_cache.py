@@ -0,0 +1,73 @@
+import asyncio
+from services.cache import Cache, MemoryBackend
+
+def test_cancelled_leader_does_not_fail_coalesced_waiters(monkeypatch):
+    monkeypatch.setattr("services.cache.settings.cache_enabled", True)
+    cache = Cache(MemoryBackend(16))
+    cache.register("reports", ttl=60, depends_on=["attendance"])
+    calls = []
+    
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "report"
+    
+    async def scenario():
+        leader = asyncio.create_task(cache.get_or_load("reports", "key", loader))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_load("reports", "key", loader)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        # The leader's client disconnects mid-load
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        assert leader.cancelled()
+        return results
+    
+    assert asyncio.run(scenario()) == ["report"] * 3
+    # One waiter took over the load and the others joined it
+    assert len(calls) == 2
+
+def test_concurrent_misses_share_one_load(monkeypatch):
+    monkeypatch.setattr("services.cache.settings.cache_enabled", True)
+    cache = Cache(MemoryBackend(16))
+    namespace = cache.register("reports", ttl=60, depends_on=["attendance"])
+    calls = []
+    
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"rows": 3}
+    
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_load("reports", "key", loader) for _ in range(5)))
+    
+    assert asyncio.run(scenario()) == [{"rows": 3}] * 5
+    assert len(calls) == 1
+    assert namespace.coalesced == 4
+
+def test_invalidation_only_reloads_dependent_namespaces(monkeypatch):
+    monkeypatch.setattr("services.cache.settings.cache_enabled", True)
+    cache = Cache(MemoryBackend(16))
+    cache.register("reports", ttl=60, depends_on=["employees", "attendance"])
+    cache.register("directory", ttl=60, depends_on=["employees"])
+    loads = {"reports": 0, "directory": 0}
+    
+    def loader(name):
+        async def load():
+            loads[name] += 1
+            return loads[name]
+        return load
+    
+    async def read_both():
+        return [await cache.get_or_load(name, "key", loader(name)) for name in ("reports", "directory")]
+    
+    async def scenario():
+        first = await read_both()
+        cached = await read_both()
+        await cache.invalidate("attendance")
+        after_attendance = await read_both()
+        await cache.invalidate("employees")
+        after_employees = await read_both()
+        return first, cached, after_attendance, after_employees
+    
+    assert asyncio.run(scenario()) == ([1, 1], [1, 1], [2, 1], [3, 2])
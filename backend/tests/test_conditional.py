@@ -0,0 +1,28 @@
+from repositories.storage import storage
+
+def test_validators_reuse_table_versions_until_a_write(client, monkeypatch):
+    monkeypatch.setattr("services.cache.settings.cache_enabled", True)
+    reads = []
+    table_versions = storage.table_versions
+    
+    async def counted(tables):
+        reads.append(list(tables))
+        return await table_versions(tables)
+    
+    monkeypatch.setattr(storage, "table_versions", counted)
+    
+    first = client.get("/api/employees")
+    assert first.status_code == 200
+    again = client.get("/api/employees", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert len(reads) == 1
+    
+    client.post("/api/employees", json={
+        "employee_id": "ETAG001",
+        "full_name": "Etag Test",
+        "email": "etag.test@example.com",
+        "department": "Finance"
+    })
+    changed = client.get("/api/employees", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert len(reads) == 2
@@ -0,0 +1,43 @@
+def upload(client, text: str):
+    return client.post("/api/employees/import", files={"file": ("employees.csv", text.encode("utf-8"), "text/csv")})
+
+def test_import_reports_rows_across_batches(client):
+    rows = [f"IMP{i:04d},Import {i},import{i}@example.com,Sales" for i in range(1200)]
+    rows.append("IMP0000,Duplicate,dup@example.com,Sales")
+    response = upload(client, "employee_id,full_name,email,department\n" + "\n".join(rows) + "\n")
+    
+    assert response.status_code == 200
+    result = response.json()
+    assert result["total_rows"] == 1201
+    assert result["imported"] == 1200
+    assert [error["row"] for error in result["errors"]] == [1202]
+
+def test_import_requires_columns(client):
+    response = upload(client, "employee_id,full_name\nIMPX,Missing\n")
+    assert response.status_code == 400
+
+def test_import_reports_conflicts_with_existing_employees(client):
+    client.post("/api/employees", json={
+        "employee_id": "IMPC01",
+        "full_name": "Existing Employee",
+        "email": "existing@example.com",
+        "department": "Sales"
+    })
+    response = upload(client, "\n".join([
+        "employee_id,full_name,email,department",
+        "IMPC01,Same Code,other@example.com,Sales",
+        "IMPC02,Same Email,existing@example.com,Sales",
+        "IMPC03,New Employee,new@example.com,Sales"
+    ]) + "\n")
+    
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (1, 2)
+    assert [(error["row"], error["error"]) for error in result["errors"]] == [
+        (2, "Employee ID 'IMPC01' already exists"),
+        (3, "Email 'existing@example.com' is already registered")
+    ]
+
+def test_import_rejects_oversized_upload(client, monkeypatch):
+    monkeypatch.setattr("routes.employees.settings.import_max_bytes", 64)
+    response = upload(client, "employee_id,full_name,email,department\n" + "IMPBIG,Big,big@example.com,Sales\n" * 5)
+    assert response.status_code == 413
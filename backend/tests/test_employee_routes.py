@@ -0,0 +1,40 @@
+def test_attendance_calendar(client):
+    employee = client.post("/api/employees", json={
+        "employee_id": "CAL001",
+        "full_name": "Calendar Test",
+        "email": "calendar.test@example.com",
+        "department": "Finance"
+    }).json()
+    for day, status in (("2026-03-02", "present"), ("2026-03-04", "absent")):
+        client.post("/api/attendance", json={"employee_id": employee["id"], "attendance_date": day, "status": status})
+    
+    response = client.get(f"/api/employees/{employee['id']}/attendance-calendar", params={"start_date": "2026-03-01", "end_date": "2026-03-05"})
+    assert response.status_code == 200
+    assert response.json()["days"] == [None, "present", None, "absent", None]
+
+def test_attendance_calendar_rejects_reversed_range(client):
+    response = client.get(
+        "/api/employees/00000000-0000-0000-0000-000000000000/attendance-calendar",
+        params={"start_date": "2026-03-05", "end_date": "2026-03-01"}
+    )
+    assert response.status_code == 400
+
+def test_attendance_summary_for_one_employee(client):
+    employee = client.post("/api/employees", json={
+        "employee_id": "SUM001",
+        "full_name": "Summary Test",
+        "email": "summary.test@example.com",
+        "department": "Sales"
+    }).json()
+    for day, status in (("2026-03-02", "present"), ("2026-03-03", "present"), ("2026-03-04", "absent")):
+        client.post("/api/attendance", json={"employee_id": employee["id"], "attendance_date": day, "status": status})
+    
+    response = client.get(f"/api/employees/{employee['id']}/attendance-summary", params={"end_date": "2026-03-03"})
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["total_days"], summary["present_days"], summary["absent_days"]) == (2, 2, 0)
+    assert summary["attendance_rate"] == 100.0
+
+def test_attendance_summary_for_unknown_employee(client):
+    response = client.get("/api/employees/00000000-0000-0000-0000-000000000000/attendance-summary")
+    assert response.status_code == 404
@@ -0,0 +1,30 @@
+import asyncio
+from services.events import Broadcaster, MetricsFeed
+
+def test_failed_reload_keeps_snapshot_and_retries_on_next_write():
+    broadcaster = Broadcaster(queue_size=8, max_subscribers=4)
+    feed = MetricsFeed(broadcaster, debounce=0)
+    loads = [RuntimeError("database unavailable"), {"total_employees": 3, "today_present": 2}]
+    
+    async def load():
+        result = loads.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    feed._load = load
+    feed._snapshot = {"total_employees": 3, "today_present": 1}
+    
+    async def scenario():
+        subscriber = broadcaster.subscribe()
+        feed.notify()
+        await feed._task
+        assert subscriber.queue.empty()
+        assert feed._snapshot == {"total_employees": 3, "today_present": 1}
+        
+        feed.notify()
+        await feed._task
+        return subscriber.queue.get_nowait()
+    
+    assert asyncio.run(scenario()) == ("metrics", {"today_present": 2})
+    assert broadcaster.resyncs == 0
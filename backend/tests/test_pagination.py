@@ -0,0 +1,50 @@
+import pytest
+from services.pagination import encode_cursor
+
+@pytest.mark.parametrize("path, cursor", [
+    ("/api/employees", encode_cursor("not-a-timestamp", "00000000-0000-0000-0000-000000000000")),
+    ("/api/employees", encode_cursor("2026-01-01T00:00:00+00:00", "not-a-uuid")),
+    ("/api/attendance", encode_cursor("2026-13-01", "00000000-0000-0000-0000-000000000000")),
+    ("/api/attendance", "not base64 json")
+])
+def test_invalid_cursor_returns_400(client, path, cursor):
+    response = client.get(path, params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+def test_cursor_round_trip(client):
+    for i in range(3):
+        client.post("/api/employees", json={
+            "employee_id": f"PAG{i:03d}",
+            "full_name": f"Page {i}",
+            "email": f"page{i}@example.com",
+            "department": "Support"
+        })
+    first = client.get("/api/employees", params={"limit": 2}).json()
+    second = client.get("/api/employees", params={"limit": 2, "cursor": first["next_cursor"]})
+    assert second.status_code == 200
+    assert not {e["id"] for e in first["items"]} & {e["id"] for e in second.json()["items"]}
+
+def test_attendance_pages_cover_every_row_once(client):
+    employee = client.post("/api/employees", json={
+        "employee_id": "PAGA01",
+        "full_name": "Page Attendance",
+        "email": "page.attendance@example.com",
+        "department": "Support"
+    }).json()
+    days = [f"2026-04-{day:02d}" for day in range(1, 8)]
+    for day in days:
+        client.post("/api/attendance", json={"employee_id": employee["id"], "attendance_date": day, "status": "present"})
+    
+    seen, cursor = [], None
+    while True:
+        params = {"employee_id": employee["id"], "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/attendance", params=params).json()
+        seen.extend(row["attendance_date"] for row in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    
+    assert seen == sorted(days, reverse=True)
@@ -54,6 +54,44 @@ CREATE TABLE IF NOT EXISTS attendance (
     CONSTRAINT attendance_date_not_future CHECK (attendance_date <= CURRENT_DATE)
 );
 
+-- Daily attendance rollup (date x department), maintained by triggers below
+CREATE TABLE IF NOT EXISTS attendance_daily_rollup (
+    attendance_date DATE NOT NULL,
+    department TEXT NOT NULL,
+    present_count INT NOT NULL DEFAULT 0,
+    absent_count INT NOT NULL DEFAULT 0,
+    
+    PRIMARY KEY (attendance_date, department)
+);
+
+-- Per-table change counters (HTTP ETag / Last-Modified validators), bumped by triggers below.
+-- Each connection bumps its own slot, so concurrent writers do not queue on one row.
+CREATE TABLE IF NOT EXISTS table_version_slots (
+    table_name TEXT NOT NULL,
+    slot INT NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    
+    PRIMARY KEY (table_name, slot)
+);
+
+INSERT INTO table_version_slots (table_name, slot) VALUES ('employees', 0), ('attendance', 0)
+ON CONFLICT (table_name, slot) DO NOTHING;
+
+-- table_versions used to be a single-row-per-table counter; it is now a view over the slots
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_tables WHERE schemaname = 'public' AND tablename = 'table_versions') THEN
+        DROP TABLE table_versions;
+    END IF;
+END $$;
+
+-- Slot counters only grow, so the sum changes with every committed write
+CREATE OR REPLACE VIEW table_versions AS
+SELECT table_name, SUM(version)::BIGINT AS version, MAX(updated_at) AS updated_at
+FROM table_version_slots
+GROUP BY table_name;
+
 -- ==================== INDEXES ====================
 
 -- Employees indexes
@@ -86,15 +124,347 @@ CREATE TRIGGER update_employees_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Bump the change counter once per writing statement, in this connection's slot
+CREATE OR REPLACE FUNCTION bump_table_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO table_version_slots (table_name, slot, version, updated_at)
+    VALUES (TG_TABLE_NAME, pg_backend_pid() % 64, 1, NOW())
+    ON CONFLICT (table_name, slot) DO UPDATE SET
+        version = table_version_slots.version + 1,
+        updated_at = EXCLUDED.updated_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS employees_version_trigger ON employees;
+CREATE TRIGGER employees_version_trigger
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON employees
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS attendance_version_trigger ON attendance;
+CREATE TRIGGER attendance_version_trigger
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON attendance
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_table_version();
+
+-- ==================== ATTENDANCE ROLLUP ====================
+
+-- Apply a +1/-1 delta for one attendance row to the daily rollup
+CREATE OR REPLACE FUNCTION apply_attendance_rollup_delta(
+    p_date DATE,
+    p_department TEXT,
+    p_status attendance_status,
+    p_delta INT
+)
+RETURNS VOID AS $$
+    INSERT INTO attendance_daily_rollup (attendance_date, department, present_count, absent_count)
+    VALUES (
+        p_date,
+        p_department,
+        CASE WHEN p_status = 'present' THEN p_delta ELSE 0 END,
+        CASE WHEN p_status = 'absent' THEN p_delta ELSE 0 END
+    )
+    ON CONFLICT (attendance_date, department) DO UPDATE SET
+        present_count = attendance_daily_rollup.present_count + EXCLUDED.present_count,
+        absent_count = attendance_daily_rollup.absent_count + EXCLUDED.absent_count;
+$$ LANGUAGE sql;
+
+-- Keep the rollup in step with inserts, upserts, updates and deletes on attendance
+CREATE OR REPLACE FUNCTION maintain_attendance_rollup()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_department TEXT;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- Rows removed by an employee delete cascade find no employee here;
+        -- remove_employee_from_rollup() has already subtracted them.
+        SELECT department INTO v_department FROM employees WHERE id = OLD.employee_id;
+        IF v_department IS NOT NULL THEN
+            PERFORM apply_attendance_rollup_delta(OLD.attendance_date, v_department, OLD.status, -1);
+        END IF;
+    END IF;
+    
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT department INTO v_department FROM employees WHERE id = NEW.employee_id;
+        PERFORM apply_attendance_rollup_delta(NEW.attendance_date, v_department, NEW.status, 1);
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS attendance_rollup_trigger ON attendance;
+CREATE TRIGGER attendance_rollup_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON attendance
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_attendance_rollup();
+
+-- Subtract all of an employee's attendance before the row (and its cascade) goes away
+CREATE OR REPLACE FUNCTION remove_employee_from_rollup()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE attendance_daily_rollup r SET
+        present_count = r.present_count - a.present_count,
+        absent_count = r.absent_count - a.absent_count
+    FROM (
+        SELECT
+            attendance_date,
+            COUNT(*) FILTER (WHERE status = 'present') AS present_count,
+            COUNT(*) FILTER (WHERE status = 'absent') AS absent_count
+        FROM attendance
+        WHERE employee_id = OLD.id
+        GROUP BY attendance_date
+    ) a
+    WHERE r.attendance_date = a.attendance_date
+      AND r.department = OLD.department;
+    
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS employees_rollup_delete_trigger ON employees;
+CREATE TRIGGER employees_rollup_delete_trigger
+    BEFORE DELETE ON employees
+    FOR EACH ROW
+    EXECUTE FUNCTION remove_employee_from_rollup();
+
+-- Move an employee's counts when their department changes
+CREATE OR REPLACE FUNCTION move_employee_rollup_department()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_attendance_rollup_delta(a.attendance_date, OLD.department, a.status, -1),
+            apply_attendance_rollup_delta(a.attendance_date, NEW.department, a.status, 1)
+    FROM attendance a
+    WHERE a.employee_id = NEW.id;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS employees_rollup_department_trigger ON employees;
+CREATE TRIGGER employees_rollup_department_trigger
+    AFTER UPDATE OF department ON employees
+    FOR EACH ROW
+    WHEN (OLD.department IS DISTINCT FROM NEW.department)
+    EXECUTE FUNCTION move_employee_rollup_department();
+
+-- Backfill / rebuild the rollup from raw attendance; returns the number of rollup rows
+CREATE OR REPLACE FUNCTION rebuild_attendance_daily_rollup()
+RETURNS INT AS $$
+DECLARE
+    v_rows INT;
+BEGIN
+    LOCK TABLE attendance IN SHARE MODE;
+    DELETE FROM attendance_daily_rollup;
+    
+    INSERT INTO attendance_daily_rollup (attendance_date, department, present_count, absent_count)
+    SELECT
+        a.attendance_date,
+        e.department,
+        COUNT(*) FILTER (WHERE a.status = 'present'),
+        COUNT(*) FILTER (WHERE a.status = 'absent')
+    FROM attendance a
+    JOIN employees e ON e.id = a.employee_id
+    GROUP BY a.attendance_date, e.department;
+    
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Row triggers do not fire on TRUNCATE; rebuild the rollup from what is left instead
+CREATE OR REPLACE FUNCTION rebuild_attendance_rollup_after_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM rebuild_attendance_daily_rollup();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS attendance_rollup_truncate_trigger ON attendance;
+CREATE TRIGGER attendance_rollup_truncate_trigger
+    AFTER TRUNCATE ON attendance
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION rebuild_attendance_rollup_after_truncate();
+
+-- ==================== REPORTING FUNCTIONS ====================
+
+-- Dashboard metrics in a single round trip (used by GET /api/dashboard)
+CREATE OR REPLACE FUNCTION get_dashboard_metrics(
+    p_today DATE DEFAULT CURRENT_DATE,
+    p_recent_limit INT DEFAULT 5
+)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'total_employees', (SELECT COUNT(*) FROM employees),
+        'total_attendance_records', a.total,
+        'today_present', a.today_present,
+        'today_absent', a.today_absent,
+        'total_absent', a.absent,
+        'overall_attendance_rate', COALESCE(ROUND(a.present * 100.0 / NULLIF(a.total, 0), 2), 0),
+        'recent_employees', COALESCE((
+            SELECT json_agg(r ORDER BY r.created_at DESC)
+            FROM (
+                SELECT id, employee_id, full_name, email, department, created_at, updated_at
+                FROM employees
+                ORDER BY created_at DESC
+                LIMIT p_recent_limit
+            ) r
+        ), '[]'::json)
+    )
+    FROM (
+        SELECT
+            COALESCE(SUM(present_count + absent_count), 0) AS total,
+            COALESCE(SUM(present_count), 0) AS present,
+            COALESCE(SUM(absent_count), 0) AS absent,
+            COALESCE(SUM(present_count) FILTER (WHERE attendance_date = p_today), 0) AS today_present,
+            COALESCE(SUM(absent_count) FILTER (WHERE attendance_date = p_today), 0) AS today_absent
+        FROM attendance_daily_rollup
+    ) a;
+$$ LANGUAGE sql STABLE;
+
+-- Daily present/absent counts for the p_days days ending p_end_date, zero-filled by
+-- generate_series (GET /api/analytics/attendance-trends)
+CREATE OR REPLACE FUNCTION get_attendance_trends(
+    p_end_date DATE DEFAULT CURRENT_DATE,
+    p_days INT DEFAULT 7,
+    p_department TEXT DEFAULT NULL
+)
+RETURNS TABLE (attendance_date DATE, present INT, absent INT) AS $$
+    SELECT
+        d.day::DATE,
+        COALESCE(SUM(r.present_count), 0)::INT,
+        COALESCE(SUM(r.absent_count), 0)::INT
+    FROM generate_series(p_end_date - (p_days - 1), p_end_date, INTERVAL '1 day') AS d(day)
+    LEFT JOIN attendance_daily_rollup r
+        ON r.attendance_date = d.day::DATE
+       AND (p_department IS NULL OR r.department = p_department)
+    GROUP BY d.day
+    ORDER BY d.day;
+$$ LANGUAGE sql STABLE;
+
+-- Weekly (days 1-7, 8-14, ...) counts and rate for the month containing p_month, up to
+-- p_through for the current month; zero-filled (GET /api/analytics/monthly-attendance)
+CREATE OR REPLACE FUNCTION get_monthly_attendance(
+    p_month DATE DEFAULT CURRENT_DATE,
+    p_through DATE DEFAULT CURRENT_DATE,
+    p_department TEXT DEFAULT NULL
+)
+RETURNS TABLE (week TEXT, present INT, absent INT, total INT, rate NUMERIC) AS $$
+    WITH bounds AS (
+        SELECT
+            date_trunc('month', p_month)::DATE AS first_day,
+            LEAST((date_trunc('month', p_month) + INTERVAL '1 month - 1 day')::DATE, p_through) AS last_day
+    ),
+    weeks AS (
+        SELECT
+            w.n AS week_num,
+            SUM(r.present_count) AS present,
+            SUM(r.absent_count) AS absent
+        FROM bounds b
+        CROSS JOIN generate_series(1, (b.last_day - b.first_day) / 7 + 1) AS w(n)
+        LEFT JOIN attendance_daily_rollup r
+            ON r.attendance_date BETWEEN b.first_day + (w.n - 1) * 7
+                                     AND LEAST(b.first_day + w.n * 7 - 1, b.last_day)
+           AND (p_department IS NULL OR r.department = p_department)
+        WHERE b.last_day >= b.first_day
+        GROUP BY w.n
+    )
+    SELECT
+        'Week ' || week_num,
+        COALESCE(present, 0)::INT,
+        COALESCE(absent, 0)::INT,
+        COALESCE(present + absent, 0)::INT,
+        COALESCE(ROUND(present * 100.0 / NULLIF(present + absent, 0), 1), 0)
+    FROM weeks
+    ORDER BY week_num;
+$$ LANGUAGE sql STABLE;
+
+-- Employee count per department, largest first (GET /api/analytics/department-stats)
+CREATE OR REPLACE FUNCTION get_department_stats()
+RETURNS TABLE (department TEXT, count INT) AS $$
+    SELECT e.department::TEXT, COUNT(*)::INT
+    FROM employees e
+    GROUP BY e.department
+    ORDER BY COUNT(*) DESC, e.department;
+$$ LANGUAGE sql STABLE;
+
+-- Which of the given employee UUIDs exist (one set-based lookup for bulk writes)
+CREATE OR REPLACE FUNCTION filter_existing_employee_ids(p_ids UUID[])
+RETURNS TABLE (id UUID) AS $$
+    SELECT e.id FROM employees e WHERE e.id = ANY(p_ids);
+$$ LANGUAGE sql STABLE;
+
+-- Existing employees clashing with any of the given codes or emails (bulk import pre-check)
+CREATE OR REPLACE FUNCTION find_employee_conflicts(p_employee_ids TEXT[], p_emails TEXT[])
+RETURNS TABLE (employee_id TEXT, email TEXT) AS $$
+    SELECT e.employee_id, e.email
+    FROM employees e
+    WHERE e.employee_id = ANY(p_employee_ids) OR e.email = ANY(p_emails);
+$$ LANGUAGE sql STABLE;
+
+-- Per-employee attendance counts over an optional date range, one GROUP BY for any number
+-- of employees (GET /api/employees/attendance-summaries and the single-employee summary).
+-- Employees are paged by employee code before the join, so each page aggregates only its rows.
+CREATE OR REPLACE FUNCTION get_employee_attendance_summaries(
+    p_start_date DATE DEFAULT NULL,
+    p_end_date DATE DEFAULT NULL,
+    p_department TEXT DEFAULT NULL,
+    p_employee_ids UUID[] DEFAULT NULL,
+    p_after_code TEXT DEFAULT NULL,
+    p_limit INT DEFAULT NULL
+)
+RETURNS TABLE (
+    employee_id UUID,
+    employee_name TEXT,
+    employee_code TEXT,
+    department TEXT,
+    total_days INT,
+    present_days INT,
+    absent_days INT,
+    attendance_rate NUMERIC
+) AS $$
+    SELECT
+        e.id,
+        e.full_name::TEXT,
+        e.employee_id::TEXT,
+        e.department::TEXT,
+        COUNT(a.id)::INT,
+        COUNT(a.id) FILTER (WHERE a.status = 'present')::INT,
+        COUNT(a.id) FILTER (WHERE a.status = 'absent')::INT,
+        COALESCE(ROUND(COUNT(a.id) FILTER (WHERE a.status = 'present') * 100.0 / NULLIF(COUNT(a.id), 0), 2), 0)
+    FROM (
+        SELECT id, full_name, employee_id, department
+        FROM employees
+        WHERE (p_department IS NULL OR department = p_department)
+          AND (p_employee_ids IS NULL OR id = ANY(p_employee_ids))
+          AND (p_after_code IS NULL OR employee_id > p_after_code)
+        ORDER BY employee_id
+        LIMIT p_limit
+    ) e
+    LEFT JOIN attendance a
+        ON a.employee_id = e.id
+       AND (p_start_date IS NULL OR a.attendance_date >= p_start_date)
+       AND (p_end_date IS NULL OR a.attendance_date <= p_end_date)
+    GROUP BY e.id, e.full_name, e.employee_id, e.department
+    ORDER BY e.employee_id;
+$$ LANGUAGE sql STABLE;
+
 -- ==================== ROW LEVEL SECURITY (RLS) ====================
 
 -- Enable RLS on tables
 ALTER TABLE employees ENABLE ROW LEVEL SECURITY;
 ALTER TABLE attendance ENABLE ROW LEVEL SECURITY;
+ALTER TABLE attendance_daily_rollup ENABLE ROW LEVEL SECURITY;
+ALTER TABLE table_version_slots ENABLE ROW LEVEL SECURITY;
 
 -- Drop existing policies if they exist
 DROP POLICY IF EXISTS "Allow all operations on employees" ON employees;
 DROP POLICY IF EXISTS "Allow all operations on attendance" ON attendance;
+DROP POLICY IF EXISTS "Allow read access on attendance_daily_rollup" ON attendance_daily_rollup;
+DROP POLICY IF EXISTS "Allow read access on table_version_slots" ON table_version_slots;
 
 -- Create permissive policies for admin access (no authentication required as per requirements)
 -- These policies allow all operations since there's a single admin user with no auth
@@ -113,6 +483,20 @@ CREATE POLICY "Allow all operations on attendance"
     USING (true)
     WITH CHECK (true);
 
+-- Rollup policies (written only by the SECURITY DEFINER trigger functions)
+CREATE POLICY "Allow read access on attendance_daily_rollup"
+    ON attendance_daily_rollup
+    FOR SELECT
+    USING (true);
+
+CREATE POLICY "Allow read access on table_version_slots"
+    ON table_version_slots
+    FOR SELECT
+    USING (true);
+
+-- Backfill the rollup for attendance recorded before the triggers existed
+SELECT rebuild_attendance_daily_rollup();
+
 -- ==================== SAMPLE DATA (Optional - Remove in production) ====================
 
 -- Uncomment below to insert sample data for testing
@@ -144,7 +528,7 @@ ON CONFLICT (employee_id, attendance_date) DO NOTHING;
 SELECT table_name 
 FROM information_schema.tables 
 WHERE table_schema = 'public' 
-AND table_name IN ('employees', 'attendance');
+AND table_name IN ('employees', 'attendance', 'attendance_daily_rollup', 'table_version_slots');
 
 -- Verify indexes created
 SELECT indexname 
@@ -3,7 +3,7 @@
 import React, { useState, useEffect } from 'react'
 import { useRouter } from 'next/navigation'
 import { ArrowLeft, Plus, Filter, Users as UsersIcon, Calendar as CalendarIcon } from 'lucide-react'
-import { employeeAPI, attendanceAPI, type Employee, type AttendanceWithEmployee } from '@/lib/api'
+import { employeeAPI, attendanceAPI, type Employee, type NormalizedAttendance } from '@/lib/api'
 import toast from 'react-hot-toast'
 
 // Component imports
@@ -22,7 +22,7 @@ export default function DashboardPage() {
   
   // State management
   const [employees, setEmployees] = useState<Employee[]>([])
-  const [attendance, setAttendance] = useState<AttendanceWithEmployee[]>([])
+  const [attendance, setAttendance] = useState<NormalizedAttendance>({ items: [], employees: {} })
   const [loadingEmployees, setLoadingEmployees] = useState(true)
   const [loadingAttendance, setLoadingAttendance] = useState(true)
   const [error, setError] = useState<string | null>(null)
@@ -60,7 +60,7 @@ export default function DashboardPage() {
   const loadAttendance = async () => {
     try {
       setLoadingAttendance(true)
-      const data = await attendanceAPI.getAll()
+      const data = await attendanceAPI.getAllNormalized()
       setAttendance(data)
     } catch {
       toast.error('Failed to load attendance records')
@@ -73,8 +73,8 @@ export default function DashboardPage() {
     try {
       setLoadingAttendance(true)
       const data = Object.keys(params).length > 0 
-        ? await attendanceAPI.filter(params)
-        : await attendanceAPI.getAll()
+        ? await attendanceAPI.filterNormalized(params)
+        : await attendanceAPI.getAllNormalized()
       setAttendance(data)
       toast.success('Filters applied successfully')
     } catch {
@@ -211,7 +211,7 @@ export default function DashboardPage() {
                 <CalendarIcon className="h-6 w-6 text-primary-600" />
                 <h2 className="text-2xl font-bold text-gray-900">Attendance</h2>
                 <span className="text-sm text-gray-500 bg-gray-100 px-3 py-1 rounded-full">
-                  {attendance.length} records
+                  {attendance.items.length} records
                 </span>
                 {selectedEmployee && (
                   <span className="text-sm text-primary-600 bg-primary-50 px-3 py-1 rounded-full">
@@ -245,7 +245,7 @@ export default function DashboardPage() {
                 <div className="p-6">
                   <TableSkeleton rows={5} cols={5} />
                 </div>
-              ) : attendance.length === 0 ? (
+              ) : attendance.items.length === 0 ? (
                 <EmptyState
                   icon="calendar"
                   title="No attendance records"
@@ -256,7 +256,7 @@ export default function DashboardPage() {
                   }}
                 />
               ) : (
-                <AttendanceTable attendance={attendance} />
+                <AttendanceTable attendance={attendance.items} employees={attendance.employees} />
               )}
             </div>
           </div>
@@ -1,15 +1,17 @@
 'use client'
 
 import React from 'react'
-import { type AttendanceWithEmployee } from '@/lib/api'
+import { type Attendance, type AttendanceEmployee } from '@/lib/api'
 import { format } from 'date-fns'
 import { CheckCircle2, XCircle } from 'lucide-react'
 
 interface AttendanceTableProps {
-  attendance: AttendanceWithEmployee[]
+  attendance: Attendance[]
+  // Keyed by employee UUID (from ?shape=normalized); joined per row here
+  employees: Record<string, AttendanceEmployee>
 }
 
-export const AttendanceTable = ({ attendance }: AttendanceTableProps) => {
+export const AttendanceTable = ({ attendance, employees }: AttendanceTableProps) => {
   return (
     <div className="overflow-x-auto">
       <table className="w-full">
@@ -33,39 +35,42 @@ export const AttendanceTable = ({ attendance }: AttendanceTableProps) => {
           </tr>
         </thead>
         <tbody className="bg-white divide-y divide-gray-200">
-          {attendance.map((record) => (
-            <tr key={record.id} className="hover:bg-gray-50 transition-colors">
-              <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
-                {format(new Date(record.attendance_date), 'MMM dd, yyyy')}
-              </td>
-              <td className="px-6 py-4 whitespace-nowrap">
-                <span className="text-sm font-medium text-gray-900">
-                  {record.employee_code}
-                </span>
-              </td>
-              <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
-                {record.employee_name}
-              </td>
-              <td className="px-6 py-4 whitespace-nowrap">
-                <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-primary-100 text-primary-800">
-                  {record.department}
-                </span>
-              </td>
-              <td className="px-6 py-4 whitespace-nowrap">
-                {record.status === 'present' ? (
-                  <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-green-100 text-green-800">
-                    <CheckCircle2 className="h-3 w-3 mr-1" />
-                    Present
+          {attendance.map((record) => {
+            const employee = employees[record.employee_id]
+            return (
+              <tr key={record.id} className="hover:bg-gray-50 transition-colors">
+                <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
+                  {format(new Date(record.attendance_date), 'MMM dd, yyyy')}
+                </td>
+                <td className="px-6 py-4 whitespace-nowrap">
+                  <span className="text-sm font-medium text-gray-900">
+                    {employee?.employee_code ?? '—'}
                   </span>
-                ) : (
-                  <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-red-100 text-red-800">
-                    <XCircle className="h-3 w-3 mr-1" />
-                    Absent
+                </td>
+                <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
+                  {employee?.employee_name ?? 'Unknown employee'}
+                </td>
+                <td className="px-6 py-4 whitespace-nowrap">
+                  <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-primary-100 text-primary-800">
+                    {employee?.department ?? '—'}
                   </span>
-                )}
-              </td>
-            </tr>
-          ))}
+                </td>
+                <td className="px-6 py-4 whitespace-nowrap">
+                  {record.status === 'present' ? (
+                    <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-green-100 text-green-800">
+                      <CheckCircle2 className="h-3 w-3 mr-1" />
+                      Present
+                    </span>
+                  ) : (
+                    <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-red-100 text-red-800">
+                      <XCircle className="h-3 w-3 mr-1" />
+                      Absent
+                    </span>
+                  )}
+                </td>
+              </tr>
+            )
+          })}
         </tbody>
       </table>
     </div>
@@ -2,7 +2,7 @@
 
 import React, { useEffect, useState } from 'react'
 import { Users, Calendar, TrendingUp, Clock } from 'lucide-react'
-import { type DashboardMetrics, dashboardAPI } from '@/lib/api'
+import { type DashboardMetrics, dashboardAPI, eventsAPI } from '@/lib/api'
 import { LoadingState } from '../ui/LoadingState'
 import { ErrorState } from '../ui/ErrorState'
 
@@ -13,6 +13,12 @@ export const DashboardSummary = () => {
 
   useEffect(() => {
     loadMetrics()
+
+    // Apply pushed metric deltas instead of polling
+    return eventsAPI.subscribe({
+      onMetrics: (delta) => setMetrics((prev) => (prev ? { ...prev, ...delta } : prev)),
+      onResync: () => loadMetrics(),
+    })
   }, [])
 
   const loadMetrics = async () => {
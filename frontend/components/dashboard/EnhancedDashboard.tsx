@@ -1,6 +1,6 @@
 'use client'
 
-import React, { useEffect, useState } from 'react'
+import React, { useEffect, useRef, useState } from 'react'
 import { motion } from 'framer-motion'
 import { 
   Users, Calendar, TrendingUp, Activity, 
@@ -11,10 +11,13 @@ import {
   XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer,
   AreaChart, Area
 } from 'recharts'
-import { type DashboardMetrics, dashboardAPI } from '@/lib/api'
+import { type DashboardMetrics, dashboardAPI, eventsAPI } from '@/lib/api'
 import axios from 'axios'
 import { format } from 'date-fns'
 
+// Charts refresh at most this often while live updates are arriving
+const CHART_REFRESH_MS = 30000
+
 const COLORS = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#ec4899']
 
 interface TrendData {
@@ -43,15 +46,30 @@ export const EnhancedDashboard = () => {
   const [loading, setLoading] = useState(true)
   const [lastUpdate, setLastUpdate] = useState<Date>(new Date())
 
+  const chartRefresh = useRef<ReturnType<typeof setTimeout> | null>(null)
+
   useEffect(() => {
     loadAllData()
     
-    // Auto-refresh every 30 seconds
-    const interval = setInterval(() => {
-      loadAllData()
-    }, 30000)
+    // Metric cards update from pushed deltas; charts reload only after data changed
+    const unsubscribe = eventsAPI.subscribe({
+      onMetrics: (delta) => {
+        setMetrics((prev) => (prev ? { ...prev, ...delta } : prev))
+        setLastUpdate(new Date())
+        if (!chartRefresh.current) {
+          chartRefresh.current = setTimeout(() => {
+            chartRefresh.current = null
+            loadAllData()
+          }, CHART_REFRESH_MS)
+        }
+      },
+      onResync: () => loadAllData(),
+    })
     
-    return () => clearInterval(interval)
+    return () => {
+      unsubscribe()
+      if (chartRefresh.current) clearTimeout(chartRefresh.current)
+    }
   }, [])
 
   const loadAllData = async () => {
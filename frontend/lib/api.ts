@@ -62,12 +62,38 @@ export interface AttendanceWithEmployee extends Attendance {
   department: string
 }
 
+// Employee details sent once per page by ?shape=normalized
+export interface AttendanceEmployee {
+  employee_name: string
+  employee_code: string
+  department: string
+}
+
+export interface NormalizedAttendance {
+  items: Attendance[]
+  employees: Record<string, AttendanceEmployee>
+}
+
 export interface AttendanceCreate {
   employee_id: string
   attendance_date: string
   status: 'present' | 'absent'
 }
 
+export interface AttendanceBulkItemResult {
+  index: number
+  success: boolean
+  record: Attendance | null
+  error: string | null
+}
+
+export interface AttendanceBulkResult {
+  total: number
+  succeeded: number
+  failed: number
+  results: AttendanceBulkItemResult[]
+}
+
 export interface AttendanceSummary {
   employee_id: string
   employee_name: string
@@ -89,13 +115,63 @@ export interface DashboardMetrics {
   recent_employees: Employee[]
 }
 
+export interface Page<T> {
+  items: T[]
+  next_cursor: string | null
+  total: number | null
+}
+
+export interface PageParams {
+  limit?: number
+  cursor?: string
+  include_total?: boolean
+}
+
+// ==================== HELPERS ====================
+
+const PAGE_SIZE = 500
+
+// Follow next_cursor until the last page and return every item
+const fetchAllPages = async <T>(url: string, params: Record<string, unknown> = {}): Promise<T[]> => {
+  const items: T[] = []
+  let cursor: string | undefined
+  do {
+    const response = await apiClient.get<Page<T>>(url, {
+      params: { ...params, limit: PAGE_SIZE, cursor },
+    })
+    items.push(...response.data.items)
+    cursor = response.data.next_cursor ?? undefined
+  } while (cursor)
+  return items
+}
+
+// Same as fetchAllPages for ?shape=normalized, merging each page's employees
+const fetchAllNormalized = async (url: string, params: Record<string, unknown> = {}): Promise<NormalizedAttendance> => {
+  const result: NormalizedAttendance = { items: [], employees: {} }
+  let cursor: string | undefined
+  do {
+    const response = await apiClient.get<Page<Attendance> & Pick<NormalizedAttendance, 'employees'>>(url, {
+      params: { ...params, shape: 'normalized', limit: PAGE_SIZE, cursor },
+    })
+    result.items.push(...response.data.items)
+    Object.assign(result.employees, response.data.employees)
+    cursor = response.data.next_cursor ?? undefined
+  } while (cursor)
+  return result
+}
+
 // ==================== API FUNCTIONS ====================
 
 // Employee APIs
 export const employeeAPI = {
-  // Get all employees
+  // Get all employees (follows pagination cursors)
   getAll: async (): Promise<Employee[]> => {
-    const response = await apiClient.get('/api/employees')
+    return fetchAllPages<Employee>('/api/employees')
+  },
+
+  // Get a single page of employees
+  getPage: async (params: PageParams = {}): Promise<Page<Employee>> => {
+    const response = await apiClient.get('/api/employees', { params })
     return response.data
   },
 
@@ -121,13 +197,29 @@ export const employeeAPI = {
     const response = await apiClient.get(`/api/employees/${id}/attendance-summary`)
     return response.data
   },
+
+  // Get attendance summaries for all employees (follows pagination cursors)
+  getAttendanceSummaries: async (params: Record<string, string> = {}): Promise<AttendanceSummary[]> => {
+    return fetchAllPages<AttendanceSummary>('/api/employees/attendance-summaries', params)
+  },
 }
 
 // Attendance APIs
 export const attendanceAPI = {
-  // Get all attendance records
+  // Get all attendance records (follows pagination cursors)
   getAll: async (employeeId?: string): Promise<AttendanceWithEmployee[]> => {
     const params = employeeId ? { employee_id: employeeId } : {}
+    return fetchAllPages<AttendanceWithEmployee>('/api/attendance', params)
+  },
+
+  // Get all attendance records with employee details sent once, for joining on the client
+  getAllNormalized: async (employeeId?: string): Promise<NormalizedAttendance> => {
+    const params = employeeId ? { employee_id: employeeId } : {}
+    return fetchAllNormalized('/api/attendance', params)
+  },
+
+  // Get a single page of attendance records
+  getPage: async (params: PageParams & { employee_id?: string } = {}): Promise<Page<AttendanceWithEmployee>> => {
     const response = await apiClient.get('/api/attendance', { params })
     return response.data
   },
@@ -138,6 +230,12 @@ export const attendanceAPI = {
     return response.data
   },
 
+  // Mark attendance for many employees in one request
+  createBulk: async (items: AttendanceCreate[]): Promise<AttendanceBulkResult> => {
+    const response = await apiClient.post('/api/attendance/bulk', { items })
+    return response.data
+  },
+
   // Update attendance
   update: async (id: string, status: 'present' | 'absent'): Promise<Attendance> => {
     const response = await apiClient.put(`/api/attendance/${id}`, { status })
@@ -157,8 +255,12 @@ export const attendanceAPI = {
     employee_id?: string
     status?: 'present' | 'absent'
   }): Promise<AttendanceWithEmployee[]> => {
-    const response = await apiClient.get('/api/attendance/filter', { params })
-    return response.data
+    return fetchAllPages<AttendanceWithEmployee>('/api/attendance/filter', params)
+  },
+
+  // Filter attendance, with employee details sent once
+  filterNormalized: async (params: Record<string, string>): Promise<NormalizedAttendance> => {
+    return fetchAllNormalized('/api/attendance/filter', params)
   },
 }
 
@@ -171,6 +273,35 @@ export const dashboardAPI = {
   },
 }
 
+// ==================== LIVE EVENTS API ====================
+
+export interface EventHandlers {
+  // Only the metrics that changed since the previous event
+  onMetrics: (delta: Partial<DashboardMetrics>) => void
+  // Events were dropped or the stream reconnected; reload from REST
+  onResync: () => void
+}
+
+export const eventsAPI = {
+  // Subscribe to server-sent dashboard updates; returns an unsubscribe function
+  subscribe: (handlers: EventHandlers): (() => void) => {
+    const source = new EventSource(`${API_URL}/api/events`)
+    let connected = false
+
+    source.addEventListener('metrics', (event) => {
+      handlers.onMetrics(JSON.parse((event as MessageEvent).data))
+    })
+    source.addEventListener('resync', () => handlers.onResync())
+    source.onopen = () => {
+      // Anything written while disconnected was missed
+      if (connected) handlers.onResync()
+      connected = true
+    }
+
+    return () => source.close()
+  },
+}
+
 // Health check
 export const healthCheck = async (): Promise<boolean> => {
   try {